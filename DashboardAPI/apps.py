@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class DashboardapiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'DashboardAPI'
+
+    def ready(self):
+        import DashboardAPI.signals
@@ -0,0 +1,100 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from dashboard.models import Device, DeviceLocation, DeviceModel, Zone
+from dashboard.signals import devices_changed
+from users.models import CustomUser, ExternalOrganization, ExternalOrganizationMembership, Farm, FarmMembership
+from .v1.cache import bump_version, farm_version
+from .v1.memberships import org_membership_key, farm_membership_key
+
+
+@receiver([post_save, post_delete], sender=ExternalOrganizationMembership)
+def invalidate_org_membership(sender, instance, **kwargs):
+    """
+    Сбрасывает закэшированное членство пользователя в организации.
+    """
+    key = org_membership_key(instance.user_id, instance.organization.slug)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+@receiver([post_save, post_delete], sender=FarmMembership)
+def invalidate_farm_membership(sender, instance, **kwargs):
+    """
+    Сбрасывает закэшированное членство пользователя в ферме.
+    """
+    key = farm_membership_key(instance.user_id, instance.farm.slug)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+@receiver([post_save, post_delete], sender=DeviceModel)
+def bump_device_models_version(sender, **kwargs):
+    """
+    Делает устаревшими закэшированные каталоги моделей устройств.
+    """
+    transaction.on_commit(lambda: bump_version('device_models'))
+
+
+@receiver([post_save, post_delete], sender=Device)
+@receiver([post_save, post_delete], sender=Farm)
+@receiver(devices_changed)
+def bump_devices_version(sender, instance=None, farm_ids=(), **kwargs):
+    """
+    Делает устаревшими закэшированные списки устройств организаций и
+    данные затронутых ферм — по одному увеличению версии на ферму.
+
+    Ферма входит в список, потому что её перенос в другую организацию
+    меняет состав устройств организации.
+    """
+    farm_ids = set(farm_ids)
+    if isinstance(instance, Device):
+        farm_ids.add(instance.farm_id)
+    elif isinstance(instance, Farm):
+        farm_ids.add(instance.id)
+    names = ['devices', *(farm_version(farm_id) for farm_id in sorted(farm_ids))]
+
+    def bump():
+        for name in names:
+            bump_version(name)
+
+    transaction.on_commit(bump)
+
+
+@receiver([post_save, post_delete], sender=Zone)
+@receiver([post_save, post_delete], sender=FarmMembership)
+@receiver([post_save, post_delete], sender=DeviceLocation)
+@receiver(post_save, sender=ExternalOrganization)
+def bump_farm_version(sender, instance, **kwargs):
+    """
+    Делает устаревшим закэшированный обзор фермы (FarmOverviewAPIView).
+    """
+    if sender is ExternalOrganization:
+        farm_ids = list(instance.farms.values_list('id', flat=True))
+    elif sender is DeviceLocation:
+        farm_ids = list(Device.objects.filter(pk=instance.device_id).values_list('farm_id', flat=True))
+    else:
+        farm_ids = [instance.farm_id]
+
+    def bump():
+        for farm_id in farm_ids:
+            bump_version(farm_version(farm_id))
+
+    transaction.on_commit(bump)
+
+
+@receiver(post_save, sender=CustomUser)
+def bump_user_farm_versions(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Делает устаревшими обзоры ферм пользователя: в них входят имена и
+    контакты участников. Сохранение только last_login (вход) обзор не меняет.
+    """
+    if created or update_fields == {'last_login'}:
+        return
+    farm_ids = list(FarmMembership.objects.filter(user=instance).values_list('farm_id', flat=True))
+
+    def bump():
+        for farm_id in farm_ids:
+            bump_version(farm_version(farm_id))
+
+    transaction.on_commit(bump)
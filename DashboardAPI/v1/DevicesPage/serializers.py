@@ -12,18 +12,22 @@ from users.models import (
 from dashboard.models import (
     Zone, Device, DeviceModel, DeviceLocation
 )
+from ..memberships import managed_farm_filter
+from ..mixins import SparseFieldsSerializerMixin
+from ..values_serializers import ValuesSerializer
 
-class OrgFarmsSerializer(serializers.ModelSerializer):
+class OrgFarmsSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Farm
         fields = ['id', 'slug', 'name']
 
-class OrgFarmZonesSerializer(serializers.ModelSerializer):
+class OrgFarmZonesSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Zone
         fields = '__all__'
+        prefetch_related = {'managers': ['managers']}
 
-class DeviceModelSerializer(serializers.ModelSerializer):
+class DeviceModelSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     updated_at = serializers.DateTimeField(format="%d.%m.%Y %H:%M")
     class Meta:
         model = DeviceModel
@@ -41,7 +45,7 @@ class DeviceLocationSerializer(serializers.ModelSerializer):
         fields = ['device', 'zone']
 
 
-class ZoneDevicesSerializer(serializers.ModelSerializer):
+class ZoneDevicesSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     model = DeviceModelSerializer()
     created_at = serializers.DateTimeField(format="%d.%m.%Y %H:%M")
     updated_at = serializers.DateTimeField(format="%d.%m.%Y %H:%M")
@@ -54,6 +58,15 @@ class ZoneDevicesSerializer(serializers.ModelSerializer):
     class Meta:
         model = Device
         fields = '__all__'
+        select_related = {
+            'model': ['model'],
+            'gateway_name': ['gateway_device'],
+            'added_by_name': ['added_by'],
+            'farm_name': ['farm'],
+            'farm_slug': ['farm'],
+            'device_zone': ['location__zone'],
+            'device_location_id': ['location'],
+        }
 
     @staticmethod
     def get_gateway_name(obj):
@@ -84,34 +97,130 @@ class ZoneDevicesSerializer(serializers.ModelSerializer):
             return None
 
     @staticmethod
-    def get_device_zone(obj):
-        if DeviceLocation.objects.filter(device__id=obj.id).exists():
-            return DeviceLocation.objects.filter(device__id=obj.id).first().zone.name
-        else:
+    def get_location(obj):
+        """Местоположение устройства из select_related('location__zone') или None."""
+        try:
+            return obj.location
+        except DeviceLocation.DoesNotExist:
             return None
 
-    @staticmethod
-    def get_device_location_id(obj):
-        if DeviceLocation.objects.filter(device__id=obj.id).exists():
-            return DeviceLocation.objects.filter(device__id=obj.id).first().id
+    def get_device_zone(self, obj):
+        location = self.get_location(obj)
+        if location and location.zone:
+            return location.zone.name
         else:
             return None
 
+    def get_device_location_id(self, obj):
+        location = self.get_location(obj)
+        if location:
+            return location.id
+        else:
+            return None
 
 
+class ZoneDevicesValuesSerializer(ValuesSerializer):
+    """Быстрый вывод ZoneDevicesSerializer для списков (DashboardAPI.v1.values_serializers)."""
+    serializer_class = ZoneDevicesSerializer
+    computed_fields = {
+        'gateway_name': (('gateway_device__name',), None),
+        'added_by_name': (
+            ('added_by__first_name', 'added_by__last_name'),
+            lambda first_name, last_name: None if first_name is None else first_name + " " + last_name,
+        ),
+        'farm_name': (('farm__name',), None),
+        'farm_slug': (('farm__slug',), None),
+        'device_zone': (('location__zone__name',), None),
+        'device_location_id': (('location__pk',), None),
+    }
+
+
+class BulkDeviceUpdateSerializer(serializers.Serializer):
+    """
+    Параметры массового изменения устройств.
+
+    ids — изменяемые устройства, остальные поля необязательны: передаются
+    только те, что нужно изменить. zone=null убирает устройства из зон.
+
+    Устройства, ферма переноса и зона ищутся только среди ферм, которыми
+    управляет пользователь из context['request'] (managed_farm_filter):
+    чужие и несуществующие объекты дают одну и ту же ошибку.
+    """
+    MAX_DEVICES = 1000
+
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=MAX_DEVICES)
+    farm = serializers.SlugRelatedField(slug_field='slug', queryset=Farm.objects.all(), required=False)
+    zone = serializers.PrimaryKeyRelatedField(queryset=Zone.objects.all(), required=False, allow_null=True)
+    is_active = serializers.BooleanField(required=False)
+    firmware_version = serializers.CharField(required=False, allow_blank=True, max_length=20)
+    last_maintenance = serializers.DateField(required=False, allow_null=True)
+    maintenance_interval = serializers.IntegerField(required=False, allow_null=True, min_value=0)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        user = self.context['request'].user
+        fields['farm'].queryset = Farm.objects.filter(managed_farm_filter(user))
+        fields['zone'].queryset = Zone.objects.filter(managed_farm_filter(user, prefix='farm__'))
+        return fields
+
+    def validate(self, attrs):
+        if set(attrs) == {'ids'}:
+            raise serializers.ValidationError("Не указано ни одного изменения")
+
+        ids = set(attrs['ids'])
+        devices = Device.objects.filter(managed_farm_filter(self.context['request'].user, prefix='farm__'))
+        device_farms = dict(devices.filter(id__in=ids).values_list('id', 'farm_id'))
+        missing = ids - set(device_farms)
+        if missing:
+            raise serializers.ValidationError({'ids': f"Устройства не найдены: {sorted(missing)}"})
+
+        zone = attrs.get('zone')
+        if zone is not None:
+            target_farms = {attrs['farm'].id} if 'farm' in attrs else set(device_farms.values())
+            if target_farms != {zone.farm_id}:
+                raise serializers.ValidationError({'zone': "Зона должна принадлежать ферме устройств"})
+
+        attrs['ids'] = sorted(ids)
+        return attrs
+
+
+class DeviceTopologySerializer(serializers.ModelSerializer):
+    """Узел дерева шлюзов (dashboard.topology)."""
+    depth = serializers.IntegerField(read_only=True)
+    child_count = serializers.IntegerField(read_only=True)
+    online = serializers.BooleanField(read_only=True, allow_null=True)
+    last_seen = serializers.DateTimeField(format="%d.%m.%Y %H:%M", read_only=True, allow_null=True)
 
+    class Meta:
+        model = Device
+        fields = ['id', 'name', 'serial_number', 'is_active', 'gateway_device', 'depth', 'child_count', 'online', 'last_seen']
 
 
+class DeviceMapSerializer(serializers.ModelSerializer):
+    """Устройство на карте (поиск по области и ближайших)."""
+    device_name = serializers.CharField(source='device.name', read_only=True)
+    serial_number = serializers.CharField(source='device.serial_number', read_only=True)
 
+    class Meta:
+        model = DeviceLocation
+        fields = ['device', 'device_name', 'serial_number', 'zone', 'latitude', 'longitude', 'geohash']
 
 
+class NearestDeviceSerializer(DeviceMapSerializer):
+    distance_km = serializers.FloatField(read_only=True)
 
+    class Meta(DeviceMapSerializer.Meta):
+        fields = DeviceMapSerializer.Meta.fields + ['distance_km']
 
 
+class MaintenanceDueDeviceSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    zone = serializers.IntegerField(source='location.zone_id', read_only=True, allow_null=True)
 
-
-
-
-
-
+    class Meta:
+        model = Device
+        fields = [
+            'id', 'name', 'serial_number', 'farm', 'zone',
+            'last_maintenance', 'maintenance_interval', 'maintenance_due_date',
+        ]
+        select_related = {'zone': ['location']}
 
@@ -1,3 +1,211 @@
-from django.test import TestCase
+import json
 
-# Create your tests here.
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from DashboardAPI.v1.DevicesPage.serializers import ZoneDevicesSerializer
+from DashboardAPI.v1.testing import QueryBudgetTestCase
+
+from dashboard.models import Zone, Device, DeviceModel, DeviceLocation
+from users.models import CustomUser, ExternalOrganization, ExternalOrganizationMembership, Farm, FarmMembership
+
+
+class DevicesPageQueryBudgetTests(QueryBudgetTestCase):
+    """
+    Проверяет, что списки страницы устройств выполняются за фиксированное
+    число запросов, не зависящее от количества устройств и зон.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.farm = Farm.objects.create(name='Ферма', owner=cls.user, organization=cls.organization)
+        cls.zone = Zone.objects.create(name='Теплица 1', farm=cls.farm)
+        cls.device_model = DeviceModel.objects.create(name='T-1', manufacturer='Acme', device_type='sensor')
+        cls.gateway = Device.objects.create(
+            name='Шлюз', farm=cls.farm, serial_number='GW-0', model=cls.device_model, added_by=cls.user
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+
+    def add_devices(self, count):
+        offset = Device.objects.count()
+        for i in range(offset, offset + count):
+            device = Device.objects.create(
+                name=f'Датчик {i}',
+                farm=self.farm,
+                serial_number=f'SN-{i}',
+                model=self.device_model,
+                added_by=self.user,
+                gateway_device=self.gateway,
+            )
+            DeviceLocation.objects.create(device=device, zone=self.zone)
+
+    def add_zones(self, count):
+        offset = Zone.objects.count()
+        for i in range(offset, offset + count):
+            zone = Zone.objects.create(name=f'Зона {i}', farm=self.farm)
+            zone.managers.add(self.user)
+
+    def add_farms(self, count):
+        offset = Farm.objects.count()
+        for i in range(offset, offset + count):
+            Farm.objects.create(name=f'Ферма {i}', owner=self.user, organization=self.organization)
+
+    def add_device_models(self, count):
+        offset = DeviceModel.objects.count()
+        for i in range(offset, offset + count):
+            DeviceModel.objects.create(name=f'M-{i}', manufacturer='Acme', device_type='sensor')
+
+    def test_org_farms(self):
+        self.assertQueryBudget(reverse('ext_org_farms'), 2, self.add_farms, {'organization': self.organization.slug})
+
+    def test_org_farm_zones(self):
+        self.assertQueryBudget(reverse('ext_org_zones'), 2, self.add_zones, {'farm': self.farm.slug})
+
+    def test_zone_devices(self):
+        self.assertQueryBudget(reverse('devices_zones'), 1, self.add_devices, {'zone': self.zone.name})
+
+    def test_device_info(self):
+        self.assertQueryBudget(reverse('device_info', kwargs={'pk': self.gateway.pk}), 1, self.add_devices)
+
+    def test_device_models(self):
+        self.assertQueryBudget(reverse('device_models'), 1, self.add_device_models)
+
+    def test_zone_devices_payload(self):
+        self.add_devices(1)
+        response = self.client.get(reverse('devices_zones'), {'zone': self.zone.name})
+        device = response.json()['results'][0]
+
+        self.assertEqual(device['gateway_name'], 'Шлюз')
+        self.assertEqual(device['added_by_name'], 'Иван Петров')
+        self.assertEqual(device['farm_slug'], self.farm.slug)
+        self.assertEqual(device['device_zone'], 'Теплица 1')
+        self.assertEqual(device['model']['name'], 'T-1')
+
+    def test_zone_devices_paginated_by_default(self):
+        """Список отдаётся страницами и без параметров; next ведёт по всем строкам."""
+        self.add_devices(5)
+        response = self.client.get(reverse('devices_zones'), {'zone': self.zone.name})
+        self.assertEqual(len(response.json()['results']), 5)
+        self.assertIsNone(response.json()['next'])
+
+        serials = []
+        page = self.client.get(reverse('devices_zones'), {'zone': self.zone.name, 'page_size': 2}).json()
+        while True:
+            self.assertLessEqual(len(page['results']), 2)
+            serials += [device['serial_number'] for device in page['results']]
+            if page['next'] is None:
+                break
+            page = self.client.get(page['next']).json()
+        expected = Device.objects.filter(location__zone=self.zone).order_by('pk')
+        self.assertEqual(serials, list(expected.values_list('serial_number', flat=True)))
+
+    def test_zone_devices_sparse_fields(self):
+        """?fields= оставляет только перечисленные поля, связь без ?expand= отдаётся ключом."""
+        self.add_devices(1)
+        params = {'zone': self.zone.name, 'fields': 'id,model,device_zone'}
+
+        device = self.client.get(reverse('devices_zones'), params).json()['results'][0]
+        self.assertEqual(set(device), {'id', 'model', 'device_zone'})
+        self.assertEqual(device['model'], self.device_model.pk)
+
+        device = self.client.get(reverse('devices_zones'), {**params, 'expand': 'model'}).json()['results'][0]
+        self.assertEqual(device['model']['name'], 'T-1')
+
+    def test_zone_devices_match_serializer(self):
+        """Список из values() совпадает с выводом ZoneDevicesSerializer."""
+        self.add_devices(3)
+        Device.objects.filter(name='Датчик 2').update(added_by=None, gateway_device=None, model=None)
+        devices = Device.objects.filter(location__zone=self.zone)
+
+        for params in ({}, {'fields': 'id,model,added_by_name'}, {'fields': 'id,model', 'expand': 'model'}):
+            response = self.client.get(reverse('devices_zones'), {'zone': self.zone.name, **params})
+            request = Request(APIRequestFactory().get('/', params))
+            expected = ZoneDevicesSerializer(devices, many=True, context={'request': request}).data
+            self.assertEqual(response.json()['results'], json.loads(JSONRenderer().render(expected)))
+
+    def test_topology_hides_inaccessible_farms(self):
+        stranger = CustomUser.objects.create(phone_number='9000000001', email='stranger@example.com')
+        other_farm = Farm.objects.create(name='Чужая ферма', owner=stranger)
+        child = Device.objects.create(
+            name='Датчик', farm=self.farm, serial_number='SN-1', added_by=self.user, gateway_device=self.gateway
+        )
+        Device.objects.create(
+            name='Чужой датчик', farm=other_farm, serial_number='SN-2', added_by=stranger, gateway_device=self.gateway
+        )
+        foreign_gateway = Device.objects.create(
+            name='Чужой шлюз', farm=other_farm, serial_number='GW-1', added_by=stranger
+        )
+        Device.objects.filter(pk=self.gateway.pk).update(gateway_device=foreign_gateway)
+
+        url = reverse('device_topology', kwargs={'pk': self.gateway.pk})
+        tree = self.client.get(url).json()['tree']
+        self.assertEqual(tree['child_count'], 1)
+        self.assertEqual([node['id'] for node in tree['children']], [child.id])
+
+        path = self.client.get(url, {'direction': 'path'}).json()['path']
+        self.assertEqual([node['id'] for node in path], [self.gateway.id])
+
+
+class BulkUpdateDevicesTests(APITestCase):
+    """
+    Проверяет, что массовое изменение затрагивает только управляемые
+    пользователем фермы и не раскрывает существование чужих устройств.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = CustomUser.objects.create(phone_number='9000000000', email='owner@example.com')
+        cls.viewer = CustomUser.objects.create(phone_number='9000000001', email='viewer@example.com')
+        cls.org_admin = CustomUser.objects.create(phone_number='9000000002', email='admin@example.com')
+        cls.organization = ExternalOrganization.objects.create(name='Агро')
+        ExternalOrganizationMembership.objects.create(
+            user=cls.org_admin,
+            organization=cls.organization,
+            role=ExternalOrganizationMembership.Role.ADMIN,
+            status=ExternalOrganizationMembership.Status.APPROVED,
+        )
+
+        cls.farm = Farm.objects.create(name='Ферма', owner=cls.owner, organization=cls.organization)
+        cls.other_farm = Farm.objects.create(name='Чужая ферма', owner=cls.viewer)
+        FarmMembership.objects.create(user=cls.viewer, farm=cls.farm, role=FarmMembership.Role.VIEWER)
+        cls.device = Device.objects.create(name='Датчик', farm=cls.farm, serial_number='SN-1', added_by=cls.owner)
+        cls.foreign_device = Device.objects.create(
+            name='Чужой датчик', farm=cls.other_farm, serial_number='SN-2', added_by=cls.viewer
+        )
+
+    def bulk_update(self, user, data):
+        self.client.force_authenticate(user)
+        return self.client.post(reverse('bulk_update_devices'), data, format='json')
+
+    def test_foreign_and_missing_devices_look_the_same(self):
+        missing_id = Device.objects.order_by('-pk').values_list('pk', flat=True).first() + 1
+        foreign = self.bulk_update(self.owner, {'ids': [self.foreign_device.pk], 'is_active': False})
+        missing = self.bulk_update(self.owner, {'ids': [missing_id], 'is_active': False})
+
+        self.assertEqual(foreign.status_code, 400)
+        self.assertEqual(missing.status_code, 400)
+        self.assertEqual(foreign.json(), {'ids': [f'Устройства не найдены: [{self.foreign_device.pk}]']})
+        self.assertEqual(missing.json(), {'ids': [f'Устройства не найдены: [{missing_id}]']})
+        self.assertTrue(Device.objects.get(pk=self.foreign_device.pk).is_active)
+
+    def test_viewer_cannot_update(self):
+        response = self.bulk_update(self.viewer, {'ids': [self.device.pk], 'is_active': False})
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(Device.objects.get(pk=self.device.pk).is_active)
+
+    def test_organization_admin_can_update(self):
+        response = self.bulk_update(self.org_admin, {'ids': [self.device.pk], 'firmware_version': '2.0'})
+        self.assertEqual(response.json(), {'updated': 1})
+        self.assertEqual(Device.objects.get(pk=self.device.pk).firmware_version, '2.0')
+
+    def test_move_to_unmanaged_farm_rejected(self):
+        response = self.bulk_update(self.owner, {'ids': [self.device.pk], 'farm': self.other_farm.slug})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('farm', response.json())
+        self.assertEqual(Device.objects.get(pk=self.device.pk).farm_id, self.farm.pk)
@@ -1,17 +1,26 @@
 from django.urls import path
 
 from .views import OrgFarmsListView, OrgFarmZonesListView, FarmZonesDevicesAPIView, DeviceModelsAPIView, \
-    AddDeviceAPIView, AddDeviceLocationAPIView, UpdateDeviceAPIView, UpdateDeviceLocationAPIView, DeviceInfoAPIView
+    AddDeviceAPIView, AddDeviceLocationAPIView, UpdateDeviceAPIView, UpdateDeviceLocationAPIView, DeviceInfoAPIView, \
+    ProvisionDevicesAPIView, BulkUpdateDevicesAPIView, DeviceTopologyAPIView, DevicesInBBoxAPIView, \
+    NearestDevicesAPIView, MaintenanceDueAPIView, DeviceSecretAPIView
 
 urlpatterns = [
     path('org_farms/', OrgFarmsListView.as_view(), name='ext_org_farms'),
     path('org_farms_zones/', OrgFarmZonesListView.as_view(), name='ext_org_zones'),
     path('zones_devices/', FarmZonesDevicesAPIView.as_view(), name='devices_zones'),
     path('device/<int:pk>/', DeviceInfoAPIView.as_view(), name='device_info'),
+    path('device/<int:pk>/topology/', DeviceTopologyAPIView.as_view(), name='device_topology'),
+    path('device/<int:pk>/secret/', DeviceSecretAPIView.as_view(), name='device_secret'),
     path('device_models/', DeviceModelsAPIView.as_view(), name='device_models'),
     path('add_device/', AddDeviceAPIView.as_view(), name='add_device'),
     path('add_device_location/', AddDeviceLocationAPIView.as_view(), name='add_device_location'),
     path('update_device/<int:pk>/', UpdateDeviceAPIView.as_view(), name='update_device'),
     path('update_device_location/<int:pk>/', UpdateDeviceLocationAPIView.as_view(), name='update_device_location'),
+    path('provision_devices/', ProvisionDevicesAPIView.as_view(), name='provision_devices'),
+    path('locations/bbox/', DevicesInBBoxAPIView.as_view(), name='devices_in_bbox'),
+    path('locations/nearest/', NearestDevicesAPIView.as_view(), name='nearest_devices'),
+    path('maintenance_due/', MaintenanceDueAPIView.as_view(), name='maintenance_due_devices'),
+    path('bulk_update/', BulkUpdateDevicesAPIView.as_view(), name='bulk_update_devices'),
 
 ]
\ No newline at end of file
@@ -1,44 +1,63 @@
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q, Subquery
+from django.shortcuts import get_object_or_404
 from rest_framework import status
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
 
 from rest_framework.generics import RetrieveUpdateAPIView, UpdateAPIView, RetrieveAPIView, ListAPIView, CreateAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from dashboard.geohash import bbox_cells, haversine_km, radius_bbox, split_antimeridian
 from dashboard.models import DeviceModel, Device, Zone, DeviceLocation
+from dashboard.provisioning import ProvisioningError, parse_csv, provision_devices, update_devices
+from dashboard.topology import get_path_to_root, get_subtree
 from users.models import Farm, ExternalOrganization, ExternalOrganizationMembership, FarmMembership
+from ..memberships import accessible_farm_filter, get_farm_membership, get_org_role
+from ..async_views import AsyncListAPIView, AsyncRetrieveAPIView
+from ..mixins import SparseFieldsViewMixin, VersionedResponseCacheMixin
+from ..values_serializers import ValuesListMixin
 from .serializers import OrgFarmsSerializer, OrgFarmZonesSerializer, ZoneDevicesSerializer, DeviceModelSerializer, \
-    AddDeviceSerializer, DeviceLocationSerializer
+    AddDeviceSerializer, DeviceLocationSerializer, BulkDeviceUpdateSerializer, DeviceTopologySerializer, \
+    DeviceMapSerializer, NearestDeviceSerializer, MaintenanceDueDeviceSerializer, ZoneDevicesValuesSerializer
+
 
+def devices_with_relations():
+    """Устройства со всеми связями, которые читает ZoneDevicesSerializer, в одном запросе."""
+    return ZoneDevicesSerializer.optimize_queryset(Device.objects.all(), None)
 
-class OrgFarmsListView(ListAPIView):
+
+class OrgFarmsListView(SparseFieldsViewMixin, ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = OrgFarmsSerializer
 
     def get_queryset(self):
-        org = ExternalOrganization.objects.filter(slug=self.request.query_params.get('organization')).first()
-        org_membership = ExternalOrganizationMembership.objects.filter(organization=org, user=self.request.user).first()
-        if org_membership.role =='admin':
+        if get_org_role(self.request, self.request.query_params.get('organization')) == 'admin':
             return Farm.objects.filter(organization__slug=self.request.query_params.get('organization'))
         else:
             return Farm.objects.filter(organization__slug=self.request.query_params.get('organization'), farmmembership__user = self.request.user)
 
 
-class OrgFarmZonesListView(ListAPIView):
+class OrgFarmZonesListView(SparseFieldsViewMixin, ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = OrgFarmZonesSerializer
 
     def get_queryset(self):
         return Zone.objects.filter(farm__slug=self.request.query_params.get('farm'))
 
-class FarmZonesDevicesAPIView(ListAPIView):
+class FarmZonesDevicesAPIView(ValuesListMixin, SparseFieldsViewMixin, AsyncListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = ZoneDevicesSerializer
+    values_serializer_class = ZoneDevicesValuesSerializer
 
     def get_queryset(self):
-        return Device.objects.filter(location__zone = Zone.objects.filter(name=self.request.query_params.get('zone')).first())
+        zone = Zone.objects.filter(name=self.request.query_params.get('zone')).values('id')[:1]
+        return Device.objects.filter(location__zone=Subquery(zone))
 
-class DeviceInfoAPIView(RetrieveAPIView):
+class DeviceInfoAPIView(SparseFieldsViewMixin, AsyncRetrieveAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = ZoneDevicesSerializer
     lookup_field = 'id'
@@ -46,10 +65,11 @@ class DeviceInfoAPIView(RetrieveAPIView):
     queryset = Device.objects.all()
 
 
-class DeviceModelsAPIView(ListAPIView):
+class DeviceModelsAPIView(VersionedResponseCacheMixin, SparseFieldsViewMixin, ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = DeviceModelSerializer
     queryset = DeviceModel.objects.all()
+    cache_versions = ('device_models',)
 
 class AddDeviceAPIView(CreateAPIView):
     permission_classes = [IsAuthenticated]
@@ -64,7 +84,7 @@ class UpdateDeviceAPIView(RetrieveUpdateAPIView):
     serializer_class = ZoneDevicesSerializer
     lookup_url_kwarg = 'pk'
     lookup_field = 'id'
-    queryset = Device.objects.all()
+    queryset = devices_with_relations()
 
 class UpdateDeviceLocationAPIView(RetrieveUpdateAPIView):
     permission_classes = [IsAuthenticated]
@@ -74,16 +94,303 @@ class UpdateDeviceLocationAPIView(RetrieveUpdateAPIView):
     queryset = DeviceLocation.objects.all()
 
 
+class ProvisionDevicesAPIView(APIView):
+    """
+    Массовое добавление устройств на ферму ?farm=<slug>.
+
+    Принимает JSON-список устройств, CSV-файл в поле file (multipart) или
+    CSV в теле запроса (Content-Type: text/csv). Формат строк описан в
+    dashboard.provisioning.provision_devices. Пакет либо добавляется целиком,
+    либо отклоняется с 400 и списком ошибок по строкам. В ответе — секреты
+    подключения новых устройств, повторно их получить нельзя (только
+    перевыпустить через DeviceSecretAPIView).
+    Доступно владельцу и администраторам фермы.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get_rows(self, request):
+        if request.content_type.startswith('text/csv'):
+            return parse_csv(request.body.decode('utf-8-sig'))
+
+        upload = request.FILES.get('file')
+        if upload is not None:
+            return parse_csv(upload.read().decode('utf-8-sig'))
+
+        if not isinstance(request.data, list) or not all(isinstance(row, dict) for row in request.data):
+            raise ValidationError({'error': 'Ожидается список устройств или CSV-файл'})
+        return request.data
+
+    def post(self, request, *args, **kwargs):
+        farm_slug = request.query_params.get('farm')
+        membership = get_farm_membership(request, farm_slug)
+        if not membership or membership['role'] not in (FarmMembership.Role.OWNER, FarmMembership.Role.ADMIN):
+            raise PermissionDenied('Добавлять устройства могут только владелец и администраторы фермы')
+        farm = get_object_or_404(Farm, slug=farm_slug)
+
+        rows = self.get_rows(request)
+        if not rows:
+            raise ValidationError({'error': 'Пустой пакет'})
+
+        try:
+            devices = provision_devices(farm, rows, added_by=request.user)
+        except ProvisioningError as error:
+            return Response({'errors': error.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            {
+                'created': len(devices),
+                'ids': [device.id for device in devices],
+                'secrets': {device.serial_number: device.secret for device in devices},
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class DeviceSecretAPIView(APIView):
+    """
+    Перевыпуск секрета подключения устройства (ws/device/<id>/).
+
+    Прежний секрет перестаёт действовать сразу; новый возвращается один раз.
+    Доступно владельцу и администраторам фермы устройства.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk, *args, **kwargs):
+        device = get_object_or_404(Device.objects.select_related('farm'), pk=pk)
+        membership = get_farm_membership(request, device.farm.slug)
+        if not membership or membership['role'] not in (FarmMembership.Role.OWNER, FarmMembership.Role.ADMIN):
+            raise PermissionDenied('Выдавать секреты устройств могут только владелец и администраторы фермы')
+
+        secret = device.issue_secret()
+        device.save(update_fields=['secret_hash', 'updated_at'])
+        return Response({'id': device.id, 'secret': secret})
 
 
+class BulkUpdateDevicesAPIView(APIView):
+    """
+    Массовое изменение устройств: перенос между зонами и фермами, активность,
+    версия прошивки и данные обслуживания (см. BulkDeviceUpdateSerializer).
 
+    Изменения применяются несколькими UPDATE по всему набору. Изменять можно
+    только устройства ферм, где пользователь владелец или администратор, и
+    ферм организаций, где он администратор; переносить — только на такие
+    фермы. Устройства чужих ферм не отличаются в ответе от несуществующих.
+    """
+    permission_classes = [IsAuthenticated]
 
+    def post(self, request, *args, **kwargs):
+        serializer = BulkDeviceUpdateSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        changes = dict(serializer.validated_data)
+        device_ids = changes.pop('ids')
 
+        return Response({'updated': update_devices(device_ids, changes)})
 
 
+class DeviceTopologyAPIView(APIView):
+    """
+    Топология шлюзов для устройства одним рекурсивным запросом.
 
+    ?direction=subtree (по умолчанию) — вложенное дерево устройств,
+    подключённых через данное (поле children у каждого узла);
+    ?direction=path — список шлюзов от корня до данного устройства.
+    У узлов есть число дочерних устройств (child_count) и последний статус
+    (online, last_seen). Доступно участникам фермы устройства и
+    администраторам её организации; устройства ферм, недоступных
+    пользователю, в дерево и путь не попадают и не учитываются в child_count.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def check_device_access(self, pk):
+        device = Device.objects.filter(pk=pk).values('farm__slug', 'farm__organization__slug').first()
+        if device is None:
+            raise NotFound('Устройство не найдено')
+
+        if get_farm_membership(self.request, device['farm__slug']):
+            return
+        if get_org_role(self.request, device['farm__organization__slug']) != ExternalOrganizationMembership.Role.ADMIN:
+            raise PermissionDenied('Нет доступа к устройству')
+
+    @staticmethod
+    def build_tree(nodes):
+        root, *descendants = nodes
+        by_id = {root['id']: {**root, 'children': []}}
+        for node in descendants:
+            parent = by_id.get(node['gateway_device'])
+            # Повтор узла возможен только при циклической ссылке
+            if parent is None or node['id'] in by_id:
+                continue
+            by_id[node['id']] = {**node, 'children': []}
+            parent['children'].append(by_id[node['id']])
+        return by_id[root['id']]
+
+    def get(self, request, pk, *args, **kwargs):
+        self.check_device_access(pk)
+        direction = request.query_params.get('direction', 'subtree')
+
+        farm_ids = Farm.objects.filter(accessible_farm_filter(request.user)).values_list('id', flat=True)
+
+        if direction == 'path':
+            path = DeviceTopologySerializer(get_path_to_root(pk, farm_ids), many=True).data
+            return Response({'direction': direction, 'path': path})
+        if direction == 'subtree':
+            nodes = DeviceTopologySerializer(get_subtree(pk, farm_ids), many=True).data
+            return Response({'direction': direction, 'tree': self.build_tree(nodes)})
+
+        raise ValidationError({'direction': 'Ожидается subtree или path'})
+
+
+MAX_MAP_DEVICES = 1000
+MAX_NEAREST = 100
+# Половина длины окружности Земли: дальше искать некуда
+MAX_SEARCH_RADIUS_KM = 20038
+
+
+def bbox_filter(south, west, north, east):
+    """
+    Условие «местоположение внутри области».
+
+    Кандидаты отбираются по префиксам geohash ячеек, покрывающих область
+    (индекс по DeviceLocation.geohash), затем точно — по координатам.
+    """
+    condition = Q()
+    for box_south, box_west, box_north, box_east in split_antimeridian(south, west, north, east):
+        box = Q(latitude__range=(box_south, box_north), longitude__range=(box_west, box_east))
+        cells = bbox_cells(box_south, box_west, box_north, box_east)
+        if cells is not None:
+            box &= reduce(or_, (Q(geohash__startswith=cell) for cell in cells))
+        condition |= box
+    return condition
+
+
+def nearest_locations(queryset, latitude, longitude, k, radius_km=0.5):
+    """
+    k ближайших к точке местоположений.
+
+    Радиус поиска увеличивается вчетверо, пока в нём не окажется k точек;
+    на каждом шаге выполняется один запрос по области, содержащей круг.
+    Точки вне круга отбрасываются, поэтому найденные k — действительно
+    ближайшие.
+    """
+    while True:
+        candidates = queryset.filter(bbox_filter(*radius_bbox(latitude, longitude, radius_km)))
+        within = []
+        for location in candidates:
+            location.distance_km = haversine_km(latitude, longitude, location.latitude, location.longitude)
+            if location.distance_km <= radius_km:
+                within.append(location)
+
+        if len(within) >= k or radius_km >= MAX_SEARCH_RADIUS_KM:
+            return sorted(within, key=lambda location: location.distance_km)[:k]
+        radius_km *= 4
+
+
+def _float_param(request, name, low, high):
+    try:
+        value = float(request.query_params[name])
+    except (KeyError, ValueError):
+        raise ValidationError({name: 'Ожидается число'})
+    if not low <= value <= high:
+        raise ValidationError({name: f'Ожидается значение от {low} до {high}'})
+    return value
+
+
+def _int_param(request, name, default, maximum):
+    try:
+        return min(max(int(request.query_params.get(name, default)), 1), maximum)
+    except ValueError:
+        raise ValidationError({name: 'Ожидается целое число'})
+
+
+class MapLocationsMixin:
+    """Местоположения устройств, доступных пользователю (?farm=<slug> — одной фермы)."""
+
+    def get_locations(self):
+        queryset = (
+            DeviceLocation.objects
+            .filter(accessible_farm_filter(self.request.user, prefix='device__farm__'))
+            .select_related('device')
+        )
+        farm = self.request.query_params.get('farm')
+        if farm:
+            queryset = queryset.filter(device__farm__slug=farm)
+        return queryset
+
+
+class DevicesInBBoxAPIView(MapLocationsMixin, APIView):
+    """
+    Устройства в видимой области карты.
+
+    Параметры: south, west, north, east (west > east — область через
+    антимеридиан), farm, limit (не более MAX_MAP_DEVICES).
+    """
+    permission_classes = [IsAuthenticated]
 
+    def get(self, request, *args, **kwargs):
+        south = _float_param(request, 'south', -90, 90)
+        north = _float_param(request, 'north', -90, 90)
+        west = _float_param(request, 'west', -180, 180)
+        east = _float_param(request, 'east', -180, 180)
+        if south > north:
+            raise ValidationError({'south': 'south должен быть не больше north'})
+        limit = _int_param(request, 'limit', MAX_MAP_DEVICES, MAX_MAP_DEVICES)
 
+        locations = self.get_locations().filter(bbox_filter(south, west, north, east)).order_by('pk')[:limit]
+        return Response(DeviceMapSerializer(locations, many=True).data)
 
 
+class NearestDevicesAPIView(MapLocationsMixin, APIView):
+    """
+    Ближайшие к точке устройства.
+
+    Параметры: lat, lon, k (по умолчанию 10, не более MAX_NEAREST), farm.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        latitude = _float_param(request, 'lat', -90, 90)
+        longitude = _float_param(request, 'lon', -180, 180)
+        k = _int_param(request, 'k', 10, MAX_NEAREST)
+
+        locations = nearest_locations(self.get_locations(), latitude, longitude, k)
+        return Response(NearestDeviceSerializer(locations, many=True).data)
+
+
+MAX_MAINTENANCE_DAYS = 365
+
+
+class MaintenanceDueAPIView(SparseFieldsViewMixin, ListAPIView):
+    """
+    Устройства, обслуживание которых просрочено или наступит в ближайшие
+    days дней (по умолчанию 0 — только просроченные), по ферме ?farm=<slug>
+    или организации ?organization=<slug>.
+
+    Выборка — диапазон по Device.maintenance_due_date с индексом
+    (farm, maintenance_due_date, id); страницы курсорные, отсортированы по
+    дате обслуживания. Доступны только фермы пользователя и фермы
+    организаций, где он администратор.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = MaintenanceDueDeviceSerializer
+
+    def get_queryset(self):
+        params = self.request.query_params
+        try:
+            days = min(max(int(params.get('days', 0)), 0), MAX_MAINTENANCE_DAYS)
+        except ValueError:
+            raise ValidationError({'days': 'Ожидается целое число'})
+
+        if params.get('farm'):
+            scope = Q(farm__slug=params['farm'])
+        elif params.get('organization'):
+            scope = Q(farm__organization__slug=params['organization'])
+        else:
+            raise ValidationError({'farm': 'Укажите ферму или организацию'})
+
+        return (
+            Device.objects
+            .filter(scope, accessible_farm_filter(self.request.user, prefix='farm__'))
+            .maintenance_due(days)
+            .order_by('maintenance_due_date', 'id')
+        )
 
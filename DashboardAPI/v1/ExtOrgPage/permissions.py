@@ -1,7 +1,8 @@
-from django.db.models import Q
 from rest_framework import permissions
 
-from users.models import ExternalOrganizationMembership, ExternalOrganization
+from users.models import ExternalOrganizationMembership
+from ..memberships import get_org_membership
+
 
 class IsOrganizationMember(permissions.BasePermission):
     """
@@ -11,21 +12,14 @@ class IsOrganizationMember(permissions.BasePermission):
     def has_permission(self, request, view):
         organization_slug = request.query_params.get('slug') or request.query_params.get('organization')
 
-        if not organization_slug:
-            return False
-
-        return request.user.organization_memberships.filter(
-            organization=ExternalOrganization.objects.get(slug=organization_slug),
-            status=ExternalOrganizationMembership.Status.APPROVED
-        ).exists()
+        membership = get_org_membership(request, organization_slug)
+        return bool(membership) and membership['status'] == ExternalOrganizationMembership.Status.APPROVED
 
     def has_object_permission(self, request, view, obj):
         organization = obj.organization if hasattr(obj, 'organization') else obj
 
-        return request.user.organization_memberships.filter(
-            organization=organization,
-            status=ExternalOrganizationMembership.Status.APPROVED
-        ).exists()
+        membership = get_org_membership(request, organization.slug)
+        return bool(membership) and membership['status'] == ExternalOrganizationMembership.Status.APPROVED
 
 
 class IsOrganizationAdmin(permissions.BasePermission):
@@ -37,20 +31,17 @@ class IsOrganizationAdmin(permissions.BasePermission):
             or request.query_params.get('organization')
         )
 
-        if not organization_slug:
-            return False
-
-        return request.user.organization_memberships.filter(
-            organization=ExternalOrganization.objects.get(slug=organization_slug),
-            status=ExternalOrganizationMembership.Status.APPROVED,
-            role=ExternalOrganizationMembership.Role.ADMIN
-                ).exists()
+        return self.is_admin(get_org_membership(request, organization_slug))
 
     def has_object_permission(self, request, view, obj):
         organization = obj.organization if hasattr(obj, 'organization') else obj
 
-        return request.user.organization_memberships.filter(
-            organization=organization,
-            status=ExternalOrganizationMembership.Status.APPROVED,
-            role=ExternalOrganizationMembership.Role.ADMIN
-        ).exists()
\ No newline at end of file
+        return self.is_admin(get_org_membership(request, organization.slug))
+
+    @staticmethod
+    def is_admin(membership):
+        return (
+            bool(membership)
+            and membership['status'] == ExternalOrganizationMembership.Status.APPROVED
+            and membership['role'] == ExternalOrganizationMembership.Role.ADMIN
+        )
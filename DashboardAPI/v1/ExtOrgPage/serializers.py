@@ -4,8 +4,10 @@ from users.models import (
     ExternalOrganizationMembership,
     ExternalOrganization,
     Farm,
-    FarmMembership,
 )
+from ..memberships import get_farm_membership
+from ..mixins import SparseFieldsSerializerMixin
+from ..UserPages.serializers import FarmHealthSerializer
 
 
 class ExternalOrganizationSerializer(serializers.ModelSerializer):
@@ -46,7 +48,7 @@ class ExternalOrganizationUserSerializer(serializers.ModelSerializer):
         ]
 
 
-class ExternalOrganizationUsersSerializer(serializers.ModelSerializer):
+class ExternalOrganizationUsersSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     updated_at = serializers.DateTimeField(format="%d.%m.%Y %H:%M")
     user = ExternalOrganizationUserSerializer()
 
@@ -64,12 +66,15 @@ class ExternalOrganizationUsersSerializer(serializers.ModelSerializer):
             'user',
             'updated_at',
         ]
+        select_related = {'user': ['user']}
 
     def to_representation(self, instance):
         representation = super().to_representation(instance)
         request_user_role = self.context.get('request_user_role')
         request_user_phone_number = self.context.get('request_user_phone_number')
-        user_data = representation.get('user', {})
+        user_data = representation.get('user')
+        if not isinstance(user_data, dict):
+            return representation
 
         if (
             request_user_phone_number
@@ -86,9 +91,10 @@ class ExternalOrganizationUsersSerializer(serializers.ModelSerializer):
         return representation
 
 
-class ExtOrgFarmSerializer(serializers.ModelSerializer):
+class ExtOrgFarmSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     updated_at = serializers.DateTimeField(format="%d.%m.%Y %H:%M", read_only=True)
     owner_full_name = serializers.SerializerMethodField()
+    health = FarmHealthSerializer(read_only=True)
 
     class Meta:
         model = Farm
@@ -100,35 +106,47 @@ class ExtOrgFarmSerializer(serializers.ModelSerializer):
             'owner_full_name',
             'owner',
             'organization',
+            'health',
         ]
+        select_related = {'owner_full_name': ['owner'], 'health': ['health']}
 
     @staticmethod
     def get_owner_full_name(obj):
         return f"{obj.owner.first_name} {obj.owner.last_name}"
 
+    def is_farm_member(self, instance):
+        """
+        Состоит ли текущий пользователь в ферме.
+
+        Список ферм аннотирует роль пользователя (role), поэтому членство
+        определяется без запроса. Для экземпляров без аннотации (например,
+        только что созданной фермы) членство берётся из get_farm_membership.
+        """
+        if hasattr(instance, 'role'):
+            return instance.role is not None
+
+        return get_farm_membership(self.context['request'], instance.slug) is not None
+
     def to_representation(self, instance):
         representation = super().to_representation(instance)
 
-        representation['role'] = instance.role if hasattr(instance, 'role') else None
+        requested_fields, _ = self.get_sparse_params(self.context.get('request'))
+        if requested_fields is None or 'role' in requested_fields:
+            representation['role'] = instance.role if hasattr(instance, 'role') else None
 
         request_user_role = self.context.get('request_user_role')
-        user_phone_number = self.context.get('user_phone_number')
-
-        user_farm_role = FarmMembership.objects.filter(
-            farm=instance,
-            user__phone_number=user_phone_number
-        ).first()
 
         if request_user_role in ['admin', 'manager']:
             return representation
 
-        if not user_farm_role:
+        if not self.is_farm_member(instance):
             fields_to_remove = [
                 'created_at',
                 'updated_at',
                 'slug',
                 'owner_full_name',
                 'owner',
+                'health',
             ]
             for field in fields_to_remove:
                 representation.pop(field, None)
@@ -1,3 +1,78 @@
-from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from DashboardAPI.v1.testing import QueryBudgetTestCase
+from users.models import CustomUser, ExternalOrganizationMembership, Farm, FarmMembership
+
+
+class ExtOrgFarmsQueryBudgetTests(QueryBudgetTestCase):
+    """
+    Проверяет, что список ферм организации выполняется за фиксированное
+    число запросов, не зависящее от количества ферм.
+    """
+
+    budget = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.owner = cls.user
+        cls.member = CustomUser.objects.create(
+            phone_number='9000000001',
+            email='member@example.com',
+            first_name='Анна',
+            last_name='Смирнова',
+            is_active=True,
+        )
+        ExternalOrganizationMembership.objects.create(
+            user=cls.member,
+            organization=cls.organization,
+            role=ExternalOrganizationMembership.Role.MEMBER,
+            status=ExternalOrganizationMembership.Status.APPROVED,
+        )
+
+    def add_farms(self, count):
+        offset = Farm.objects.count()
+        for i in range(offset, offset + count):
+            farm = Farm.objects.create(name=f'Ферма {i}', owner=self.owner, organization=self.organization)
+            if i % 2:
+                FarmMembership.objects.create(user=self.member, farm=farm, role=FarmMembership.Role.VIEWER)
+
+    def assertFarmsBudget(self, user):
+        self.client.force_authenticate(user)
+        self.assertQueryBudget(
+            reverse('external_organization_farms'),
+            self.budget,
+            self.add_farms,
+            {'organization': self.organization.slug},
+        )
+
+    def test_admin(self):
+        self.assertFarmsBudget(self.owner)
+
+    def test_member(self):
+        self.assertFarmsBudget(self.member)
+
+    def test_member_visibility(self):
+        self.add_farms(2)
+        self.client.force_authenticate(self.member)
+        response = self.client.get(
+            reverse('external_organization_farms'),
+            {'organization': self.organization.slug, 'ordering': 'name'},
+        )
+        hidden, visible = response.json()['results']
+
+        self.assertIsNone(hidden['role'])
+        self.assertNotIn('owner_full_name', hidden)
+        self.assertEqual(visible['role'], FarmMembership.Role.VIEWER)
+        self.assertEqual(visible['owner_full_name'], 'Иван Петров')
+
+    def test_membership_cache_invalidation(self):
+        self.client.force_authenticate(self.member)
+        url = reverse('external_organization_farms')
+        params = {'organization': self.organization.slug}
+        self.assertEqual(self.client.get(url, params).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ExternalOrganizationMembership.objects.filter(user=self.member).get().delete()
+
+        self.assertEqual(self.client.get(url, params).status_code, 403)
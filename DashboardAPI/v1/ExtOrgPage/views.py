@@ -25,10 +25,12 @@ from users.models import (
     ExternalOrganization,
     Farm, FarmMembership,
 )
+from ..memberships import get_org_role
+from ..mixins import ConditionalGetMixin, SparseFieldsViewMixin
 from ..UserPages.filters import ExternalOrganizationFilterBackend
 
 
-class ExternalOrganizationAPIView(RetrieveUpdateDestroyAPIView):
+class ExternalOrganizationAPIView(ConditionalGetMixin, RetrieveUpdateDestroyAPIView):
     """API для работы с внешними организациями (получение/обновление/удаление)."""
 
     serializer_class = ExternalOrganizationSerializer
@@ -41,17 +43,17 @@ class ExternalOrganizationAPIView(RetrieveUpdateDestroyAPIView):
             permissions.append(IsOrganizationAdmin())
         return permissions
 
+    def get_validator_queryset(self):
+        return ExternalOrganization.objects.filter(slug=self.request.query_params.get('slug'))
+
+    def get_etag_extra(self):
+        """Набор полей ответа зависит от роли пользователя в организации."""
+        return (get_org_role(self.request, self.request.query_params.get('slug')),)
+
     def get_serializer_context(self):
         """Добавляем request и роль пользователя в контекст сериализатора."""
         context = super().get_serializer_context()
-        slug = self.request.query_params.get('slug')
-
-        membership = ExternalOrganizationMembership.objects.filter(
-            organization__slug=slug,
-            user=self.request.user
-        ).first()
-
-        context['ext_org_role'] = membership.role if membership else None
+        context['ext_org_role'] = get_org_role(self.request, self.request.query_params.get('slug'))
         return context
 
     def get_object(self):
@@ -114,14 +116,18 @@ class ExternalOrganizationRequestUserAPIView(RetrieveAPIView):
         - роль пользователя в организации
         """
         context = super().get_serializer_context()
+        organization_slug = (
+                self.kwargs.get('organization_slug')
+                or self.request.query_params.get('organization')
+        )
         context.update({
             'request_user_phone_number': self.request.user.phone_number,
-            'request_user_role': self.get_object().role if self.get_object() else None
+            'request_user_role': get_org_role(self.request, organization_slug)
         })
         return context
 
 
-class ExternalOrganizationUsersAPIVIew(ListAPIView):
+class ExternalOrganizationUsersAPIVIew(SparseFieldsViewMixin, ListAPIView):
     """API для получения списка пользователей внешней организации."""
     serializer_class = ExternalOrganizationUsersSerializer
     permission_classes = [IsAuthenticated, IsOrganizationMember]
@@ -135,7 +141,6 @@ class ExternalOrganizationUsersAPIVIew(ListAPIView):
         return (
             ExternalOrganizationMembership.objects
             .filter(organization__slug=organization_slug)
-            .select_related('user', 'organization')
             .exclude(user=self.request.user)
         )
 
@@ -143,19 +148,7 @@ class ExternalOrganizationUsersAPIVIew(ListAPIView):
         """Добавляем в контекст роль текущего пользователя в организации."""
         context = super().get_serializer_context()
         organization_slug = self.kwargs.get('organization_slug') or self.request.query_params.get('organization')
-
-        try:
-            context['request_user_role'] = (
-                ExternalOrganizationMembership.objects
-                .filter(
-                    organization__slug=organization_slug,
-                    user=self.request.user
-                )
-                .values_list('role', flat=True)
-                .get()
-            )
-        except ExternalOrganizationMembership.DoesNotExist:
-            context['request_user_role'] = None
+        context['request_user_role'] = get_org_role(self.request, organization_slug)
 
         return context
 
@@ -190,7 +183,7 @@ class ExternalOrganizationMembershipAPIView(RetrieveUpdateDestroyAPIView):
             raise NotFound('Запись не найдена')
 
 
-class ExternalOrganizationFarmsAPIView(ListAPIView):
+class ExternalOrganizationFarmsAPIView(SparseFieldsViewMixin, ListAPIView):
     serializer_class = ExtOrgFarmSerializer
     permission_classes = [IsAuthenticated,IsOrganizationMember]
     filter_backends = [FarmFilterBackend, OrderingFilter]
@@ -201,20 +194,7 @@ class ExternalOrganizationFarmsAPIView(ListAPIView):
         """Добавляем в контекст роль текущего пользователя в организации."""
         context = super().get_serializer_context()
         organization_slug = self.request.query_params.get('organization')
-        context['user_phone_number'] = self.request.user.phone_number
-
-        try:
-            context['request_user_role'] = (
-                ExternalOrganizationMembership.objects
-                .filter(
-                    organization__slug=organization_slug,
-                    user=self.request.user
-                )
-                .values_list('role', flat=True)
-                .get()
-            )
-        except ExternalOrganizationMembership.DoesNotExist:
-            context['request_user_role'] = None
+        context['request_user_role'] = get_org_role(self.request, organization_slug)
 
         return context
 
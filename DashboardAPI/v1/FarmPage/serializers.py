@@ -2,24 +2,31 @@ from rest_framework import serializers
 
 from DashboardAPI.v1.ExtOrgPage.serializers import ExternalOrganizationUserSerializer
 from users.models import Farm, FarmMembership
-from dashboard.models import Zone
+from dashboard.models import Device, SensorData, Zone
+from ..mixins import SparseFieldsSerializerMixin
+from ..values_serializers import ValuesSerializer
 
 
-class FarmSerializer(serializers.ModelSerializer):
+class FarmSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     updated_at = serializers.DateTimeField(format="%d.%m.%Y %H:%M")
     created_at = serializers.DateTimeField(format="%d.%m.%Y %H:%M")
     class Meta:
         model = Farm
         fields = '__all__'
 
-class FarmMembershipsSerializer(serializers.ModelSerializer):
+class FarmMembershipsSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     updated_at = serializers.DateTimeField(format="%d.%m.%Y %H:%M")
     user = ExternalOrganizationUserSerializer()
     class Meta:
         model = FarmMembership
         fields = '__all__'
+        select_related = {'user': ['user']}
 
-class ZoneSerializer(serializers.ModelSerializer):
+
+class FarmMembershipsValuesSerializer(ValuesSerializer):
+    serializer_class = FarmMembershipsSerializer
+
+class ZoneSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     created_at = serializers.DateTimeField(format="%d.%m.%Y %H:%M", read_only=True)
     updated_at = serializers.DateTimeField(format="%d.%m.%Y %H:%M", read_only=True)
 
@@ -29,7 +36,26 @@ class ZoneSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
+class FarmOverviewZoneSerializer(ZoneSerializer):
+    device_count = serializers.IntegerField(read_only=True)
 
+    class Meta(ZoneSerializer.Meta):
+        fields = ZoneSerializer.Meta.fields + ['device_count']
 
 
+class FarmOverviewDeviceSerializer(serializers.ModelSerializer):
+    zone = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Device
+        fields = ['id', 'name', 'serial_number', 'is_active', 'zone']
+
+
+class SensorReadingSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SensorData
+        fields = [
+            'device', 'timestamp', 'temperature', 'humidity', 'soil_moisture',
+            'light_intensity', 'ph_level', 'battery_level',
+        ]
 
@@ -1,3 +1,78 @@
-from django.test import TestCase
+import json
 
-# Create your tests here.
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from DashboardAPI.v1.FarmPage.serializers import FarmMembershipsSerializer
+from DashboardAPI.v1.testing import QueryBudgetTestCase
+
+from users.models import CustomUser, Farm, FarmMembership
+
+
+class FarmMembershipsTests(QueryBudgetTestCase):
+    """
+    Проверяет список участников фермы: фиксированное число запросов и
+    совпадение быстрого вывода из values() с FarmMembershipsSerializer.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.farm = Farm.objects.create(name='Ферма', owner=cls.user, organization=cls.organization)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+
+    def add_members(self, count, farm=None):
+        offset = CustomUser.objects.count()
+        roles = [FarmMembership.Role.ADMIN, FarmMembership.Role.TECHNICIAN, FarmMembership.Role.VIEWER]
+        for i in range(offset, offset + count):
+            user = CustomUser.objects.create(
+                phone_number=f'91{i:08}',
+                email=f'user{i}@example.com',
+                first_name=f'Имя {i}',
+                last_name=f'Фамилия {i:03}',
+                profile_pic=None if i % 2 else f'profile_pics/{i}.png',
+            )
+            FarmMembership.objects.create(user=user, farm=farm or self.farm, role=roles[i % len(roles)])
+
+    def test_farm_users(self):
+        self.assertQueryBudget(reverse('farm_users'), 1, self.add_members, {'slug': self.farm.slug})
+
+    def test_farm_users_scoped_to_farm(self):
+        other_farm = Farm.objects.create(name='Соседняя ферма', owner=self.user)
+        self.add_members(2)
+        self.add_members(2, farm=other_farm)
+
+        response = self.client.get(reverse('farm_users'), {'slug': self.farm.slug, 'ordering': 'user__last_name'})
+        phones = [membership['user']['phone_number'] for membership in response.json()['results']]
+        expected = FarmMembership.objects.filter(farm=self.farm).order_by('user__last_name')
+        self.assertEqual(phones, [membership.user.phone_number for membership in expected])
+        self.assertEqual(len(phones), 3)
+
+    def test_farm_users_match_serializer(self):
+        """Список из values() совпадает с выводом FarmMembershipsSerializer."""
+        self.add_members(6)
+        memberships = FarmMembership.objects.filter(farm=self.farm).order_by('user__last_name')
+
+        for params in ({}, {'fields': 'id,user,role'}, {'fields': 'user,updated_at', 'expand': 'user'}):
+            params = {'slug': self.farm.slug, 'ordering': 'user__last_name', **params}
+            response = self.client.get(reverse('farm_users'), params)
+            request = Request(APIRequestFactory().get('/', params))
+            expected = FarmMembershipsSerializer(memberships, many=True, context={'request': request}).data
+            self.assertEqual(response.json()['results'], json.loads(JSONRenderer().render(expected)))
+
+    def test_overview_reflects_profile_changes(self):
+        url = reverse('farm_overview')
+        memberships = self.client.get(url, {'slug': self.farm.slug}).json()['memberships']
+        self.assertEqual(memberships[0]['user']['last_name'], 'Петров')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.last_name = 'Сидоров'
+            self.user.save()
+
+        memberships = self.client.get(url, {'slug': self.farm.slug}).json()['memberships']
+        self.assertEqual(memberships[0]['user']['last_name'], 'Сидоров')
@@ -9,10 +9,12 @@ from .views import (
     AvailableFarmUsersAPIView,
     FarmZonesAPIView,
     ZoneUpdateAPIView,
-    ZoneCreateAPIView
+    ZoneCreateAPIView,
+    FarmOverviewAPIView
 )
 
 urlpatterns = [
+    path('overview/', FarmOverviewAPIView.as_view(), name='farm_overview'),
     path('main_data/', FarmAPIView.as_view(), name='farm_main_data'),
     path('ext_org/', FarmOrganizationAPIView.as_view(), name='farm_ext_org'),
     path('users/', FarmMembershipsAPIView.as_view(), name='farm_users'),
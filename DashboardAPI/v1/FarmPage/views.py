@@ -1,14 +1,20 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, OuterRef, Subquery
+from rest_framework.exceptions import NotFound, PermissionDenied
 from rest_framework.filters import OrderingFilter
 from rest_framework.generics import ListAPIView, RetrieveUpdateAPIView, RetrieveAPIView, UpdateAPIView, CreateAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework import status
-from django.shortcuts import get_object_or_404
+from django.shortcuts import aget_object_or_404, get_object_or_404
 from django.db import IntegrityError
 
 
 from .serializers import (
-FarmSerializer, FarmMembershipsSerializer, ZoneSerializer
+FarmSerializer, FarmMembershipsSerializer, FarmMembershipsValuesSerializer, ZoneSerializer, FarmOverviewZoneSerializer,
+FarmOverviewDeviceSerializer, SensorReadingSerializer
 )
 from users.models import (
     FarmMembership,
@@ -19,16 +25,26 @@ from users.models import (
 )
 
 from dashboard.models import (
+    Device,
+    SensorData,
     Zone
 )
+from ..cache import farm_version, get_versions
+from ..memberships import get_farm_membership, get_org_role
+from ..async_views import AsyncListAPIView
+from ..mixins import AsyncConditionalGetMixin, ConditionalGetMixin, SparseFieldsViewMixin
+from ..renderers import PreEncoded, encode_json
+from ..values_serializers import ValuesListMixin
 from ..ProfilePage.serializers import CustomUserProfileSerializer
 from ..UserPages.serializers import UserExternalOrganizationSerializer
 
 
-class FarmAPIView(RetrieveUpdateAPIView):
+class FarmAPIView(ConditionalGetMixin, RetrieveUpdateAPIView):
     serializer_class = FarmSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_validator_queryset(self):
+        return Farm.objects.filter(slug=self.request.query_params.get('slug'))
 
     def get_object(self):
         slug = self.request.query_params.get('slug')
@@ -43,8 +59,9 @@ class FarmOrganizationAPIView(RetrieveAPIView):
         return ExternalOrganization.objects.filter(farms__slug=slug).first()
 
 
-class FarmMembershipsAPIView(ListAPIView):
+class FarmMembershipsAPIView(ValuesListMixin, SparseFieldsViewMixin, ListAPIView):
     serializer_class = FarmMembershipsSerializer
+    values_serializer_class = FarmMembershipsValuesSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [OrderingFilter]
     ordering_fields = ['role', 'user__last_name']
@@ -165,13 +182,19 @@ class AvailableFarmUsersAPIView(ListAPIView):
         return org_users.exclude(id__in=farm_users.values_list('id', flat=True))
 
 
-class FarmZonesAPIView(ListAPIView):
+class FarmZonesAPIView(AsyncConditionalGetMixin, SparseFieldsViewMixin, AsyncListAPIView):
     serializer_class = ZoneSerializer
     permission_classes = [IsAuthenticated]
+    use_last_modified = False
+
+    def get_validator_queryset(self):
+        return Zone.objects.filter(farm__slug=self.request.query_params.get('slug'))
 
     def get_queryset(self):
-        farm_slug = self.request.query_params.get('slug')
-        farm = get_object_or_404(Farm, slug=farm_slug)
+        return Zone.objects.filter(farm__slug=self.request.query_params.get('slug'))
+
+    async def aget_queryset(self):
+        farm = await aget_object_or_404(Farm.objects.only('id'), slug=self.request.query_params.get('slug'))
         return Zone.objects.filter(farm=farm)
 
 
@@ -203,5 +226,71 @@ class ZoneCreateAPIView(CreateAPIView):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
+class FarmOverviewAPIView(APIView):
+    """
+    Все данные страницы фермы одним запросом: ферма, организация, участники,
+    зоны с числом устройств, устройства и последние показания каждого датчика.
+
+    Разделы farm, organization, memberships и zones совпадают по формату с
+    ответами main_data/, ext_org/, users/ и zones/. Всё, кроме показаний,
+    собирается фиксированным числом запросов и кэшируется под версией фермы
+    (farm:<id>), которую сигналы увеличивают при изменении фермы, её зон,
+    участников (в том числе их профилей) и устройств. Показания читаются при каждом запросе одним
+    запросом: для каждого устройства фермы последняя запись берётся
+    подзапросом LIMIT 1 по индексу (device, -timestamp), поэтому стоимость
+    зависит от числа устройств, а не от истории показаний.
+
+    Доступно участникам фермы и администраторам её организации.
+    """
+    permission_classes = [IsAuthenticated]
 
+    def get_farm_id(self, slug):
+        membership = get_farm_membership(self.request, slug)
+        if membership:
+            return membership['farm_id']
+
+        farm = Farm.objects.filter(slug=slug).values('id', 'organization__slug').first()
+        if farm is None:
+            raise NotFound('Ферма не найдена')
+        if get_org_role(self.request, farm['organization__slug']) != ExternalOrganizationMembership.Role.ADMIN:
+            raise PermissionDenied('Нет доступа к ферме')
+        return farm['id']
+
+    @staticmethod
+    def build_structure(farm_id) -> dict:
+        farm = Farm.objects.select_related('organization').get(id=farm_id)
+        memberships = FarmMembership.objects.filter(farm_id=farm_id).select_related('user').order_by('role')
+        zones = Zone.objects.filter(farm_id=farm_id).annotate(device_count=Count('devicelocation'))
+        devices = Device.objects.filter(farm_id=farm_id).annotate(zone=F('location__zone_id'))
+
+        return {
+            'farm': FarmSerializer(farm).data,
+            'organization': UserExternalOrganizationSerializer(farm.organization).data,
+            'memberships': FarmMembershipsSerializer(memberships, many=True).data,
+            'zones': FarmOverviewZoneSerializer(zones, many=True).data,
+            'devices': FarmOverviewDeviceSerializer(devices, many=True).data,
+        }
+
+    @staticmethod
+    def latest_readings(farm_id) -> list:
+        latest = SensorData.objects.filter(device_id=OuterRef('pk')).order_by('-timestamp').values('pk')[:1]
+        reading_ids = Device.objects.filter(farm_id=farm_id).values(reading_id=Subquery(latest))
+        readings = SensorData.objects.filter(pk__in=reading_ids).order_by('device_id')
+        return SensorReadingSerializer(readings, many=True).data
+
+    def get(self, request, *args, **kwargs):
+        farm_id = self.get_farm_id(request.query_params.get('slug'))
+
+        version, = get_versions(farm_version(farm_id))
+        key = f"farm_overview:{farm_id}:{version}"
+        # Разделы хранятся в кэше уже закодированными и вставляются в ответ как есть
+        sections = cache.get(key)
+        if sections is None:
+            sections = {name: encode_json(data) for name, data in self.build_structure(farm_id).items()}
+            cache.set(key, sections, settings.RESPONSE_CACHE_TTL)
+
+        return Response({
+            **{name: PreEncoded(content) for name, content in sections.items()},
+            'readings': self.latest_readings(farm_id),
+        })
 
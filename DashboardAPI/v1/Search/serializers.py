@@ -0,0 +1,37 @@
+from rest_framework import serializers
+
+from dashboard.models import Device
+from users.models import CustomUser, ExternalOrganization, Farm
+
+
+class DeviceSearchSerializer(serializers.ModelSerializer):
+    farm_slug = serializers.CharField(source='farm.slug')
+    score = serializers.FloatField()
+
+    class Meta:
+        model = Device
+        fields = ['id', 'name', 'serial_number', 'farm_slug', 'score']
+
+
+class FarmSearchSerializer(serializers.ModelSerializer):
+    score = serializers.FloatField()
+
+    class Meta:
+        model = Farm
+        fields = ['name', 'slug', 'score']
+
+
+class ExternalOrganizationSearchSerializer(serializers.ModelSerializer):
+    score = serializers.FloatField()
+
+    class Meta:
+        model = ExternalOrganization
+        fields = ['name', 'slug', 'score']
+
+
+class UserSearchSerializer(serializers.ModelSerializer):
+    score = serializers.FloatField()
+
+    class Meta:
+        model = CustomUser
+        fields = ['id', 'first_name', 'last_name', 'phone_number', 'score']
@@ -0,0 +1,91 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from dashboard.models import Device
+from users.models import CustomUser, ExternalOrganization, ExternalOrganizationMembership, Farm
+
+
+class SearchAPITests(APITestCase):
+    """
+    Проверяет, что поиск возвращает только доступные пользователю данные и
+    сортирует результаты по сходству.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create(
+            phone_number='9000000000',
+            email='owner@example.com',
+            first_name='Иван',
+            last_name='Петров',
+            is_active=True,
+        )
+        cls.stranger = CustomUser.objects.create(
+            phone_number='9000000001',
+            email='stranger@example.com',
+            first_name='Пётр',
+            last_name='Иванов',
+            is_active=True,
+        )
+        cls.organization = ExternalOrganization.objects.create(name='Агро Север')
+        cls.pending_organization = ExternalOrganization.objects.create(name='Агро Юг')
+        for organization, status in ((cls.organization, ExternalOrganizationMembership.Status.APPROVED),
+                                     (cls.pending_organization, ExternalOrganizationMembership.Status.PENDING)):
+            ExternalOrganizationMembership.objects.create(
+                user=cls.user,
+                organization=organization,
+                role=ExternalOrganizationMembership.Role.ADMIN,
+                status=status,
+            )
+
+        cls.farm = Farm.objects.create(name='Теплица', owner=cls.user)
+        cls.other_farm = Farm.objects.create(name='Теплица соседа', owner=cls.stranger)
+        Device.objects.create(name='Датчик влажности', farm=cls.farm, serial_number='SN-1', added_by=cls.user)
+        Device.objects.create(name='Датчик влажности', farm=cls.other_farm, serial_number='SN-2', added_by=cls.stranger)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def search(self, query, types):
+        response = self.client.get(reverse('search'), {'q': query, 'types': types})
+        self.assertEqual(response.status_code, 200)
+        return response.json()[types]
+
+    def test_farms_and_devices_scoped_to_user(self):
+        self.assertEqual([farm['slug'] for farm in self.search('Теплица', 'farms')], [self.farm.slug])
+        self.assertEqual([device['serial_number'] for device in self.search('влажности', 'devices')], ['SN-1'])
+
+    def test_organization_farms_visible_to_admin(self):
+        farm = Farm.objects.create(name='Теплица организации', owner=self.stranger, organization=self.organization)
+        self.assertIn(farm.slug, [farm['slug'] for farm in self.search('Теплица', 'farms')])
+
+    def test_organizations_require_approved_membership(self):
+        self.assertEqual([organization['name'] for organization in self.search('Агро', 'organizations')], ['Агро Север'])
+
+    def test_users_scoped_to_managed_organizations(self):
+        self.assertNotIn(self.stranger.id, [user['id'] for user in self.search('Иванов', 'users')])
+
+        ExternalOrganizationMembership.objects.create(
+            user=self.stranger,
+            organization=self.organization,
+            role=ExternalOrganizationMembership.Role.MEMBER,
+            status=ExternalOrganizationMembership.Status.APPROVED,
+        )
+        self.assertEqual(self.search('Иванов', 'users')[0]['id'], self.stranger.id)
+
+    def test_ranking_order(self):
+        for name in ('Теплица номер один на севере', 'Теплицы'):
+            Farm.objects.create(name=name, owner=self.user)
+
+        farms = self.search('Теплица', 'farms')
+
+        self.assertEqual(
+            [farm['name'] for farm in farms],
+            ['Теплица', 'Теплицы', 'Теплица номер один на севере'],
+        )
+        scores = [farm['score'] for farm in farms]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_short_query_rejected(self):
+        response = self.client.get(reverse('search'), {'q': 'Те'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,123 @@
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db.models import Q
+from django.db.models.functions import Greatest, Upper
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from dashboard.models import Device
+from users.models import CustomUser, ExternalOrganization, ExternalOrganizationMembership, Farm
+from ..memberships import accessible_farm_filter
+from .serializers import (
+    DeviceSearchSerializer,
+    ExternalOrganizationSearchSerializer,
+    FarmSearchSerializer,
+    UserSearchSerializer,
+)
+
+MIN_QUERY_LENGTH = 3
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+def ranked(queryset, fields, query, limit):
+    """
+    Отбирает строки, похожие на query, и сортирует их по сходству.
+
+    Кандидаты выбираются условием UPPER(field) LIKE '%QUERY%' или
+    UPPER(field) % 'QUERY' по каждому полю — оба обслуживаются триграммными
+    GIN-индексами на UPPER(field), поэтому сходство считается только для
+    найденных строк, а не для всей таблицы.
+
+    Аргументы:
+        queryset (QuerySet): Уже ограниченный правами доступа queryset.
+        fields (tuple): Поля, по которым ведётся поиск.
+        query (str): Строка поиска.
+        limit (int): Максимальное число результатов.
+    """
+    query = query.upper()
+    condition = Q()
+    similarities = []
+    for field in fields:
+        alias = f'{field}_upper'
+        queryset = queryset.alias(**{alias: Upper(field)})
+        condition |= Q(**{f'{alias}__contains': query}) | Q(**{f'{alias}__trigram_similar': query})
+        similarities.append(TrigramSimilarity(alias, query))
+
+    score = Greatest(*similarities) if len(similarities) > 1 else similarities[0]
+    return queryset.filter(condition).annotate(score=score).order_by('-score', 'pk')[:limit]
+
+
+class SearchAPIView(APIView):
+    """
+    Единый поиск по устройствам, фермам, организациям и пользователям.
+
+    Параметры запроса:
+        q: Строка поиска (не короче MIN_QUERY_LENGTH символов).
+        types: Через запятую — devices, farms, organizations, users (по умолчанию все).
+        limit: Число результатов каждого типа (не более MAX_LIMIT).
+
+    Результаты ограничены данными, доступными пользователю: устройства и
+    фермы — его ферм и организаций, где он администратор; организации — те,
+    в которых его членство подтверждено; пользователи — члены организаций, где он
+    администратор или менеджер.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        query = request.query_params.get('q', '').strip()
+        if len(query) < MIN_QUERY_LENGTH:
+            raise ValidationError({'q': f'Введите не менее {MIN_QUERY_LENGTH} символов'})
+
+        try:
+            limit = min(max(int(request.query_params.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+        except ValueError:
+            raise ValidationError({'limit': 'Ожидается целое число'})
+
+        searches = {
+            'devices': self.search_devices,
+            'farms': self.search_farms,
+            'organizations': self.search_organizations,
+            'users': self.search_users,
+        }
+        types = request.query_params.get('types')
+        requested = [t.strip() for t in types.split(',') if t.strip() in searches] if types else list(searches)
+
+        return Response({name: searches[name](query, limit) for name in requested})
+
+    def search_devices(self, query, limit):
+        queryset = (
+            Device.objects
+            .filter(accessible_farm_filter(self.request.user, prefix='farm__'))
+            .select_related('farm')
+        )
+        devices = ranked(queryset, ('name', 'serial_number'), query, limit)
+        return DeviceSearchSerializer(devices, many=True).data
+
+    def search_farms(self, query, limit):
+        queryset = Farm.objects.filter(accessible_farm_filter(self.request.user))
+        return FarmSearchSerializer(ranked(queryset, ('name',), query, limit), many=True).data
+
+    def search_organizations(self, query, limit):
+        queryset = ExternalOrganization.objects.filter(
+            user_memberships__user=self.request.user,
+            user_memberships__status=ExternalOrganizationMembership.Status.APPROVED,
+        )
+        organizations = ranked(queryset, ('name',), query, limit)
+        return ExternalOrganizationSearchSerializer(organizations, many=True).data
+
+    def search_users(self, query, limit):
+        managed_organizations = ExternalOrganizationMembership.objects.filter(
+            user=self.request.user,
+            role__in=[ExternalOrganizationMembership.Role.ADMIN, ExternalOrganizationMembership.Role.MANAGER],
+            status=ExternalOrganizationMembership.Status.APPROVED,
+        ).values('organization_id')
+        queryset = CustomUser.objects.filter(
+            is_deleted=False,
+            pk__in=ExternalOrganizationMembership.objects.filter(
+                organization__in=managed_organizations
+            ).values('user_id'),
+        )
+        users = ranked(queryset, ('first_name', 'last_name', 'phone_number'), query, limit)
+        return UserSearchSerializer(users, many=True).data
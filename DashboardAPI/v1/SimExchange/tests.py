@@ -1,3 +1,37 @@
-from django.test import TestCase
+import json
 
-# Create your tests here.
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from dashboard.models import Device, DeviceModel
+from users.models import CustomUser, ExternalOrganization, Farm
+
+
+class DevicesStreamTests(APITestCase):
+    """
+    Проверяет NDJSON-поток устройств организации: строки совпадают с
+    элементами JSON-ответа, а под WSGI поток отдаётся синхронным итератором.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = CustomUser.objects.create(phone_number='9000000000', email='owner@example.com')
+        cls.organization = ExternalOrganization.objects.create(name='Агро')
+        farm = Farm.objects.create(name='Ферма', owner=owner, organization=cls.organization)
+        device_model = DeviceModel.objects.create(name='T-1', manufacturer='Acme', device_type='sensor')
+        for i in range(3):
+            Device.objects.create(
+                name=f'Датчик {i}', farm=farm, serial_number=f'SN-{i}', model=device_model, added_by=owner
+            )
+
+    def test_devices_stream_matches_json(self):
+        url = reverse('sim_ext_devices')
+        params = {'organization': self.organization.slug}
+
+        response = self.client.get(url, params, HTTP_ACCEPT='application/x-ndjson')
+        self.assertTrue(response.streaming)
+        self.assertFalse(response.is_async)
+        lines = b''.join(response.streaming_content).splitlines()
+
+        expected = self.client.get(url, params, HTTP_ACCEPT='application/json').json()['results']
+        self.assertEqual([json.loads(line) for line in lines], expected)
@@ -1,22 +1,25 @@
-from django.utils import timezone
+from django.core.exceptions import ValidationError
 from rest_framework import status
 
 from rest_framework.generics import RetrieveUpdateAPIView, UpdateAPIView, RetrieveAPIView, ListAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
 
-from dashboard.models import DeviceModel, Device, SensorData, DeviceStatus, ActuatorData
+from dashboard.ingestion import publish_frame, build_sensor_data, build_device_status, build_actuator_data, \
+    normalize_frame
+from dashboard.models import DeviceModel, Device
+from ..mixins import VersionedResponseCacheMixin
+from ..streaming import NDJSONStreamMixin
 from .serializers import (
     DeviceModelSerializer,
     DeviceSerializer
 )
 
 
-class DevicesModelsAPIView(ListAPIView):
+class DevicesModelsAPIView(NDJSONStreamMixin, VersionedResponseCacheMixin, ListAPIView):
     serializer_class = DeviceModelSerializer
+    cache_versions = ('device_models', 'devices')
 
     def get_queryset(self):
         organization_slug = self.request.query_params.get('organization')
@@ -27,8 +30,15 @@ class DevicesModelsAPIView(ListAPIView):
                 flat=True).distinct()).order_by('id')
 
 
-class DevicesAPIView(ListAPIView):
+class DevicesAPIView(NDJSONStreamMixin, VersionedResponseCacheMixin, ListAPIView):
+    """
+    Устройства организации ?organization=<slug> для симулятора.
+
+    С Accept: application/x-ndjson список выдаётся потоком (NDJSONStreamMixin),
+    память сервера не растёт с числом устройств.
+    """
     serializer_class = DeviceSerializer
+    cache_versions = ('devices',)
 
     def get_queryset(self):
         organization_slug = self.request.query_params.get('organization')
@@ -40,36 +50,15 @@ class SensorDataSend(APIView):
         try:
             device_id = request.data['device_id']
             data = request.data['data']
-            channel_layer = get_channel_layer()
-            async_to_sync(channel_layer.group_send)(
-                f'device_{device_id}',
-                {
-                    'type': 'send_sensor_data',
-                    'data': data
-                }
-            )
-            if 'humidity' in data:
-                humidity = data['humidity']
-                SensorData.objects.create(timestamp=data['timestamp'] if 'timestamp' in data else timezone.now(), humidity=humidity, device_id=device_id,
-                                          battery_level=data['battery_level'] if 'battery_level' in data else None)
-            elif 'temperature' in data:
-                temperature = data['temperature']
-                SensorData.objects.create(timestamp=data['timestamp'] if 'timestamp' in data else timezone.now(), temperature=temperature, device_id=device_id,
-                                          battery_level=data['battery_level'] if 'battery_level' in data else None)
-            elif 'soil_moisture' in data:
-                soil_moisture = data['soil_moisture']
-                SensorData.objects.create(timestamp=data['timestamp'] if 'timestamp' in data else timezone.now(), temperature=soil_moisture, device_id=device_id,
-                                          battery_level=data['battery_level'] if 'battery_level' in data else None)
-            elif 'light_intensity' in data:
-                light_intensity = data['light_intensity']
-                SensorData.objects.create(timestamp=data['timestamp'] if 'timestamp' in data else timezone.now(), temperature=light_intensity, device_id=device_id,
-                                          battery_level=data['battery_level'] if 'battery_level' in data else None)
-            elif 'ph_level' in data:
-                ph_level = data['ph_level']
-                SensorData.objects.create(timestamp=data['timestamp'] if 'timestamp' in data else timezone.now(), temperature=ph_level, device_id=device_id,
-                                          battery_level=data['battery_level'] if 'battery_level' in data else None)
+            data = normalize_frame(data)
+            sensor_data = build_sensor_data(device_id, data)
+            publish_frame(device_id, 'send_sensor_data', data)
+            if sensor_data:
+                sensor_data.save()
 
             return Response({"status": "sent"})
+        except ValidationError as e:
+            return Response({"error": e.messages}, status=400)
         except Exception as e:
             print("Exception:", e)
             return Response({"error": str(e)}, status=500)
@@ -84,24 +73,14 @@ class DeviceStatusSend(APIView):
             if not device_id or not data:
                 return Response({"error": "device_id and data are required"}, status=400)
 
-            channel_layer = get_channel_layer()
-            async_to_sync(channel_layer.group_send)(
-                f'device_{device_id}',
-                {
-                    'type': 'device_status_data',
-                    'data': data
-                }
-            )
-
-            DeviceStatus.objects.create(timestamp = data['timestamp'] if 'timestamp' in data else timezone.now(),
-                                        device_id=device_id, online = data['online'] if 'online' in data else False,
-                                        cpu_usage=data['cpu_usage'] if 'cpu_usage' in data else None,
-                                        memory_usage=data['memory_usage'] if 'memory_usage' in data else None,
-                                        disk_usage=data['disk_usage'] if 'disk_usage' in data else None,
-                                        signal_strength=data['signal_strength'] if 'signal_strength' in data else None,
-                                        additional_info=data['additional_info'] if 'additional_info' in data else None
-                                        )
+            data = normalize_frame(data)
+            device_status = build_device_status(device_id, data)
+            publish_frame(device_id, 'device_status_data', data)
+
+            device_status.save()
             return Response({"status": "sent"})
+        except ValidationError as e:
+            return Response({"error": e.messages}, status=400)
         except Exception as e:
             print("Exception:", e)
             return Response({"error": str(e)}, status=500)
@@ -115,23 +94,15 @@ class ActuatorDataSend(APIView):
             if not device_id or not data:
                 return Response({"error": "device_id and data are required"}, status=400)
 
-            channel_layer = get_channel_layer()
-            async_to_sync(channel_layer.group_send)(
-                f'device_{device_id}',
-                {
-                    'type': 'send_actuator_data',
-                    'data': data
-                }
-            )
-
-            ActuatorData.objects.create(timestamp=data['timestamp'] if 'timestamp' in data else timezone.now(),
-                                        actuator_id=device_id, action=data['action'] if 'action' in data else False,
-                                        duration=data['duration'] if 'duration' in data else None,
-                                        intensity=data['intensity'] if 'intensity' in data else None,
-                                        additional_info=data['additional_info'] if 'additional_info' in data else None
-                                        )
+            data = normalize_frame(data)
+            actuator_data = build_actuator_data(device_id, data)
+            publish_frame(device_id, 'send_actuator_data', data)
+
+            actuator_data.save()
             return Response({"status": "sent"})
 
+        except ValidationError as e:
+            return Response({"error": e.messages}, status=400)
         except Exception as e:
             print("Exception:", e)
 
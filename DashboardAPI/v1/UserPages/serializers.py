@@ -1,11 +1,27 @@
+from typing import Optional
+
 from rest_framework import serializers
 
+from dashboard.models import FarmHealthSummary
 from users.models import (
     ExternalOrganization,
     ExternalOrganizationMembership,
     Farm,
     FarmMembership,
 )
+from ..mixins import SparseFieldsSerializerMixin
+from ..values_serializers import ValuesSerializer
+
+
+class FarmHealthSerializer(serializers.ModelSerializer):
+    """
+    Сводка состояния устройств фермы (dashboard.health).
+    """
+    devices_offline = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = FarmHealthSummary
+        fields = ['devices_total', 'devices_online', 'devices_offline', 'maintenance_due', 'open_alerts', 'updated_at']
 
 
 class UserFarmsSerializer(serializers.ModelSerializer):
@@ -28,14 +44,15 @@ class UserFarmsSerializer(serializers.ModelSerializer):
         return f"{obj.owner.first_name} {obj.owner.last_name}"
 
     @staticmethod
-    def get_organization_name(obj: Farm) -> str:
+    def get_organization_name(obj: Farm) -> Optional[str]:
         """
-        Возвращает название организации, к которой принадлежит ферма.
+        Возвращает название организации, к которой принадлежит ферма, или
+        None для фермы без организации.
         """
-        return obj.organization.name
+        return obj.organization.name if obj.organization else None
 
 
-class UserFarmMembershipsSerializer(serializers.ModelSerializer):
+class UserFarmMembershipsSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     """
     Сериализатор для отображения членства пользователя в ферме,
     включая информацию о ферме, дате вступления, последнем обновлении
@@ -45,10 +62,16 @@ class UserFarmMembershipsSerializer(serializers.ModelSerializer):
     joined_at = serializers.DateTimeField(format="%d.%m.%Y %H:%M")
     updated_at = serializers.DateTimeField(format="%d.%m.%Y %H:%M")
     farm_slug = serializers.SerializerMethodField()
+    health = FarmHealthSerializer(source='farm.health', read_only=True)
 
     class Meta:
         model = FarmMembership
-        fields = ['farm', 'joined_at', 'updated_at', 'farm_slug', 'role']
+        fields = ['farm', 'joined_at', 'updated_at', 'farm_slug', 'role', 'health']
+        select_related = {
+            'farm': ['farm__owner', 'farm__organization'],
+            'farm_slug': ['farm'],
+            'health': ['farm__health'],
+        }
 
     @staticmethod
     def get_farm_slug(obj: FarmMembership) -> str:
@@ -58,19 +81,39 @@ class UserFarmMembershipsSerializer(serializers.ModelSerializer):
         return obj.farm.slug
 
 
+class UserFarmMembershipsValuesSerializer(ValuesSerializer):
+    """
+    Быстрый вывод UserFarmMembershipsSerializer для списка ферм пользователя.
+    """
+    serializer_class = UserFarmMembershipsSerializer
+    computed_fields = {
+        'farm.owner_full_name': (
+            ('owner__first_name', 'owner__last_name'),
+            # Колонки пусты только без строки владельца: имя не собирается из None
+            lambda first_name, last_name: (
+                None if first_name is None and last_name is None else f"{first_name} {last_name}"
+            ),
+        ),
+        'farm.organization_name': (('organization__name',), None),
+        'farm_slug': (('farm__slug',), None),
+        'health.devices_offline': (('devices_total', 'devices_online'), lambda total, online: total - online),
+    }
+
+
 class UserExternalOrganizationSerializer(serializers.ModelSerializer):
     class Meta:
         model = ExternalOrganization
         fields = ['id', 'name', 'address', 'description', 'type', 'slug']
 
 
-class UserExternalOrganizationMembershipsSerializer(serializers.ModelSerializer):
+class UserExternalOrganizationMembershipsSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     organization = UserExternalOrganizationSerializer()
     updated_at = serializers.DateTimeField(format="%d.%m.%Y %H:%M")
 
     class Meta:
         model = ExternalOrganizationMembership
         fields = ['id', 'organization', 'role', 'status', 'updated_at']
+        select_related = {'organization': ['organization']}
 
 
 
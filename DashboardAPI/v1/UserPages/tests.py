@@ -1,3 +1,78 @@
-from django.test import TestCase
+import json
 
-# Create your tests here.
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from DashboardAPI.v1.testing import QueryBudgetTestCase
+from DashboardAPI.v1.UserPages.serializers import UserFarmMembershipsSerializer
+
+from dashboard.models import FarmHealthSummary
+from users.models import CustomUser, Farm, FarmMembership
+
+
+class UserFarmsTests(QueryBudgetTestCase):
+    """
+    Проверяет список ферм пользователя: фиксированное число запросов и
+    совпадение быстрого вывода из values() с UserFarmMembershipsSerializer.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.owner = CustomUser.objects.create(
+            phone_number='9000000001',
+            email='farmer@example.com',
+            first_name='Анна',
+            last_name='Смирнова',
+            is_active=True,
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+
+    def add_farms(self, count):
+        offset = Farm.objects.count()
+        for i in range(offset, offset + count):
+            farm = Farm.objects.create(
+                name=f'Ферма {i:03}',
+                owner=self.owner,
+                organization=self.organization if i % 2 else None,
+            )
+            FarmMembership.objects.create(user=self.user, farm=farm, role=FarmMembership.Role.VIEWER)
+            if i % 3:
+                FarmHealthSummary.objects.create(farm=farm, devices_total=i, devices_online=i // 2)
+
+    def test_user_farms(self):
+        self.assertQueryBudget(reverse('user_farms'), 2, self.add_farms)
+
+    def test_user_farms_filters(self):
+        self.add_farms(4)
+        url = reverse('user_farms')
+
+        response = self.client.get(url, {'organization_name': self.organization.name, 'ordering': 'farm__name'})
+        self.assertEqual([membership['farm']['name'] for membership in response.json()['results']], ['Ферма 001', 'Ферма 003'])
+
+        response = self.client.get(url, {'role': 'owner,admin'})
+        self.assertEqual(response.json()['results'], [])
+
+        response = self.client.get(url, {'farm_name': '002'})
+        self.assertEqual([membership['farm']['organization_name'] for membership in response.json()['results']], [None])
+
+    def test_user_farms_match_serializer(self):
+        """Список из values() совпадает с выводом UserFarmMembershipsSerializer."""
+        self.add_farms(6)
+        memberships = FarmMembership.objects.filter(user=self.user).order_by('farm__name')
+
+        for params in (
+            {},
+            {'fields': 'farm,farm_slug,health'},
+            {'fields': 'farm,health,role', 'expand': 'farm,health'},
+        ):
+            params = {'ordering': 'farm__name', **params}
+            response = self.client.get(reverse('user_farms'), params)
+            request = Request(APIRequestFactory().get('/', params))
+            expected = UserFarmMembershipsSerializer(memberships, many=True, context={'request': request}).data
+            self.assertEqual(response.json()['results'], json.loads(JSONRenderer().render(expected)))
@@ -3,6 +3,9 @@ from rest_framework.filters import OrderingFilter
 from rest_framework.generics import ListAPIView
 from rest_framework.permissions import IsAuthenticated
 
+from ..async_views import AsyncListAPIView
+from ..mixins import AsyncConditionalGetMixin, ConditionalGetMixin, SparseFieldsViewMixin
+from ..values_serializers import ValuesListMixin
 from .filters import (
     ExternalOrganizationFilterBackend,
     FarmMembershipFilterBackend,
@@ -10,6 +13,7 @@ from .filters import (
 from .serializers import (
     UserExternalOrganizationMembershipsSerializer,
     UserFarmMembershipsSerializer,
+    UserFarmMembershipsValuesSerializer,
 )
 from users.models import (
     ExternalOrganizationMembership,
@@ -17,16 +21,21 @@ from users.models import (
 )
 
 
-class UserFarmsAPIView(ListAPIView):
+class UserFarmsAPIView(AsyncConditionalGetMixin, ValuesListMixin, SparseFieldsViewMixin, AsyncListAPIView):
     """
     Представление API для получения списка ферм, участником которых является
     аутентифицированный пользователь. Поддерживает фильтрацию и сортировку.
     """
     serializer_class = UserFarmMembershipsSerializer
+    values_serializer_class = UserFarmMembershipsValuesSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [FarmMembershipFilterBackend, OrderingFilter]
     ordering_fields = ['role', 'updated_at', 'farm__name']
     ordering = ['role']
+    use_last_modified = False
+    last_modified_fields = (
+        'updated_at', 'farm__updated_at', 'farm__organization__updated_at', 'farm__health__updated_at'
+    )
 
     def get_queryset(self) -> QuerySet:
         """
@@ -35,7 +44,7 @@ class UserFarmsAPIView(ListAPIView):
         return FarmMembership.objects.filter(user=self.request.user)
 
 
-class UserExternalOrganizationsAPIView(ListAPIView):
+class UserExternalOrganizationsAPIView(ConditionalGetMixin, SparseFieldsViewMixin, ListAPIView):
     """
     API-представление для получения членств пользователя во внешних организациях.
 
@@ -47,6 +56,8 @@ class UserExternalOrganizationsAPIView(ListAPIView):
     filter_backends = [ExternalOrganizationFilterBackend, OrderingFilter]
     ordering_fields = ['role', 'updated_at', 'organization__name']
     ordering = ['role']
+    use_last_modified = False
+    last_modified_fields = ('updated_at', 'organization__updated_at')
 
     def get_queryset(self) -> QuerySet:
         """
@@ -0,0 +1,102 @@
+"""
+Асинхронные представления чтения.
+
+DRF вызывает обработчики синхронно, и под ASGI Django выполняет такое
+представление целиком в потоке пула. AsyncAPIView переопределяет dispatch
+как корутину: Django видит async-обработчик и выполняет представление в
+цикле событий. Аутентификация и проверка прав (синхронный код DRF)
+выполняются одним вызовом sync_to_async, запросы к БД — через асинхронный
+интерфейс ORM, а сериализация уже загруженных объектов — в цикле событий,
+поэтому queryset должен заранее подключать все связи, которые читает
+сериализатор (см. SparseFieldsSerializerMixin.optimize_queryset).
+"""
+import inspect
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import aget_object_or_404
+from rest_framework.generics import GenericAPIView
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView с асинхронным dispatch; обработчики методов объявляются через async def.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncGenericAPIView(AsyncAPIView, GenericAPIView):
+    """
+    GenericAPIView для асинхронных представлений.
+
+    get_queryset должен только строить queryset, не выполняя запросов;
+    проверки, которым нужна БД, выносятся в aget_queryset.
+    """
+
+    async def aget_queryset(self):
+        return self.get_queryset()
+
+    async def aget_object(self):
+        """Асинхронный аналог GenericAPIView.get_object."""
+        queryset = self.filter_queryset(await self.aget_queryset())
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        obj = await aget_object_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+
+        await sync_to_async(self.check_object_permissions)(self.request, obj)
+        return obj
+
+
+class AsyncListAPIView(AsyncGenericAPIView):
+    """Асинхронный аналог ListAPIView (с пагинацией через apaginate_queryset)."""
+
+    async def get(self, request, *args, **kwargs):
+        return await self.alist(request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(await self.aget_queryset())
+
+        if self.paginator is not None:
+            page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer([obj async for obj in queryset], many=True)
+        return Response(serializer.data)
+
+
+class AsyncRetrieveAPIView(AsyncGenericAPIView):
+    """Асинхронный аналог RetrieveAPIView."""
+
+    async def get(self, request, *args, **kwargs):
+        return await self.aretrieve(request, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        serializer = self.get_serializer(await self.aget_object())
+        return Response(serializer.data)
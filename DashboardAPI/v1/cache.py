@@ -0,0 +1,51 @@
+"""
+Счётчики версий для кэша ответов.
+
+Каждый набор данных (например, каталог моделей устройств) имеет версию в
+общем кэше. Сигналы моделей увеличивают её при изменении данных, а ключ
+закэшированного ответа содержит текущие версии, поэтому старые ответы просто
+перестают запрашиваться и истекают по RESPONSE_CACHE_TTL.
+"""
+import time
+
+from django.core.cache import cache
+
+
+def version_key(name) -> str:
+    return f"version:{name}"
+
+
+def farm_version(farm_id) -> str:
+    """Имя версии данных одной фермы (устройства, их зоны и шлюзы)."""
+    return f"farm:{farm_id}"
+
+
+def get_versions(*names) -> list:
+    """
+    Возвращает текущие версии наборов данных одним обращением к кэшу.
+
+    Отсутствующая версия (первый запрос или вытеснение из кэша) создаётся
+    со значением текущего времени в миллисекундах, чтобы не совпасть с
+    версией ответов, оставшихся в кэше с прошлого раза.
+    """
+    keys = [version_key(name) for name in names]
+    found = cache.get_many(keys)
+
+    versions = []
+    for key in keys:
+        if key not in found:
+            cache.add(key, int(time.time() * 1000), None)
+            found[key] = cache.get(key)
+        versions.append(found[key])
+    return versions
+
+
+def bump_version(name) -> None:
+    """
+    Увеличивает версию набора данных, делая устаревшими его закэшированные ответы.
+    """
+    key = version_key(name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, int(time.time() * 1000), None)
@@ -0,0 +1,135 @@
+"""
+Определение членства текущего пользователя в организациях и фермах.
+
+Права доступа, контекст сериализаторов и сами представления спрашивают одно
+и то же членство несколько раз за запрос. Ответ запоминается на объекте
+запроса и в общем кэше на MEMBERSHIP_CACHE_TTL секунд под ключом
+(пользователь, slug). Кэш сбрасывается сигналами при изменении или удалении
+членства (DashboardAPI.signals).
+"""
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from users.models import ExternalOrganizationMembership, FarmMembership
+
+
+def org_membership_key(user_id, organization_slug) -> str:
+    return f"org_membership:{user_id}:{organization_slug}"
+
+
+def farm_membership_key(user_id, farm_slug) -> str:
+    return f"farm_membership:{user_id}:{farm_slug}"
+
+
+def _resolve(request, key, load):
+    memo = request.__dict__.setdefault('_memberships', {})
+    if key in memo:
+        return memo[key]
+
+    membership = cache.get(key)
+    if membership is None:
+        # Отсутствие членства кэшируется пустым словарём, чтобы не ходить в БД повторно
+        membership = load() or {}
+        cache.set(key, membership, settings.MEMBERSHIP_CACHE_TTL)
+
+    memo[key] = membership or None
+    return memo[key]
+
+
+def get_org_membership(request, organization_slug) -> Optional[dict]:
+    """
+    Возвращает членство текущего пользователя в организации.
+
+    Аргументы:
+        request: Запрос DRF или Django с аутентифицированным пользователем.
+        organization_slug (str): Slug организации.
+
+    Возвращает:
+        dict | None: Словарь с ключами organization_id, role и status или None,
+            если пользователь не состоит в организации (или её нет).
+    """
+    if not organization_slug or not request.user.is_authenticated:
+        return None
+
+    return _resolve(
+        request,
+        org_membership_key(request.user.pk, organization_slug),
+        lambda: (
+            ExternalOrganizationMembership.objects
+            .filter(organization__slug=organization_slug, user=request.user)
+            .values('organization_id', 'role', 'status')
+            .first()
+        ),
+    )
+
+
+def get_org_role(request, organization_slug) -> Optional[str]:
+    """
+    Возвращает роль текущего пользователя в организации или None.
+    """
+    membership = get_org_membership(request, organization_slug)
+    return membership['role'] if membership else None
+
+
+def get_farm_membership(request, farm_slug) -> Optional[dict]:
+    """
+    Возвращает членство текущего пользователя в ферме.
+
+    Возвращает:
+        dict | None: Словарь с ключами farm_id и role или None.
+    """
+    if not farm_slug or not request.user.is_authenticated:
+        return None
+
+    return _resolve(
+        request,
+        farm_membership_key(request.user.pk, farm_slug),
+        lambda: (
+            FarmMembership.objects
+            .filter(farm__slug=farm_slug, user=request.user)
+            .values('farm_id', 'role')
+            .first()
+        ),
+    )
+
+
+def accessible_farm_filter(user, prefix=''):
+    """
+    Условие доступа к фермам: пользователь состоит в ферме или является
+    администратором её организации.
+    """
+    farm_ids = FarmMembership.objects.filter(user=user).values('farm_id')
+    admin_organizations = ExternalOrganizationMembership.objects.filter(
+        user=user,
+        role=ExternalOrganizationMembership.Role.ADMIN,
+        status=ExternalOrganizationMembership.Status.APPROVED,
+    ).values('organization_id')
+
+    return (
+        Q(**{f'{prefix}pk__in': farm_ids})
+        | Q(**{f'{prefix}organization__in': admin_organizations})
+    )
+
+
+def managed_farm_filter(user, prefix=''):
+    """
+    Условие управления фермами: пользователь — владелец или администратор
+    фермы либо администратор её организации.
+    """
+    farm_ids = FarmMembership.objects.filter(
+        user=user,
+        role__in=[FarmMembership.Role.OWNER, FarmMembership.Role.ADMIN],
+    ).values('farm_id')
+    admin_organizations = ExternalOrganizationMembership.objects.filter(
+        user=user,
+        role=ExternalOrganizationMembership.Role.ADMIN,
+        status=ExternalOrganizationMembership.Status.APPROVED,
+    ).values('organization_id')
+
+    return (
+        Q(**{f'{prefix}pk__in': farm_ids})
+        | Q(**{f'{prefix}organization__in': admin_organizations})
+    )
@@ -0,0 +1,254 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+from .cache import get_versions
+
+
+class ConditionalGetMixin:
+    """
+    Условный GET (ETag / Last-Modified) для представлений чтения.
+
+    Валидаторы считаются одним агрегирующим запросом: количество строк и
+    максимум полей last_modified_fields по тому же queryset, который отдаёт
+    представление. Если клиент прислал совпадающий If-None-Match или
+    If-Modified-Since, возвращается 304 без сериализации. Ответ помечается
+    Cache-Control: private, no-cache, поэтому браузер всегда переспрашивает
+    сервер, но повторно скачивает данные только после их изменения.
+
+    Атрибуты:
+        last_modified_fields (tuple): Поля updated_at самой модели и связанных
+            моделей, данные которых попадают в ответ.
+        use_last_modified (bool): Отдавать ли Last-Modified и проверять
+            If-Modified-Since. У списков отключается: удаление строки не
+            сдвигает max(updated_at), и проверка по дате дала бы ложный 304;
+            ETag учитывает и количество строк.
+    """
+
+    last_modified_fields = ('updated_at',)
+    use_last_modified = True
+
+    def get_validator_queryset(self):
+        """Queryset, по которому считаются валидаторы (по умолчанию — список представления)."""
+        return self.filter_queryset(self.get_queryset())
+
+    def get_etag_extra(self):
+        """Дополнительные значения, от которых зависит ответ (например, роль пользователя)."""
+        return ()
+
+    def get_validator_aggregates(self):
+        return {
+            'count': Count('pk', distinct=True),
+            **{f'max_{i}': Max(field) for i, field in enumerate(self.last_modified_fields)},
+        }
+
+    def get_validators(self):
+        """
+        Возвращает:
+            tuple: ETag (str) и время последнего изменения (datetime | None).
+        """
+        aggregates = self.get_validator_queryset().order_by().aggregate(**self.get_validator_aggregates())
+        return self.make_validators(aggregates)
+
+    def make_validators(self, aggregates):
+        modified = [aggregates[f'max_{i}'] for i in range(len(self.last_modified_fields))]
+        last_modified = max(filter(None, modified), default=None)
+
+        parts = [
+            self.request.user.pk,
+            self.request.get_full_path(),
+            aggregates['count'],
+            *(value.isoformat() if value else '' for value in modified),
+            *self.get_etag_extra(),
+        ]
+        etag = hashlib.sha1('|'.join(map(str, parts)).encode()).hexdigest()
+        return quote_etag(etag), last_modified
+
+    def get_timestamp(self, last_modified):
+        if not self.use_last_modified or last_modified is None:
+            return None
+        return int(last_modified.timestamp())
+
+    @staticmethod
+    def add_validators(response, etag, timestamp):
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        timestamp = self.get_timestamp(last_modified)
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        return self.add_validators(response, etag, timestamp)
+
+
+class AsyncConditionalGetMixin(ConditionalGetMixin):
+    """
+    ConditionalGetMixin для асинхронных представлений (DashboardAPI.v1.async_views).
+
+    get_validator_queryset должен строить queryset без запросов к БД.
+    """
+
+    async def aget_validators(self):
+        queryset = self.get_validator_queryset().order_by()
+        return self.make_validators(await queryset.aaggregate(**self.get_validator_aggregates()))
+
+    async def get(self, request, *args, **kwargs):
+        etag, last_modified = await self.aget_validators()
+        timestamp = self.get_timestamp(last_modified)
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            # Пропускаем синхронный ConditionalGetMixin.get в MRO
+            response = await super(ConditionalGetMixin, self).get(request, *args, **kwargs)
+        return self.add_validators(response, etag, timestamp)
+
+
+class VersionedResponseCacheMixin:
+    """
+    Кэш отрендеренных ответов для редко меняющихся списков.
+
+    Ответ сохраняется в общем кэше готовыми байтами под ключом из версий
+    наборов данных cache_versions и полного пути запроса. Пока версии не
+    изменились, запрос обслуживается из кэша без обращения к ORM и
+    сериализатору. Версии увеличиваются сигналами (DashboardAPI.signals).
+    Кэшируются только ответы JSON-рендерера.
+
+    Атрибуты:
+        cache_versions (tuple): Имена наборов данных, от которых зависит ответ.
+    """
+
+    cache_versions = ()
+
+    def get_response_cache_key(self, request):
+        versions = '.'.join(map(str, get_versions(*self.cache_versions)))
+        return f"response:{type(self).__name__}:{versions}:{request.get_full_path()}"
+
+    def get(self, request, *args, **kwargs):
+        if request.accepted_renderer.format != 'json':
+            return super().get(request, *args, **kwargs)
+
+        key = self.get_response_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        self.response_cache_key = key
+        return super().get(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+
+        key = getattr(self, 'response_cache_key', None)
+        if key and isinstance(response, Response) and response.status_code == 200:
+            response.render()
+            cache.set(key, (response.rendered_content, response['Content-Type']), settings.RESPONSE_CACHE_TTL)
+        return response
+
+
+def _split_param(request, name):
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    return {item.strip() for item in value.split(',') if item.strip()}
+
+
+class SparseFieldsSerializerMixin:
+    """
+    Поддержка ?fields= и ?expand= в сериализаторах чтения.
+
+    ?fields=id,name оставляет в ответе только перечисленные поля. Вложенные
+    сериализаторы среди них отдаются первичным ключом, если их имя не указано
+    в ?expand=. Без ?fields= ответ не меняется. Параметры действуют только на
+    GET и только на сериализатор верхнего уровня.
+
+    Meta.select_related и Meta.prefetch_related сопоставляют полю связи,
+    которые ему нужны; optimize_queryset подключает связи только запрошенных
+    полей, поэтому JOIN'ы и подзапросы пропущенных полей не выполняются.
+    """
+
+    @staticmethod
+    def get_sparse_params(request):
+        """
+        Возвращает:
+            tuple: Запрошенные поля (set | None, если ?fields= не передан) и раскрываемые связи (set).
+        """
+        if request is None or request.method != 'GET':
+            return None, set()
+        return _split_param(request, 'fields'), _split_param(request, 'expand') or set()
+
+    def get_fields(self):
+        fields = super().get_fields()
+
+        is_root = self.parent is None or (isinstance(self.parent, ListSerializer) and self.parent.parent is None)
+        if not is_root:
+            return fields
+
+        requested, expand = self.get_sparse_params(self.context.get('request'))
+        if requested is None:
+            return fields
+
+        sparse = {}
+        for name, field in fields.items():
+            if name not in requested:
+                continue
+            if isinstance(field, BaseSerializer) and name not in expand:
+                field = PrimaryKeyRelatedField(read_only=True, many=isinstance(field, ListSerializer))
+            sparse[name] = field
+        return sparse
+
+    @classmethod
+    def is_field_needed(cls, name, requested, expand):
+        if requested is None:
+            return True
+        if name not in requested:
+            return False
+        return not isinstance(cls._declared_fields.get(name), BaseSerializer) or name in expand
+
+    @classmethod
+    def optimize_queryset(cls, queryset, request):
+        """
+        Подключает select_related/prefetch_related, нужные запрошенным полям.
+        """
+        requested, expand = cls.get_sparse_params(request)
+
+        for method, relations in (
+                ('select_related', getattr(cls.Meta, 'select_related', {})),
+                ('prefetch_related', getattr(cls.Meta, 'prefetch_related', {})),
+        ):
+            needed = {
+                relation
+                for name, field_relations in relations.items()
+                if cls.is_field_needed(name, requested, expand)
+                for relation in field_relations
+            }
+            if needed:
+                queryset = getattr(queryset, method)(*sorted(needed))
+        return queryset
+
+
+class SparseFieldsViewMixin:
+    """
+    Оптимизирует queryset представления под поля, запрошенные через ?fields=/?expand=.
+
+    Сериализатор представления должен использовать SparseFieldsSerializerMixin.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        return self.get_serializer_class().optimize_queryset(queryset, self.request)
@@ -0,0 +1,217 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    raise TypeError(f"Значение {value!r} нельзя сохранить в курсоре")
+
+
+class KeysetPagination(BasePagination):
+    """
+    Курсорная (keyset) пагинация по составной сортировке.
+
+    Курсор хранит значения полей сортировки последней строки страницы, и
+    следующая страница выбирается условием «строго после этой строки»
+    вместо OFFSET, поэтому глубокие страницы стоят столько же, сколько первая.
+    Сортировка берётся из queryset (OrderingFilter или Meta.ordering) и
+    дополняется pk, чтобы порядок был строго определён.
+
+    Пагинация включена всегда: без cursor отдаётся первая страница из
+    page_size строк. Представление, которому нужен весь список, отключает её
+    явно: pagination_class = None.
+    """
+
+    page_size = 50
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Неверный курсор'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.get_after_filter(queryset, self.decode_cursor(cursor)))
+
+        results = list(queryset[:self.page_size + 1])
+        return self.set_page(results)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Асинхронный вариант paginate_queryset для AsyncListAPIView.
+
+        Страница и курсор следующей страницы вычисляются в одном вызове
+        sync_to_async: значения курсора могут читать связанные объекты.
+        """
+        return await sync_to_async(self.paginate_queryset)(queryset, request, view)
+
+    def set_page(self, results):
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        self.next_cursor = self.encode_cursor(self.get_values(self.page[-1])) if self.has_next else None
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    @staticmethod
+    def get_ordering(queryset):
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not all(isinstance(field, str) for field in ordering):
+            raise ValueError('KeysetPagination поддерживает сортировку только по именам полей')
+
+        if not any(field.lstrip('-') in ('pk', 'id') for field in ordering):
+            ordering.append('pk')
+        return ordering
+
+    @staticmethod
+    def is_nullable(queryset, name):
+        """Может ли поле сортировки (с учётом LEFT JOIN по пути) быть NULL."""
+        if name in queryset.query.annotations:
+            return True
+
+        model = queryset.model
+        for part in name.split('__'):
+            if part == 'pk':
+                return False
+            try:
+                field = model._meta.get_field(part)
+            except FieldDoesNotExist:
+                return True
+            if field.null:
+                return True
+            model = field.related_model
+        return False
+
+    def get_after_filter(self, queryset, values):
+        """
+        Строит условие «строка идёт после курсора» для составной сортировки.
+
+        Для сортировки (a, -b, pk) это
+        a > va OR (a = va AND b < vb) OR (a = va AND b = vb AND pk > vpk).
+        NULL учитываются так, как их упорядочивает PostgreSQL: в конце при
+        ASC и в начале при DESC.
+        """
+        if len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        conditions = []
+        equal = Q()
+        for field, value in zip(self.ordering, values):
+            descending = field.startswith('-')
+            name = field.lstrip('-')
+            nullable = self.is_nullable(queryset, name)
+
+            if value is None:
+                after = Q(**{f'{name}__isnull': False}) if descending else None
+                same = Q(**{f'{name}__isnull': True})
+            else:
+                after = Q(**{f'{name}__lt' if descending else f'{name}__gt': value})
+                if nullable and not descending:
+                    after |= Q(**{f'{name}__isnull': True})
+                same = Q(**{name: value})
+
+            if after is not None:
+                conditions.append(equal & after)
+            equal &= same
+
+        if not conditions:
+            return Q(pk__in=[])
+        return reduce(or_, conditions)
+
+    def get_values(self, instance):
+        if isinstance(instance, dict):
+            # Строка values(): колонки сортировки добавлены в запрос
+            return [instance[field.lstrip('-')] for field in self.ordering]
+        values = []
+        for field in self.ordering:
+            value = instance
+            for part in field.lstrip('-').split('__'):
+                value = getattr(value, part, None)
+                if value is None:
+                    break
+            values.append(getattr(value, 'pk', value))
+        return values
+
+    def encode_cursor(self, values):
+        data = json.dumps(values, default=_encode_value, separators=(',', ':'))
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (binascii.Error, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Курсор следующей страницы из поля next',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Размер страницы (не более {self.max_page_size})',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
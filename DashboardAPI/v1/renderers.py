@@ -0,0 +1,56 @@
+"""
+Быстрые JSON-рендерер и парсер на orjson (REST_FRAMEWORK по умолчанию).
+
+Вывод совпадает с rest_framework.renderers.JSONRenderer в компактном
+UTF-8 режиме: datetime с «Z» для UTC, date, time и UUID кодируются orjson
+нативно, Decimal, timedelta, ленивые строки и прочие типы — тем же
+rest_framework.utils.encoders.JSONEncoder.default, что и у DRF.
+"""
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+# Уже закодированный JSON, который вставляется в ответ без повторного кодирования
+PreEncoded = orjson.Fragment
+
+_default = encoders.JSONEncoder().default
+
+
+def encode_json(data, option: int = 0) -> bytes:
+    """Кодирует данные в JSON (bytes) так же, как ORJSONRenderer."""
+    return orjson.dumps(data, default=_default, option=OPTIONS | option)
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        option = 0
+        if self.get_indent(accepted_media_type or '', renderer_context or {}):
+            option = orjson.OPT_INDENT_2
+
+        ret = encode_json(data, option)
+        # Как JSONRenderer: U+2028 и U+2029 экранируются, чтобы ответ оставался корректным JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            content = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                content = content.decode(encoding)
+            return orjson.loads(content)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError(f'JSON parse error - {exc}')
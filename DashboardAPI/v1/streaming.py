@@ -0,0 +1,127 @@
+"""
+Потоковая выдача больших списков в формате NDJSON (одна JSON-строка на объект).
+
+Обычный ListAPIView собирает весь список экземпляров моделей и результат
+сериализации в памяти. Поток вместо этого читает строки через values()
+серверным курсором порциями по chunk_size и кодирует каждую строку отдельно,
+поэтому потребление памяти не зависит от размера списка. Поля и их
+представление берутся из сериализатора представления, строки совпадают с
+элементами обычного JSON-ответа.
+
+Django отдаёт поток частями, только если тип итератора совпадает с
+обработчиком: под ASGI — асинхронный (QuerySet.aiterator), под WSGI —
+синхронный (QuerySet.iterator). Итератор другого типа обработчик сначала
+целиком собирает в память, поэтому NDJSONStreamMixin выбирает его по типу
+запроса.
+"""
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.fields import ModelField
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.renderers import BaseRenderer
+
+from .renderers import encode_json
+
+
+def _identity(value):
+    return value
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Рендерер NDJSON. Списки выдаются построчно, остальные данные (например,
+    ошибки) — одной строкой.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        items = data if isinstance(data, list) else [data]
+        return b''.join(encode_line(item) for item in items)
+
+
+def encode_line(item) -> bytes:
+    return encode_json(item) + b'\n'
+
+
+def get_row_converters(serializer_class) -> list:
+    """
+    Сопоставляет полям сериализатора колонки values() и функции преобразования.
+
+    Поддерживаются простые поля модели и PrimaryKeyRelatedField — этого
+    достаточно для ModelSerializer с полями модели.
+
+    Возвращает:
+        list: Кортежи (имя поля в ответе, колонка values(), преобразование).
+    """
+    serializer = serializer_class()
+    opts = serializer.Meta.model._meta
+    converters = []
+    for name, field in serializer.fields.items():
+        if isinstance(field, PrimaryKeyRelatedField):
+            converters.append((name, opts.get_field(field.source).attname, _identity))
+        elif isinstance(field, ModelField):
+            # ModelField читает значение из экземпляра; колонка уже готова для JSON-кодировщика
+            converters.append((name, field.source, _identity))
+        else:
+            converters.append((name, field.source, field.to_representation))
+    return converters
+
+
+def _values(queryset, converters):
+    return queryset.values(*(column for _, column, _ in converters))
+
+
+def _encode_row(row, converters) -> bytes:
+    return encode_line({
+        name: None if row[column] is None else convert(row[column])
+        for name, column, convert in converters
+    })
+
+
+async def stream_rows(queryset, serializer_class, chunk_size: int):
+    """
+    Асинхронно выдаёт строки NDJSON по queryset в представлении serializer_class (ASGI).
+    """
+    converters = get_row_converters(serializer_class)
+    async for row in _values(queryset, converters).aiterator(chunk_size=chunk_size):
+        yield _encode_row(row, converters)
+
+
+def iter_rows(queryset, serializer_class, chunk_size: int):
+    """
+    Синхронный вариант stream_rows для WSGI.
+    """
+    converters = get_row_converters(serializer_class)
+    for row in _values(queryset, converters).iterator(chunk_size=chunk_size):
+        yield _encode_row(row, converters)
+
+
+class NDJSONStreamMixin:
+    """
+    Добавляет ListAPIView потоковый вариант ответа: при Accept:
+    application/x-ndjson (или ?format=ndjson) список выдаётся построчно
+    без пагинации и без сборки в памяти.
+
+    Атрибуты:
+        stream_chunk_size (int): Число строк, читаемых из курсора за раз.
+    """
+
+    stream_chunk_size = 2000
+
+    def get_renderers(self):
+        return [*super().get_renderers(), NDJSONRenderer()]
+
+    def list(self, request, *args, **kwargs):
+        if request.accepted_renderer.format != NDJSONRenderer.format:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = stream_rows if isinstance(request._request, ASGIRequest) else iter_rows
+        return StreamingHttpResponse(
+            rows(queryset, self.get_serializer_class(), self.stream_chunk_size),
+            content_type=NDJSONRenderer.media_type,
+        )
@@ -0,0 +1,64 @@
+"""
+Общая основа тестов API: пользователь с организацией и проверка бюджета
+запросов к БД.
+"""
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from users.models import CustomUser, ExternalOrganization, ExternalOrganizationMembership
+
+
+class QueryBudgetTestCase(APITestCase):
+    """
+    Проверяет, что эндпоинт выполняется за фиксированное число запросов, не
+    зависящее от объёма данных.
+
+    Общие данные: self.user (администратор организации) и self.organization.
+    Объекты списка добавляет фабрика модуля тестов, передаваемая в
+    assertQueryBudget.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create(
+            phone_number='9000000000',
+            email='owner@example.com',
+            first_name='Иван',
+            last_name='Петров',
+            is_active=True,
+        )
+        cls.organization = ExternalOrganization.objects.create(name='Агро')
+        ExternalOrganizationMembership.objects.create(
+            user=cls.user,
+            organization=cls.organization,
+            role=ExternalOrganizationMembership.Role.ADMIN,
+            status=ExternalOrganizationMembership.Status.APPROVED,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def count_queries(self, url, params=None):
+        # Бюджет считается для холодного кэша членств
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assertQueryBudget(self, url, budget, add_rows, params=None):
+        """
+        Число запросов не превышает budget и не растёт вместе с данными.
+
+        Аргументы:
+            add_rows (Callable[[int], None]): Добавляет заданное число объектов списка.
+        """
+        add_rows(3)
+        small = self.count_queries(url, params)
+        add_rows(30)
+        large = self.count_queries(url, params)
+
+        self.assertLessEqual(small, budget)
+        self.assertEqual(small, large)
@@ -7,5 +7,6 @@ urlpatterns = [
     path('profile/', include('DashboardAPI.v1.ProfilePage.urls')),
     path('farm/', include('DashboardAPI.v1.FarmPage.urls')),
     path('devices/', include('DashboardAPI.v1.DevicesPage.urls')),
-    path('sim_exchange/', include('DashboardAPI.v1.SimExchange.urls'))
+    path('sim_exchange/', include('DashboardAPI.v1.SimExchange.urls')),
+    path('search/', include('DashboardAPI.v1.Search.urls')),
 ]
\ No newline at end of file
@@ -0,0 +1,261 @@
+"""
+Быстрая сериализация списков чтения из строк values().
+
+ModelSerializer на каждую строку создаёт экземпляр модели (и связанных
+моделей), а затем для каждого поля вызывает get_attribute и
+to_representation. Для списков в тысячи строк это основная часть времени
+ответа. ValuesSerializer повторяет вывод обычного сериализатора, но читает
+строки через values() одним запросом с JOIN'ами и собирает ответ по
+колонкам: для каждого поля заранее выбираются колонка и преобразование
+(часовой пояс и формат дат, URL файлов), после чего колонка
+преобразуется целиком одним проходом, а даты и URL файлов вычисляются
+один раз на каждое различное значение.
+
+Набор и порядок полей берутся из экземпляра обычного сериализатора, поэтому
+?fields=/?expand= (SparseFieldsSerializerMixin) работают так же.
+SerializerMethodField и поля, читающие свойства модели, описываются в
+computed_fields: колонки values() и функция, получающая их значения.
+"""
+from operator import itemgetter
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.fields import (
+    BooleanField,
+    CharField,
+    ChoiceField,
+    DateField,
+    DateTimeField,
+    FileField,
+    IntegerField,
+    JSONField,
+    ModelField,
+    SerializerMethodField,
+)
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer, ListSerializer
+from rest_framework.settings import api_settings
+
+# to_representation этих полей не меняет значения, прочитанные через values()
+IDENTITY_FIELDS = (BooleanField, CharField, ChoiceField, IntegerField, ModelField, PrimaryKeyRelatedField)
+
+
+def _datetime_formatter(field):
+    """Преобразование datetime, совпадающее с DateTimeField.to_representation."""
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if output_format is None or field_timezone is None:
+        return field.to_representation
+
+    if output_format.lower() == 'iso-8601':
+        def convert(value):
+            value = value.astimezone(field_timezone).isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return convert
+    return lambda value: value.astimezone(field_timezone).strftime(output_format)
+
+
+def _date_formatter(field):
+    output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+    if output_format is None:
+        return field.to_representation
+    if output_format.lower() == 'iso-8601':
+        return lambda value: value.isoformat()
+    return lambda value: value.strftime(output_format)
+
+
+def _file_formatter(field, model):
+    """URL файла по имени из values(), как FileField.to_representation."""
+    if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+        return None
+    storage = model._meta.get_field(field.source).storage
+    request = field.context.get('request')
+    if request is None:
+        return storage.url
+    return lambda value: request.build_absolute_uri(storage.url(value))
+
+
+def _converter(field, model):
+    """
+    Функция преобразования значения колонки или None, если значение отдаётся как есть.
+    """
+    if isinstance(field, DateTimeField):
+        return _datetime_formatter(field)
+    if isinstance(field, DateField):
+        return _date_formatter(field)
+    if isinstance(field, FileField):
+        return _file_formatter(field, model)
+    if isinstance(field, JSONField):
+        return field.to_representation if field.binary else None
+    if isinstance(field, IDENTITY_FIELDS):
+        return None
+    return field.to_representation
+
+
+class ValuesSerializer:
+    """
+    Сериализатор только для чтения, строящий ответ из строк values().
+
+    Атрибуты:
+        serializer_class: Сериализатор, вывод которого повторяется.
+        computed_fields (dict): Путь поля через точку ('farm.owner_full_name'
+            для вложенного сериализатора) — кортеж (колонки values()
+            относительно сериализатора, функция от их значений или None, если
+            значение единственной колонки отдаётся как есть). Обязателен для
+            SerializerMethodField и полей со свойством модели в source.
+    """
+
+    serializer_class = None
+    computed_fields = {}
+
+    def __init__(self, serializer):
+        """
+        Аргументы:
+            serializer: Экземпляр serializer_class с контекстом запроса; его
+                поля (с учётом ?fields=/?expand=) определяют ответ.
+        """
+        self.columns = {}
+        self.mappers = self.compile(serializer, '', '')
+
+    def column(self, name):
+        self.columns[name] = None
+        return name
+
+    def compile(self, serializer, prefix, path):
+        model = serializer.Meta.model
+        mappers = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            source = prefix + '__'.join(field.source_attrs)
+
+            if path + name in self.computed_fields:
+                columns, function = self.computed_fields[path + name]
+                if function is None:
+                    mappers.append((name, self.column_mapper(self.column(prefix + columns[0]), None)))
+                    continue
+                getter = itemgetter(*(self.column(prefix + column) for column in columns))
+                if len(columns) == 1:
+                    mapper = self.method_mapper(lambda row, getter=getter, function=function: function(getter(row)))
+                else:
+                    mapper = self.method_mapper(lambda row, getter=getter, function=function: function(*getter(row)))
+            elif isinstance(field, SerializerMethodField):
+                raise TypeError(f'{type(self).__name__}: не описано поле {path + name} в computed_fields')
+            elif isinstance(field, ListSerializer):
+                raise TypeError(f'{type(self).__name__}: поле {path + name} со списком объектов не поддерживается')
+            elif isinstance(field, BaseSerializer):
+                mapper = self.nested_mapper(
+                    self.compile(field, source + '__', f'{path}{name}.'),
+                    self.column(source + '__pk'),
+                )
+            elif isinstance(field, PrimaryKeyRelatedField) and not self.is_model_field(model, field):
+                # Так ?fields= без ?expand= заменяет вложенный сериализатор со
+                # сложным source: DRF не находит связь и пропускает поле
+                continue
+            elif isinstance(field, (DateTimeField, DateField, FileField)):
+                mapper = self.memoized_mapper(self.column(source), _converter(field, model))
+            else:
+                mapper = self.column_mapper(self.column(source), _converter(field, model))
+            mappers.append((name, mapper))
+        return mappers
+
+    @staticmethod
+    def is_model_field(model, field):
+        try:
+            model._meta.get_field(field.source_attrs[0])
+        except FieldDoesNotExist:
+            return False
+        return True
+
+    @staticmethod
+    def column_mapper(column, convert):
+        if convert is None:
+            return lambda rows: [row[column] for row in rows]
+        return lambda rows: [None if value is None else convert(value) for value in (row[column] for row in rows)]
+
+    @staticmethod
+    def memoized_mapper(column, convert):
+        """
+        Колонка дат или файлов: каждое различное значение преобразуется один
+        раз на ответ (даты обслуживания, updated_at массовых изменений, аватар
+        по умолчанию часто совпадают).
+        """
+        if convert is None:
+            return ValuesSerializer.column_mapper(column, None)
+
+        def mapper(rows):
+            formatted = {None: None}
+            for value in {row[column] for row in rows} - formatted.keys():
+                formatted[value] = convert(value)
+            return [formatted[row[column]] for row in rows]
+        return mapper
+
+    @staticmethod
+    def method_mapper(compute):
+        return lambda rows: [compute(row) for row in rows]
+
+    @classmethod
+    def nested_mapper(cls, mappers, pk_column):
+        def mapper(rows):
+            # Преобразования вложенных полей не получают строк без связанного объекта
+            objects = iter(cls.build(mappers, [row for row in rows if row[pk_column] is not None]))
+            return [None if row[pk_column] is None else next(objects) for row in rows]
+        return mapper
+
+    @staticmethod
+    def build(mappers, rows):
+        """Собирает словари ответа, преобразуя каждую колонку целиком."""
+        if not mappers:
+            return [{} for _ in rows]
+        names = [name for name, _ in mappers]
+        columns = [mapper(rows) for _, mapper in mappers]
+        return [dict(zip(names, values)) for values in zip(*columns)]
+
+    def values(self, queryset, *extra):
+        """
+        Аргументы:
+            queryset (QuerySet): Отфильтрованный queryset модели сериализатора.
+            extra: Дополнительные колонки (например, поля сортировки для курсора).
+        """
+        return queryset.values(*self.columns, *(column for column in extra if column not in self.columns))
+
+    def many(self, rows) -> list:
+        return self.build(self.mappers, list(rows))
+
+
+class ValuesListMixin:
+    """
+    Отдаёт список ListAPIView или AsyncListAPIView через values_serializer_class.
+
+    Пагинация (KeysetPagination) работает по тем же строкам values(): колонки
+    сортировки добавляются к запросу для курсора следующей страницы.
+    """
+
+    values_serializer_class = None
+
+    def get_values_serializer(self):
+        return self.values_serializer_class(self.get_serializer())
+
+    def get_values_queryset(self, queryset):
+        values_serializer = self.get_values_serializer()
+        extra = ()
+        if self.paginator is not None and hasattr(self.paginator, 'get_ordering'):
+            extra = [field.lstrip('-') for field in self.paginator.get_ordering(queryset)]
+        return values_serializer, values_serializer.values(queryset, *extra)
+
+    def list(self, request, *args, **kwargs):
+        values_serializer, rows = self.get_values_queryset(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(values_serializer.many(page))
+        return Response(values_serializer.many(rows))
+
+    async def alist(self, request, *args, **kwargs):
+        values_serializer, rows = self.get_values_queryset(self.filter_queryset(await self.aget_queryset()))
+
+        if self.paginator is not None:
+            page = await self.paginator.apaginate_queryset(rows, request, view=self)
+            if page is not None:
+                return self.get_paginated_response(values_serializer.many(page))
+        return Response(values_serializer.many([row async for row in rows]))
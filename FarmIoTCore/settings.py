@@ -33,8 +33,6 @@ APPEND_SLASH = True
 
 ALLOWED_HOSTS = ["192.168.1.2", 'localhost']
 
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
-
 # Application definition
 
 INSTALLED_APPS = [
@@ -44,6 +42,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'drf_spectacular',
     'channels',
@@ -88,15 +87,65 @@ TEMPLATES = [
 WSGI_APPLICATION = 'FarmIoTCore.wsgi.application'
 ASGI_APPLICATION = 'FarmIoTCore.asgi.application'
 
+REDIS_HOST = os.getenv('REDIS_HOST', 'redis')
+REDIS_PORT = int(os.getenv('REDIS_PORT', '6379'))
+
+# Pub/sub-раздача групп (доставка «не более одного раза»): channels_redis.pubsub.RedisPubSubChannelLayer
+CHANNEL_LAYER_BACKEND = os.getenv('CHANNEL_LAYER_BACKEND', 'channels_redis.core.RedisChannelLayer')
+
 CHANNEL_LAYERS = {
     'default': {
-        'BACKEND': 'channels_redis.core.RedisChannelLayer',
+        'BACKEND': CHANNEL_LAYER_BACKEND,
         'CONFIG': {
-            'hosts': [('redis', 6379)],
+            'hosts': [(REDIS_HOST, REDIS_PORT)],
         },
     },
 }
 
+# Общий кэш (членства, версии и отрендеренные ответы каталогов) в отдельной базе Redis
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': f'redis://{REDIS_HOST}:{REDIS_PORT}/1',
+    },
+    # Сессии — в своей базе, чтобы очистка общего кэша не завершала их
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': f'redis://{REDIS_HOST}:{REDIS_PORT}/2',
+    },
+}
+
+# Сессии читаются из Redis: запросы и рукопожатия WebSocket (AuthMiddlewareStack)
+# не обращаются к таблице django_session, а копия в БД переживает очистку или
+# потерю Redis (изменение сессии записывается в оба места).
+# Только Redis, без записи в БД: SESSION_ENGINE=django.contrib.sessions.backends.cache
+# Прежнее поведение (без Redis): SESSION_ENGINE=django.contrib.sessions.backends.db
+SESSION_ENGINE = os.getenv('SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db')
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Кольцевой буфер последних кадров каждого устройства (Redis Stream)
+DEVICE_STREAM_MAXLEN = int(os.getenv('DEVICE_STREAM_MAXLEN', '500'))
+DEVICE_STREAM_TTL = int(os.getenv('DEVICE_STREAM_TTL', '86400'))
+
+# Реестр подписчиков устройств: срок жизни записи, период heartbeat и
+# время кэширования ответа в памяти процесса (секунды)
+DEVICE_PRESENCE_TTL = int(os.getenv('DEVICE_PRESENCE_TTL', '30'))
+DEVICE_PRESENCE_HEARTBEAT = int(os.getenv('DEVICE_PRESENCE_HEARTBEAT', '10'))
+DEVICE_PRESENCE_CACHE_TTL = float(os.getenv('DEVICE_PRESENCE_CACHE_TTL', '1'))
+
+# WebSocket устройств: период и размер пакетной записи показаний и подтверждений команд
+DEVICE_WS_FLUSH_INTERVAL = float(os.getenv('DEVICE_WS_FLUSH_INTERVAL', '1'))
+DEVICE_WS_BATCH_SIZE = int(os.getenv('DEVICE_WS_BATCH_SIZE', '200'))
+# Период повторной отправки подключённому устройству команд, оставшихся в
+# PENDING (уведомление через pub/sub-слой могло потеряться), секунды
+DEVICE_COMMAND_RESEND_INTERVAL = float(os.getenv('DEVICE_COMMAND_RESEND_INTERVAL', '15'))
+
+# Время кэширования членства пользователя в организациях и фермах (секунды)
+MEMBERSHIP_CACHE_TTL = int(os.getenv('MEMBERSHIP_CACHE_TTL', '30'))
+
+# Срок хранения отрендеренных ответов каталогов; устаревание определяется версиями
+RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', '3600'))
+
 
 
 # Database
@@ -158,6 +207,16 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_PAGINATION_CLASS': 'DashboardAPI.v1.pagination.KeysetPagination',
+    'DEFAULT_RENDERER_CLASSES': [
+        'DashboardAPI.v1.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'DashboardAPI.v1.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 SPECTACULAR_SETTINGS = {
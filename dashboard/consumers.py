@@ -1,14 +1,34 @@
+import asyncio
 import json
+import logging
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.core.serializers.json import DjangoJSONEncoder
-from .models import SensorData, DeviceStatus, ActuatorData
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from redis import RedisError
+from . import health
+from .framing import MSGPACK_SUBPROTOCOL, encode_json, encode_msgpack
+from .ingestion import apublish_frame, build_sensor_data, build_device_status, build_actuator_data, normalize_frame
+from .models import SensorData, DeviceStatus, ActuatorData, Device, DeviceCommand
+from .presence import register_subscriber, unregister_subscriber
+from .streams import parse_cursor, read_frames_since
 from asgiref.sync import sync_to_async
-from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
 
 class SensorDataConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.device_id = self.scope['url_route']['kwargs']['device_id']
         self.group_name = f"device_{self.device_id}"
+        self.last_cursor = None
+        # Клиент может запросить бинарные кадры MessagePack вместо JSON
+        self.binary = MSGPACK_SUBPROTOCOL in self.scope.get('subprotocols', [])
 
         # Присоединение к группе
         await self.channel_layer.group_add(
@@ -16,7 +36,16 @@ class SensorDataConsumer(AsyncWebsocketConsumer):
             self.channel_name
         )
 
-        await self.accept()
+        # Отмечаем подписчика, чтобы приём данных публиковал кадры устройства
+        await self.refresh_presence()
+        self.heartbeat_task = asyncio.create_task(self.presence_heartbeat())
+
+        await self.accept(subprotocol=MSGPACK_SUBPROTOCOL if self.binary else None)
+
+        # При переподключении с курсором догоняем пропущенные кадры из буфера
+        since = parse_qs(self.scope['query_string'].decode()).get('since', [None])[0]
+        if since and await self.replay_frames(since):
+            return
 
         latest_sensor_data = await self.get_latest_sensor_data(self.device_id)
         if latest_sensor_data:
@@ -35,14 +64,12 @@ class SensorDataConsumer(AsyncWebsocketConsumer):
             if latest_sensor_data.battery_level is not None:
                 data["battery_level"] = latest_sensor_data.battery_level
             if latest_sensor_data.timestamp is not None:
-                ts_clean = latest_sensor_data.timestamp.isoformat().split('+')[0].split('Z')[0]
-                dt = datetime.fromisoformat(ts_clean)
-                data["timestamp"] = dt.strftime("%d.%m.%Y %H:%M:%S")
+                data["timestamp"] = latest_sensor_data.timestamp.isoformat()
 
-            await self.send(text_data=json.dumps({
+            await self.send_message({
                 "type": "send_sensor_data",
                 "data": data
-            }))
+            })
 
         latest_actuator_data = await self.get_latest_actuator_data(self.device_id)
         if latest_actuator_data :
@@ -56,14 +83,12 @@ class SensorDataConsumer(AsyncWebsocketConsumer):
                 data["intensity"] = latest_actuator_data.intensity
 
             if latest_actuator_data.timestamp is not None:
-                ts_clean = latest_actuator_data.timestamp.isoformat().split('+')[0].split('Z')[0]
-                dt = datetime.fromisoformat(ts_clean)
-                data["timestamp"] = dt.strftime("%d.%m.%Y %H:%M:%S")
+                data["timestamp"] = latest_actuator_data.timestamp.isoformat()
 
-            await self.send(text_data=json.dumps({
+            await self.send_message({
                 "type": "send_actuator_data",
                 "data": data
-            }))
+            })
 
         latest_status = await self.get_latest_device_status(self.device_id)
         if latest_status:
@@ -80,18 +105,23 @@ class SensorDataConsumer(AsyncWebsocketConsumer):
             if latest_status.signal_strength is not None:
                 data["signal_strength"] = latest_status.signal_strength
             if latest_status.timestamp is not None:
-                ts_clean = latest_status.timestamp.isoformat().split('+')[0].split('Z')[0]
-                dt = datetime.fromisoformat(ts_clean)
-                data["timestamp"] = dt.strftime("%d.%m.%Y %H:%M:%S")
+                data["timestamp"] = latest_status.timestamp.isoformat()
 
-            await self.send(text_data=json.dumps({
+            await self.send_message({
                 "type": "device_status_data",
                 "data": data
-            }))
+            })
 
 
 
     async def disconnect(self, close_code):
+        if hasattr(self, 'heartbeat_task'):
+            self.heartbeat_task.cancel()
+            try:
+                await unregister_subscriber(self.device_id, self.channel_name)
+            except RedisError:
+                logger.exception("Не удалось снять подписку на устройство %s", self.device_id)
+
         # Удаление из группы
         await self.channel_layer.group_discard(
             self.group_name,
@@ -101,48 +131,69 @@ class SensorDataConsumer(AsyncWebsocketConsumer):
     async def receive(self, text_data):
         pass
 
-    async def send_sensor_data(self, event):
-        timestamp = event['data']['timestamp']
+    async def refresh_presence(self):
+        try:
+            await register_subscriber(self.device_id, self.channel_name)
+        except RedisError:
+            logger.exception("Не удалось зарегистрировать подписку на устройство %s", self.device_id)
 
-        if timestamp:
-            ts_clean = timestamp.split('+')[0].split('Z')[0]
-            dt = datetime.fromisoformat(ts_clean)
-            formatted_timestamp = dt.strftime("%d.%m.%Y %H:%M:%S")
-            event['data']['timestamp'] = formatted_timestamp
+    async def presence_heartbeat(self):
+        while True:
+            await asyncio.sleep(settings.DEVICE_PRESENCE_HEARTBEAT)
+            await self.refresh_presence()
 
-        await self.send(text_data=json.dumps({
-            "type": "send_sensor_data",
-            "data": event['data']
-        }))
+    async def replay_frames(self, since):
+        """
+        Отправляет клиенту одним сообщением кадры, пропущенные после курсора since.
 
-    async def device_status_data(self, event):
-        timestamp = event['data']['timestamp']
+        Возвращает:
+            bool: True, если буфер покрыл весь пропуск и снимок из БД не нужен.
+        """
+        try:
+            frames, complete = await read_frames_since(self.device_id, since)
+        except RedisError:
+            logger.exception("Не удалось прочитать буфер кадров устройства %s", self.device_id)
+            return False
 
-        if timestamp:
-            ts_clean = timestamp.split('+')[0].split('Z')[0]
-            dt = datetime.fromisoformat(ts_clean)
-            formatted_timestamp = dt.strftime("%d.%m.%Y %H:%M:%S")
-            event['data']['timestamp'] = formatted_timestamp
+        if not complete:
+            return False
 
-        await self.send(text_data=json.dumps({
-            "type": "device_status_data",
-            "data" : event['data']
-        }))
+        self.last_cursor = frames[-1]['cursor'] if frames else since
+        await self.send_message({
+            "type": "replay",
+            "frames": frames,
+            "cursor": self.last_cursor
+        })
+        return True
 
-    async def send_actuator_data(self, event):
-        timestamp = event['data']['timestamp']
+    async def send_frame(self, event):
+        cursor = event.get('cursor')
 
-        if timestamp:
-            ts_clean = timestamp.split('+')[0].split('Z')[0]
-            dt = datetime.fromisoformat(ts_clean)
-            formatted_timestamp = dt.strftime("%d.%m.%Y %H:%M:%S")
-            event['data']['timestamp'] = formatted_timestamp
+        # Кадр уже был отправлен в составе replay
+        if cursor and self.last_cursor and parse_cursor(cursor) <= parse_cursor(self.last_cursor):
+            return
 
-        await self.send(text_data=json.dumps({
-            "type": "send_actuator_data",
-            "data" : event['data']
-        }))
-        print(event['data'])
+        await self.send_message({
+            "type": event['type'],
+            "data": event['data'],
+            "cursor": cursor
+        })
+
+    async def send_message(self, message):
+        if self.binary:
+            await self.send(bytes_data=encode_msgpack(message))
+        else:
+            await self.send(text_data=encode_json(message))
+
+    async def send_sensor_data(self, event):
+        await self.send_frame(event)
+
+    async def device_status_data(self, event):
+        await self.send_frame(event)
+
+    async def send_actuator_data(self, event):
+        await self.send_frame(event)
+        logger.debug("Действие актуатора отправлено в браузер: %s", event['data'])
 
     @sync_to_async
     def get_latest_sensor_data(self, device_id):
@@ -158,3 +209,241 @@ class SensorDataConsumer(AsyncWebsocketConsumer):
     def get_latest_actuator_data(self, device_id):
         actuator_data = ActuatorData.objects.filter(actuator__id=device_id).order_by("-timestamp").first()
         return actuator_data
+
+
+class DeviceConsumer(AsyncWebsocketConsumer):
+    """
+    Постоянное соединение устройства для приёма показаний и доставки команд.
+
+    Устройство подключается к ``ws/device/<id>/`` с заголовком
+    ``X-Device-Secret: <секрет>``; секрет выдаётся при добавлении устройства
+    (provision_devices) или перевыпуске (issue_device_secret), в БД хранится
+    только его хэш.
+    Сообщения — JSON с короткими ключами; в одном кадре можно прислать массив.
+
+    Устройство → сервер:
+        {"t": "s", "d": {...}}   показания датчика
+        {"t": "st", "d": {...}}  статус устройства
+        {"t": "a", "d": {...}}   действие актуатора
+        {"t": "ack", "id": 1, "ok": true, "r": {...}}  результат команды
+
+    Сервер → устройство:
+        {"t": "cmd", "id": 1, "c": "open", "p": {...}, "to": 30}
+
+    Новые команды приходят через группу device_commands_<id>; раз в
+    DEVICE_COMMAND_RESEND_INTERVAL секунд устройству повторно отправляются
+    команды, оставшиеся в PENDING (сообщение группы может потеряться при
+    переподключении, а с pub/sub-слоем доставка — не более одного раза).
+    Каждая команда отправляется в соединение один раз.
+
+    Показания, отметки об отправке команд и подтверждения копятся в буфере и
+    сохраняются пакетно раз в DEVICE_WS_FLUSH_INTERVAL секунд или при
+    накоплении DEVICE_WS_BATCH_SIZE записей. Кадры проверяются при приёме,
+    неверные отбрасываются по одному; команды сохраняются отдельно от
+    показаний, чтобы ошибка записи показаний не теряла подтверждения.
+    """
+
+    FRAME_TYPES = {
+        's': ('send_sensor_data', build_sensor_data),
+        'st': ('device_status_data', build_device_status),
+        'a': ('send_actuator_data', build_actuator_data),
+    }
+
+    async def connect(self):
+        self.device_id = int(self.scope['url_route']['kwargs']['device_id'])
+        secret = dict(self.scope['headers']).get(b'x-device-secret', b'').decode('latin-1')
+
+        if not secret or not await self.authenticate(secret):
+            await self.close(code=4003)
+            return
+
+        self.commands_group = f"device_commands_{self.device_id}"
+        self.records = []
+        self.acks = {}
+        self.sent_command_ids = []
+        self.pushed_command_ids = set()
+
+        await self.channel_layer.group_add(
+            self.commands_group,
+            self.channel_name
+        )
+        await self.accept()
+
+        self.flush_task = asyncio.create_task(self.flush_periodically())
+        self.resend_task = asyncio.create_task(self.resend_periodically())
+
+        await self.push_pending()
+
+    async def disconnect(self, close_code):
+        if not hasattr(self, 'flush_task'):
+            return
+
+        self.flush_task.cancel()
+        self.resend_task.cancel()
+        await self.channel_layer.group_discard(
+            self.commands_group,
+            self.channel_name
+        )
+        await self.flush()
+
+    async def receive(self, text_data=None, bytes_data=None):
+        try:
+            payload = json.loads(text_data or bytes_data)
+        except ValueError:
+            return
+
+        messages = payload if isinstance(payload, list) else [payload]
+        for message in messages:
+            if isinstance(message, dict):
+                await self.handle_message(message)
+
+        if len(self.records) + len(self.acks) >= settings.DEVICE_WS_BATCH_SIZE:
+            await self.flush()
+
+    async def handle_message(self, message):
+        kind = message.get('t')
+
+        if kind == 'ack':
+            command_id = message.get('id')
+            if isinstance(command_id, int):
+                self.acks[command_id] = (bool(message.get('ok', True)), message.get('r'), timezone.now())
+            return
+
+        if kind not in self.FRAME_TYPES:
+            return
+
+        frame_type, build = self.FRAME_TYPES[kind]
+        data = message.get('d') or {}
+        if not isinstance(data, dict):
+            return
+
+        try:
+            data = normalize_frame(data)
+            record = build(self.device_id, data)
+        except ValidationError as error:
+            logger.warning("Отброшен кадр %s устройства %s: %s", kind, self.device_id, error.messages)
+            return
+
+        await apublish_frame(self.device_id, frame_type, data)
+        if record is not None:
+            self.records.append(record)
+
+    async def push(self, command):
+        if command['id'] in self.pushed_command_ids:
+            return
+        self.pushed_command_ids.add(command['id'])
+        await self.send(text_data=json.dumps({
+            "t": "cmd",
+            "id": command['id'],
+            "c": command['command'],
+            "p": command['parameters'],
+            "to": command['timeout']
+        }, cls=DjangoJSONEncoder))
+        self.sent_command_ids.append(command['id'])
+
+    async def push_command(self, event):
+        await self.push(event['command'])
+
+    async def push_pending(self):
+        for command in await self.get_pending_commands():
+            await self.push(command)
+
+    async def resend_periodically(self):
+        while True:
+            await asyncio.sleep(settings.DEVICE_COMMAND_RESEND_INTERVAL)
+            try:
+                await self.push_pending()
+            except Exception:
+                logger.exception("Не удалось повторно отправить команды устройству %s", self.device_id)
+
+    async def flush_periodically(self):
+        while True:
+            await asyncio.sleep(settings.DEVICE_WS_FLUSH_INTERVAL)
+            await self.flush()
+
+    async def flush(self):
+        records, self.records = self.records, []
+        acks, self.acks = self.acks, {}
+        sent_command_ids, self.sent_command_ids = self.sent_command_ids, []
+
+        if acks or sent_command_ids:
+            try:
+                await self.save_commands(acks, sent_command_ids)
+            except Exception:
+                logger.exception("Не удалось сохранить состояние команд устройства %s", self.device_id)
+                # Повторяем при следующем сбросе; новые подтверждения важнее старых
+                self.acks = {**acks, **self.acks}
+                self.sent_command_ids = sent_command_ids + self.sent_command_ids
+
+        if records:
+            try:
+                await self.save_records(records)
+            except Exception:
+                logger.exception("Не удалось сохранить показания устройства %s", self.device_id)
+
+    @database_sync_to_async
+    def authenticate(self, secret):
+        device = Device.objects.filter(id=self.device_id, is_active=True).only('secret_hash').first()
+        return device is not None and device.check_secret(secret)
+
+    @database_sync_to_async
+    def get_pending_commands(self):
+        return list(
+            DeviceCommand.objects
+            .filter(device_id=self.device_id, status=DeviceCommand.CommandStatus.PENDING)
+            .order_by('issued_at')
+            .values('id', 'command', 'parameters', 'timeout')
+        )
+
+    @staticmethod
+    def insert_records(records):
+        for model in {type(record) for record in records}:
+            model.objects.bulk_create([record for record in records if type(record) is model])
+        health.record_statuses(record for record in records if type(record) is DeviceStatus)
+
+    @database_sync_to_async
+    def save_records(self, records):
+        """
+        Сохраняет показания пакетом. Если пакет не записывается, записи
+        сохраняются по одной и отбрасываются только те, что не прошли.
+        """
+        try:
+            with transaction.atomic():
+                self.insert_records(records)
+            return
+        except DatabaseError:
+            logger.warning("Пакет показаний устройства %s не сохранён, запись по одной", self.device_id)
+
+        for record in records:
+            try:
+                with transaction.atomic():
+                    self.insert_records([record])
+            except DatabaseError:
+                logger.exception("Отброшена запись %s устройства %s", type(record).__name__, self.device_id)
+
+    @database_sync_to_async
+    def save_commands(self, acks, sent_command_ids):
+        with transaction.atomic():
+            if sent_command_ids:
+                DeviceCommand.objects.filter(
+                    id__in=sent_command_ids,
+                    status=DeviceCommand.CommandStatus.PENDING
+                ).update(status=DeviceCommand.CommandStatus.SENT)
+
+            if acks:
+                # Подтверждать можно только команды этого устройства
+                own_ids = DeviceCommand.objects.filter(
+                    device_id=self.device_id,
+                    id__in=acks.keys()
+                ).values_list('id', flat=True)
+
+                commands = []
+                for command_id in own_ids:
+                    ok, response, executed_at = acks[command_id]
+                    commands.append(DeviceCommand(
+                        id=command_id,
+                        status=DeviceCommand.CommandStatus.EXECUTED if ok else DeviceCommand.CommandStatus.FAILED,
+                        executed_at=executed_at,
+                        response=response
+                    ))
+                DeviceCommand.objects.bulk_update(commands, ['status', 'executed_at', 'response'])
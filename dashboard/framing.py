@@ -0,0 +1,149 @@
+"""
+Кодирование сообщений SensorDataConsumer для браузера.
+
+По умолчанию сообщения уходят JSON-текстом с временной меткой в формате
+дашборда. Клиент, запросивший при подключении подпротокол
+MSGPACK_SUBPROTOCOL, получает бинарные кадры MessagePack с короткими ключами
+и временной меткой в миллисекундах Unix.
+"""
+import json
+from datetime import datetime
+from typing import Optional
+
+import msgpack
+from django.utils import timezone
+
+MSGPACK_SUBPROTOCOL = 'farm.msgpack.v1'
+
+# Числа не меньше этого считаются миллисекундами Unix, меньше — секундами
+EPOCH_MS_THRESHOLD = 10 ** 11
+
+SHORT_TYPES = {
+    'send_sensor_data': 's',
+    'device_status_data': 'st',
+    'send_actuator_data': 'a',
+    'replay': 'r',
+}
+
+SHORT_KEYS = {
+    'temperature': 'tp',
+    'humidity': 'h',
+    'soil_moisture': 'sm',
+    'light_intensity': 'li',
+    'ph_level': 'ph',
+    'battery_level': 'b',
+    'online': 'on',
+    'cpu_usage': 'cpu',
+    'memory_usage': 'mem',
+    'disk_usage': 'dsk',
+    'signal_strength': 'sig',
+    'action': 'ac',
+    'duration': 'du',
+    'intensity': 'in',
+    'additional_info': 'x',
+    'timestamp': 'ts',
+}
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    """
+    Приводит временную метку кадра к datetime в текущем часовом поясе.
+
+    Один и тот же момент даёт одинаковый результат независимо от формата
+    метки: смещение строки ISO 8601 учитывается при переводе, а не
+    сохраняется.
+
+    Аргументы:
+        value: datetime, строка ISO 8601 (без смещения — в текущем часовом
+            поясе) или число секунд либо миллисекунд Unix.
+
+    Возвращает:
+        datetime | None: None, если значение не распознано.
+    """
+    if isinstance(value, datetime):
+        dt = value
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        seconds = value / 1000 if abs(value) >= EPOCH_MS_THRESHOLD else value
+        try:
+            return datetime.fromtimestamp(seconds, tz=timezone.get_current_timezone())
+        except (OverflowError, OSError, ValueError):
+            return None
+    elif isinstance(value, str):
+        try:
+            dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    else:
+        return None
+
+    if timezone.is_naive(dt):
+        return timezone.make_aware(dt)
+    return timezone.localtime(dt)
+
+
+def format_timestamp(timestamp):
+    """
+    Приводит временную метку кадра к формату дашборда (время в текущем
+    часовом поясе). Нераспознанное значение возвращается без изменений.
+    """
+    dt = parse_timestamp(timestamp)
+    if dt is None:
+        return timestamp
+    return dt.strftime("%d.%m.%Y %H:%M:%S")
+
+
+def to_epoch_ms(timestamp):
+    """
+    Переводит временную метку кадра в миллисекунды Unix. Нераспознанное
+    значение возвращается без изменений.
+    """
+    dt = parse_timestamp(timestamp)
+    if dt is None:
+        return timestamp
+    return int(dt.timestamp() * 1000)
+
+
+def _json_message(message):
+    encoded = {'type': message['type']}
+    if 'data' in message:
+        data = message['data']
+        if data.get('timestamp'):
+            data = {**data, 'timestamp': format_timestamp(data['timestamp'])}
+        encoded['data'] = data
+    if 'frames' in message:
+        encoded['frames'] = [_json_message(frame) for frame in message['frames']]
+    if 'cursor' in message:
+        encoded['cursor'] = message['cursor']
+    return encoded
+
+
+def _msgpack_message(message):
+    encoded = {'t': SHORT_TYPES.get(message['type'], message['type'])}
+    if 'data' in message:
+        encoded['d'] = {
+            SHORT_KEYS.get(key, key): to_epoch_ms(value) if key == 'timestamp' and value else value
+            for key, value in message['data'].items()
+        }
+    if 'frames' in message:
+        encoded['f'] = [_msgpack_message(frame) for frame in message['frames']]
+    if message.get('cursor'):
+        encoded['c'] = message['cursor']
+    return encoded
+
+
+def encode_json(message: dict) -> str:
+    """
+    Кодирует сообщение в JSON-текст (формат по умолчанию).
+
+    Аргументы:
+        message (dict): Сообщение с ключами type и data или frames, опционально cursor;
+            временные метки в data — строки ISO 8601 или числа Unix.
+    """
+    return json.dumps(_json_message(message))
+
+
+def encode_msgpack(message: dict) -> bytes:
+    """
+    Кодирует сообщение в компактный бинарный кадр MessagePack.
+    """
+    return msgpack.packb(_msgpack_message(message), use_bin_type=True)
@@ -0,0 +1,141 @@
+"""
+Geohash для пространственных запросов по DeviceLocation без PostGIS.
+
+Geohash кодирует точку строкой base32, у которой каждый следующий символ
+делит ячейку на 32 части; точки в одной ячейке имеют общий префикс. Поэтому
+B-tree индекс по строке позволяет отобрать кандидатов в области условием
+LIKE 'префикс%' по нескольким ячейкам, покрывающим область, а точную
+проверку координат и расстояний выполнять уже для них.
+"""
+import math
+from typing import Iterable, Optional
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Ячейка 9-символьного geohash — примерно 4.8 x 4.8 м
+PRECISION = 9
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def encode(latitude, longitude, precision: int = PRECISION) -> str:
+    """
+    Кодирует координаты в geohash заданной длины.
+
+    Аргументы:
+        latitude (float | Decimal): Широта, от -90 до 90.
+        longitude (float | Decimal): Долгота, от -180 до 180.
+        precision (int): Длина результата.
+    """
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    latitude, longitude = float(latitude), float(longitude)
+
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        value, value_range = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (value_range[0] + value_range[1]) / 2
+        if value >= middle:
+            bits = bits * 2 + 1
+            value_range[0] = middle
+        else:
+            bits = bits * 2
+            value_range[1] = middle
+        even = not even
+
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def encode_location(latitude, longitude) -> str:
+    """Geohash местоположения или пустая строка, если координаты не заданы."""
+    if latitude is None or longitude is None:
+        return ''
+    return encode(latitude, longitude)
+
+
+def cell_size(precision: int) -> tuple:
+    """
+    Возвращает:
+        tuple: Высота и ширина ячейки в градусах (широта, долгота).
+    """
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def _grid(low, high, origin, span, step):
+    """Номера ячеек сетки с шагом step, пересекающих отрезок [low, high]."""
+    first = int((low - origin) // step)
+    last = int((high - origin) // step)
+    return range(max(first, 0), min(last, round(span / step) - 1) + 1)
+
+
+def bbox_cells(south, west, north, east, max_cells: int = 32) -> Optional[list]:
+    """
+    Подбирает наибольшую точность, при которой область покрывается не более
+    чем max_cells ячейками, и возвращает geohash этих ячеек.
+
+    Область не должна пересекать антимеридиан (west <= east).
+
+    Возвращает:
+        list | None: Префиксы ячеек или None, если область слишком велика
+            для отбора по префиксу.
+    """
+    south, west, north, east = map(float, (south, west, north, east))
+    for precision in range(PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        rows = _grid(south, north, -90.0, 180.0, height)
+        columns = _grid(west, east, -180.0, 360.0, width)
+        if len(rows) * len(columns) > max_cells:
+            continue
+
+        return sorted({
+            encode(-90.0 + (row + 0.5) * height, -180.0 + (column + 0.5) * width, precision)
+            for row in rows
+            for column in columns
+        })
+    return None
+
+
+def split_antimeridian(south, west, north, east) -> Iterable[tuple]:
+    """Разбивает область, пересекающую антимеридиан (west > east), на две."""
+    if west <= east:
+        return [(south, west, north, east)]
+    return [(south, west, north, 180.0), (south, -180.0, north, east)]
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> float:
+    """Расстояние по дуге большого круга в километрах."""
+    lat1, lon1, lat2, lon2 = map(math.radians, map(float, (lat1, lon1, lat2, lon2)))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bbox(latitude, longitude, radius_km) -> tuple:
+    """
+    Область (south, west, north, east), гарантированно содержащая все точки
+    не дальше radius_km от заданной. Если область накрывает полюс, она
+    расширяется до всех долгот; west > east означает переход через антимеридиан.
+    """
+    latitude, longitude = float(latitude), float(longitude)
+    delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    south, north = latitude - delta_lat, latitude + delta_lat
+    if south <= -90 or north >= 90:
+        return max(south, -90.0), -180.0, min(north, 90.0), 180.0
+
+    ratio = math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(latitude))
+    delta_lon = math.degrees(math.asin(min(1.0, ratio)))
+    west = (longitude - delta_lon + 540) % 360 - 180
+    east = (longitude + delta_lon + 540) % 360 - 180
+    return south, west, north, east
@@ -0,0 +1,226 @@
+"""
+Сводки состояния устройств по фермам и зонам (FarmHealthSummary, ZoneHealthSummary).
+
+Частые изменения применяются инкрементально: приём статусов меняет счётчик
+онлайн-устройств только при переходе устройства между онлайн и оффлайн
+(Device.is_online хранит последнее состояние), новая тревога увеличивает
+счётчик открытых тревог. Это один-два UPDATE по строкам сводок вместо
+пересчёта по DeviceStatus и DeviceEvent при каждом чтении.
+
+Редкие изменения — добавление, перенос и удаление устройств, смена зоны
+или данных обслуживания — пересчитывают сводки затронутых ферм целиком
+(reconcile) после фиксации транзакции; изменения, не влияющие на счётчики,
+пересчёта не вызывают. Решение и повторное открытие тревог сдвигают
+счётчик тревог так же, как новые тревоги. Число устройств, которым требуется обслуживание,
+зависит от текущей даты, поэтому reconcile для всех ферм нужно запускать
+периодически (команда reconcile_health); она же исправляет любое
+расхождение счётчиков.
+"""
+from collections import Counter
+
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from users.models import Farm
+from .models import Device, DeviceEvent, DeviceStatus, FarmHealthSummary, Zone, ZoneHealthSummary
+
+ALERT_TYPES = (DeviceEvent.EventType.ERROR, DeviceEvent.EventType.ALERT)
+SUMMARY_FIELDS = ('devices_total', 'devices_online', 'maintenance_due', 'open_alerts')
+# Поля устройства, от которых зависят сводки (ферма и срок обслуживания)
+DEVICE_FIELDS = ('farm_id', 'last_maintenance', 'maintenance_interval')
+
+
+class IsDistinctFrom(models.Func):
+    """a IS DISTINCT FROM b: сравнение, в котором NULL — обычное значение."""
+    arity = 2
+    template = '(%(expressions)s)'
+    arg_joiner = ' IS DISTINCT FROM '
+    output_field = models.BooleanField()
+
+
+def _add(counts, key, field, value):
+    if key is not None:
+        counts.setdefault(key, dict.fromkeys(SUMMARY_FIELDS, 0))[field] += value
+
+
+def reconcile(farm_ids=None) -> int:
+    """
+    Пересчитывает сводки ферм и их зон по текущим данным.
+
+    Сначала Device.is_online сверяется с последним статусом устройства
+    (обновляются только расходящиеся строки), затем строки сводок
+    блокируются, счётчики считаются несколькими агрегирующими запросами и
+    записываются одним upsert на таблицу. Блокировка не даёт потерять сдвиги
+    (_shift) параллельного приёма: они применяются до подсчёта или после
+    записи сводки.
+
+    Аргументы:
+        farm_ids (Iterable | None): Фермы для пересчёта; None — все фермы.
+
+    Возвращает:
+        int: Число пересчитанных ферм.
+    """
+    farms_queryset = Farm.objects.all()
+    scope = Q()
+    if farm_ids is not None:
+        farm_ids = list(farm_ids)
+        farms_queryset = farms_queryset.filter(id__in=farm_ids)
+        scope = Q(farm_id__in=farm_ids)
+
+    farm_ids = list(farms_queryset.values_list('id', flat=True))
+    zone_ids = list(Zone.objects.filter(scope).values_list('id', flat=True))
+    devices = Device.objects.filter(scope)
+    events = DeviceEvent.objects.filter(device__in=devices) if scope else DeviceEvent.objects.all()
+
+    latest_status = DeviceStatus.objects.filter(device_id=OuterRef('pk')).order_by('-timestamp').values('online')[:1]
+    (
+        devices
+        .alias(latest_online=Subquery(latest_status))
+        .filter(IsDistinctFrom('is_online', 'latest_online'))
+        .update(is_online=Subquery(latest_status))
+    )
+
+    with transaction.atomic():
+        # Сдвиги счётчиков (_shift) ждут записи сводки или уже учтены в подсчёте ниже
+        for model, key, ids in ((FarmHealthSummary, 'farm_id', farm_ids), (ZoneHealthSummary, 'zone_id', zone_ids)):
+            list(model.objects.filter(**{f'{key}__in': ids}).order_by(key).select_for_update().values_list('pk'))
+
+        farms = {farm_id: dict.fromkeys(SUMMARY_FIELDS, 0) for farm_id in farm_ids}
+        zones = {zone_id: dict.fromkeys(SUMMARY_FIELDS, 0) for zone_id in zone_ids}
+
+        groups = (
+            devices
+            .values_list('farm_id', 'location__zone_id')
+            .annotate(
+                total=Count('id'),
+                online=Count('id', filter=Q(is_online=True)),
+                due=Count('id', filter=Q(maintenance_due_date__lte=timezone.localdate())),
+            )
+            .order_by()
+        )
+        for farm_id, zone_id, total, online, due in groups:
+            for counts, key in ((farms, farm_id), (zones, zone_id)):
+                _add(counts, key, 'devices_total', total)
+                _add(counts, key, 'devices_online', online)
+                _add(counts, key, 'maintenance_due', due)
+
+        alerts = (
+            events
+            .filter(resolved=False, event_type__in=ALERT_TYPES)
+            .values_list('device__farm_id', 'device__location__zone_id')
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        for farm_id, zone_id, count in alerts:
+            _add(farms, farm_id, 'open_alerts', count)
+            _add(zones, zone_id, 'open_alerts', count)
+
+        now = timezone.now()
+        for model, key, counts in ((FarmHealthSummary, 'farm_id', farms), (ZoneHealthSummary, 'zone_id', zones)):
+            model.objects.bulk_create(
+                [model(**{key: pk}, **values, updated_at=now) for pk, values in counts.items()],
+                update_conflicts=True,
+                unique_fields=[key.removesuffix('_id')],
+                update_fields=[*SUMMARY_FIELDS, 'updated_at'],
+                batch_size=1000,
+            )
+    return len(farm_ids)
+
+
+def schedule_reconcile(farm_ids) -> None:
+    """Пересчитывает сводки ферм после фиксации текущей транзакции."""
+    farm_ids = sorted(set(farm_ids) - {None})
+    if farm_ids:
+        transaction.on_commit(lambda: reconcile(farm_ids))
+
+
+def _shift(field, farm_deltas, zone_deltas) -> None:
+    """
+    Изменяет счётчик field сводок на заданные величины. Фермы, для которых
+    сводки ещё нет, пересчитываются целиком.
+    """
+    now = timezone.now()
+
+    def shift(queryset, delta):
+        # Расхождение со старыми данными не должно ломать приём (CHECK >= 0)
+        return queryset.update(**{field: Greatest(F(field) + delta, 0)}, updated_at=now)
+
+    # Строки сводок блокируются в одном порядке, как в reconcile
+    missing = {
+        farm_id for farm_id, delta in sorted(farm_deltas.items())
+        if delta and not shift(FarmHealthSummary.objects.filter(farm_id=farm_id), delta)
+    }
+    missing_zones = [
+        zone_id for zone_id, delta in sorted(zone_deltas.items())
+        if delta and not shift(ZoneHealthSummary.objects.filter(zone_id=zone_id), delta)
+    ]
+    if missing_zones:
+        missing.update(Zone.objects.filter(pk__in=missing_zones).values_list('farm_id', flat=True))
+    schedule_reconcile(missing)
+
+
+def record_statuses(statuses) -> None:
+    """
+    Учитывает в сводках переходы устройств между онлайн и оффлайн.
+
+    Аргументы:
+        statuses (Iterable[DeviceStatus]): Сохранённые статусы в порядке
+            поступления; для каждого устройства важен последний.
+    """
+    latest = {status.device_id: bool(status.online) for status in statuses}
+    if not latest:
+        return
+    farm_deltas = Counter()
+    zone_deltas = Counter()
+
+    with transaction.atomic():
+        for online in (True, False):
+            ids = [device_id for device_id, value in latest.items() if value is online]
+            if not ids:
+                continue
+
+            changed = Device.objects.filter(id__in=ids).exclude(is_online=online)
+            rows = list(
+                changed
+                .select_for_update(of=('self',))
+                .values_list('farm_id', 'location__zone_id', 'is_online')
+            )
+            if not rows:
+                continue
+            changed.update(is_online=online)
+
+            for farm_id, zone_id, previous in rows:
+                # Устройство без статусов не считалось ни онлайн, ни оффлайн
+                delta = 1 if online else -int(bool(previous))
+                farm_deltas[farm_id] += delta
+                if zone_id:
+                    zone_deltas[zone_id] += delta
+
+        _shift('devices_online', farm_deltas, zone_deltas)
+
+
+def is_open_alert(event) -> bool:
+    return not event.resolved and event.event_type in ALERT_TYPES
+
+
+def record_alert(event, was_open=False, deleted=False) -> None:
+    """
+    Учитывает в сводках открытие или закрытие тревоги.
+
+    Аргументы:
+        event (DeviceEvent): Созданное, изменённое или удалённое событие.
+        was_open (bool): Было ли событие открытой тревогой до изменения.
+        deleted (bool): Событие удалено.
+    """
+    is_open = is_open_alert(event) and not deleted
+    delta = int(is_open) - int(was_open)
+    if not delta:
+        return
+
+    row = Device.objects.filter(pk=event.device_id).values_list('farm_id', 'location__zone_id').first()
+    if row is None:
+        return
+    farm_id, zone_id = row
+    _shift('open_alerts', {farm_id: delta}, {zone_id: delta} if zone_id else {})
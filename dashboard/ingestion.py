@@ -0,0 +1,145 @@
+from typing import Optional
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from .framing import parse_timestamp
+from .models import SensorData, DeviceStatus, ActuatorData
+from .presence import has_subscribers, ahas_subscribers
+from .streams import append_frame, aappend_frame
+
+SENSOR_FIELDS = ('temperature', 'humidity', 'soil_moisture', 'light_intensity', 'ph_level')
+
+
+def publish_frame(device_id, frame_type: str, data: dict) -> None:
+    """
+    Публикует кадр устройства подписанным браузерам.
+
+    Кадр сначала записывается в кольцевой буфер устройства, затем рассылается
+    в группу ``device_{id}`` вместе с курсором, по которому клиент сможет
+    запросить пропущенные кадры после переподключения. Если устройство никто
+    не смотрит, публикация в channel layer пропускается.
+
+    Аргументы:
+        device_id: Идентификатор устройства.
+        frame_type (str): Обработчик consumer'а (send_sensor_data, device_status_data, ...).
+        data (dict): Полезная нагрузка кадра.
+    """
+    cursor = append_frame(device_id, frame_type, data)
+
+    if not has_subscribers(device_id):
+        return
+
+    channel_layer = get_channel_layer()
+    async_to_sync(channel_layer.group_send)(
+        f'device_{device_id}',
+        {
+            'type': frame_type,
+            'data': data,
+            'cursor': cursor,
+        }
+    )
+
+
+async def apublish_frame(device_id, frame_type: str, data: dict) -> None:
+    """
+    Асинхронный вариант publish_frame для приёма данных через WebSocket.
+    """
+    cursor = await aappend_frame(device_id, frame_type, data)
+
+    if not await ahas_subscribers(device_id):
+        return
+
+    await get_channel_layer().group_send(
+        f'device_{device_id}',
+        {
+            'type': frame_type,
+            'data': data,
+            'cursor': cursor,
+        }
+    )
+
+
+def normalize_frame(data: dict) -> dict:
+    """
+    Приводит временную метку кадра к строке ISO 8601 с часовым поясом, чтобы
+    буфер кадров, рассылка и запись в БД получали одно представление
+    (устройства присылают ISO-строки, секунды или миллисекунды Unix).
+
+    Исключения:
+        ValidationError: Если временная метка не распознана.
+    """
+    timestamp = data.get('timestamp')
+    if timestamp in (None, ''):
+        return data
+
+    parsed = parse_timestamp(timestamp)
+    if parsed is None:
+        raise ValidationError({'timestamp': f"Неверная временная метка: {timestamp!r}"})
+    return {**data, 'timestamp': parsed.isoformat()}
+
+
+def clean_record(record):
+    """
+    Проверяет поля записи из кадра устройства и приводит их к типам модели
+    (строки дат, числа), чтобы ошибка в одном кадре не ломала пакетную запись.
+
+    Исключения:
+        ValidationError: Если кадр нельзя сохранить.
+    """
+    record.clean_fields(exclude=['device', 'actuator'])
+    return record
+
+
+def build_sensor_data(device_id, data: dict) -> Optional[SensorData]:
+    """
+    Создаёт (без сохранения) проверенную запись показаний датчика из кадра устройства.
+
+    Возвращает:
+        SensorData | None: Запись или None, если в кадре нет ни одного показания.
+
+    Исключения:
+        ValidationError: Если показания не подходят для записи.
+    """
+    values = {field: data[field] for field in SENSOR_FIELDS if field in data}
+    if not values:
+        return None
+
+    return clean_record(SensorData(
+        device_id=device_id,
+        timestamp=data.get('timestamp') or timezone.now(),
+        battery_level=data.get('battery_level'),
+        **values
+    ))
+
+
+def build_device_status(device_id, data: dict) -> DeviceStatus:
+    """
+    Создаёт (без сохранения) проверенную запись статуса устройства из кадра.
+    """
+    return clean_record(DeviceStatus(
+        device_id=device_id,
+        timestamp=data.get('timestamp') or timezone.now(),
+        online=data.get('online', False),
+        cpu_usage=data.get('cpu_usage'),
+        memory_usage=data.get('memory_usage'),
+        disk_usage=data.get('disk_usage'),
+        signal_strength=data.get('signal_strength'),
+        additional_info=data.get('additional_info'),
+    ))
+
+
+def build_actuator_data(device_id, data: dict) -> ActuatorData:
+    """
+    Создаёт (без сохранения) проверенную запись действия актуатора из кадра.
+    """
+    return clean_record(ActuatorData(
+        actuator_id=device_id,
+        timestamp=data.get('timestamp') or timezone.now(),
+        action=data.get('action'),
+        duration=data.get('duration'),
+        intensity=data.get('intensity'),
+        additional_info=data.get('additional_info') or {},
+    ))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.models import Device
+
+
+class Command(BaseCommand):
+    help = "Выдаёт устройству новый секрет подключения к ws/device/; прежний перестаёт действовать."
+
+    def add_arguments(self, parser):
+        parser.add_argument('serial_numbers', nargs='+', help="Серийные номера устройств")
+
+    def handle(self, *args, **options):
+        devices = {device.serial_number: device for device in Device.objects.filter(serial_number__in=options['serial_numbers'])}
+        missing = [serial for serial in options['serial_numbers'] if serial not in devices]
+        if missing:
+            raise CommandError(f"Устройства не найдены: {', '.join(missing)}")
+
+        for serial in dict.fromkeys(options['serial_numbers']):
+            device = devices[serial]
+            secret = device.issue_secret()
+            device.save(update_fields=['secret_hash', 'updated_at'])
+            self.stdout.write(f"{serial}\t{secret}")
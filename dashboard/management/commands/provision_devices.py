@@ -0,0 +1,58 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.provisioning import ProvisioningError, parse_csv, provision_devices
+from users.models import CustomUser, Farm
+
+
+class Command(BaseCommand):
+    help = "Массово добавляет устройства на ферму из CSV- или JSON-файла."
+
+    def add_arguments(self, parser):
+        parser.add_argument('farm', help="Slug фермы")
+        parser.add_argument('path', help="Путь к .csv или .json файлу")
+        parser.add_argument('--added-by', help="Телефон пользователя, от имени которого добавляются устройства")
+
+    def handle(self, *args, **options):
+        try:
+            farm = Farm.objects.get(slug=options['farm'])
+        except Farm.DoesNotExist:
+            raise CommandError(f"Ферма {options['farm']} не найдена")
+
+        added_by = None
+        if options['added_by']:
+            added_by = CustomUser.objects.filter(phone_number=options['added_by']).first()
+            if added_by is None:
+                raise CommandError(f"Пользователь {options['added_by']} не найден")
+
+        path = Path(options['path'])
+        try:
+            content = path.read_text(encoding='utf-8-sig')
+        except (OSError, UnicodeDecodeError) as error:
+            raise CommandError(f"Не удалось прочитать {path}: {error}")
+
+        if path.suffix.lower() == '.json':
+            try:
+                rows = json.loads(content)
+            except json.JSONDecodeError as error:
+                raise CommandError(f"Неверный JSON в {path}: {error}")
+            if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+                raise CommandError("Ожидается список устройств")
+        else:
+            rows = parse_csv(content)
+
+        if not rows:
+            raise CommandError("Пустой пакет")
+
+        try:
+            devices = provision_devices(farm, rows, added_by=added_by)
+        except ProvisioningError as error:
+            for item in error.errors:
+                self.stderr.write(f"Строка {item['row']}, {item['field']}: {item['error']}")
+            raise CommandError(str(error))
+
+        for device in devices:
+            self.stdout.write(f"{device.serial_number}\t{device.secret}")
+        self.stdout.write(self.style.SUCCESS(f"Добавлено устройств: {len(devices)}"))
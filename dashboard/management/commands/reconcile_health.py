@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.health import reconcile
+from users.models import Farm
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает сводки состояния устройств ферм и зон. "
+        "Запускается периодически (например, раз в час из cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--farm', action='append', help="Slug фермы (можно указать несколько раз)")
+
+    def handle(self, *args, **options):
+        farm_ids = None
+        if options['farm']:
+            farm_ids = list(Farm.objects.filter(slug__in=options['farm']).values_list('id', flat=True))
+            if len(farm_ids) != len(set(options['farm'])):
+                raise CommandError("Некоторые фермы не найдены")
+
+        count = reconcile(farm_ids)
+        self.stdout.write(self.style.SUCCESS(f"Пересчитано ферм: {count}"))
@@ -0,0 +1,17 @@
+from datetime import timedelta
+
+from django.db import models
+from django.utils import timezone
+
+
+class DeviceQuerySet(models.QuerySet):
+    def maintenance_due(self, within_days: int = 0):
+        """
+        Устройства, обслуживание которых просрочено или наступит в ближайшие
+        within_days дней.
+
+        Условие — диапазон по вычисляемой колонке maintenance_due_date и
+        обслуживается индексом (farm, maintenance_due_date, id).
+        """
+        until = timezone.localdate() + timedelta(days=within_days)
+        return self.filter(maintenance_due_date__lte=until)
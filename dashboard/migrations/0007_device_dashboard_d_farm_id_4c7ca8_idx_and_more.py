@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0006_alter_devicelocation_zone'),
+        ('users', '0022_externalorganizationmembership_users_exter_organiz_ff8689_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='device',
+            index=models.Index(fields=['farm', 'name', 'id'], name='dashboard_d_farm_id_4c7ca8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='devicemodel',
+            index=models.Index(fields=['manufacturer', 'name', 'id'], name='dashboard_d_manufac_7bb964_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='zone',
+            index=models.Index(fields=['farm', 'name', 'id'], name='dashboard_z_farm_id_aa1ad8_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0008_device_device_name_trgm_device_device_serial_trgm'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sensordata',
+            index=models.Index(fields=['device', '-timestamp'], name='dashboard_s_device__d65e33_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='sensordata',
+            name='dashboard_s_device__041f48_idx',
+        ),
+    ]
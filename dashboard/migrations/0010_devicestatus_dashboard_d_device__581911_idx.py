@@ -0,0 +1,17 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0009_remove_sensordata_dashboard_s_device__041f48_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='devicestatus',
+            index=models.Index(fields=['device', '-timestamp'], name='dashboard_d_device__581911_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:46
+
+from django.db import migrations, models
+
+from dashboard.geohash import encode_location
+
+
+def backfill_geohash(apps, schema_editor):
+    DeviceLocation = apps.get_model('dashboard', 'DeviceLocation')
+    locations = DeviceLocation.objects.filter(latitude__isnull=False, longitude__isnull=False).only('id', 'latitude', 'longitude')
+
+    batch = []
+    for location in locations.iterator(chunk_size=2000):
+        location.geohash = encode_location(location.latitude, location.longitude)
+        batch.append(location)
+        if len(batch) == 2000:
+            DeviceLocation.objects.bulk_update(batch, ['geohash'])
+            batch = []
+    DeviceLocation.objects.bulk_update(batch, ['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0010_devicestatus_dashboard_d_device__581911_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='devicelocation',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=9, verbose_name='Geohash'),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0011_devicelocation_geohash'),
+        ('users', '0023_customuser_user_first_name_trgm_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FarmHealthSummary',
+            fields=[
+                ('devices_total', models.PositiveIntegerField(default=0, verbose_name='Устройств')),
+                ('devices_online', models.PositiveIntegerField(default=0, verbose_name='Онлайн')),
+                ('maintenance_due', models.PositiveIntegerField(default=0, verbose_name='Требуют обслуживания')),
+                ('open_alerts', models.PositiveIntegerField(default=0, verbose_name='Открытых тревог')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('farm', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='health', serialize=False, to='users.farm', verbose_name='Ферма')),
+            ],
+            options={
+                'verbose_name': 'Сводка по ферме',
+                'verbose_name_plural': 'Сводки по фермам',
+            },
+        ),
+        migrations.CreateModel(
+            name='ZoneHealthSummary',
+            fields=[
+                ('devices_total', models.PositiveIntegerField(default=0, verbose_name='Устройств')),
+                ('devices_online', models.PositiveIntegerField(default=0, verbose_name='Онлайн')),
+                ('maintenance_due', models.PositiveIntegerField(default=0, verbose_name='Требуют обслуживания')),
+                ('open_alerts', models.PositiveIntegerField(default=0, verbose_name='Открытых тревог')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('zone', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='health', serialize=False, to='dashboard.zone', verbose_name='Зона')),
+            ],
+            options={
+                'verbose_name': 'Сводка по зоне',
+                'verbose_name_plural': 'Сводки по зонам',
+            },
+        ),
+        migrations.AddField(
+            model_name='device',
+            name='is_online',
+            field=models.BooleanField(editable=False, null=True, verbose_name='В сети'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:53
+
+import dashboard.models
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0012_health_summaries'),
+        ('users', '0023_customuser_user_first_name_trgm_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='device',
+            name='maintenance_due_date',
+            field=models.GeneratedField(db_persist=True, expression=dashboard.models.AddDays('last_maintenance', django.db.models.functions.comparison.NullIf('maintenance_interval', 0)), output_field=models.DateField(), verbose_name='Дата следующего обслуживания'),
+        ),
+        migrations.AddIndex(
+            model_name='device',
+            index=models.Index(fields=['farm', 'maintenance_due_date', 'id'], name='dashboard_d_farm_id_69c8e8_idx'),
+        ),
+    ]
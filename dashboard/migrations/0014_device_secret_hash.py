@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 18:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0013_device_maintenance_due_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='device',
+            name='secret_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='Хэш секрета подключения'),
+        ),
+    ]
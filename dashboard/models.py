@@ -1,11 +1,27 @@
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
+from django.db.models.functions import NullIf, Upper
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django.urls import reverse
 from datetime import timedelta
+import hashlib
+import hmac
+import secrets
 from users.models import CustomUser, Farm, FarmGroup, FarmMembership
+from .geohash import PRECISION as GEOHASH_PRECISION, encode_location
+from .managers import DeviceQuerySet
+
+
+class AddDays(models.Func):
+    """Дата плюс целое число дней (NULL, если любой из аргументов NULL)."""
+    arity = 2
+    template = '(%(expressions)s)'
+    arg_joiner = ' + '
+    output_field = models.DateField()
+
 
 class Zone(models.Model):
     """
@@ -77,6 +93,9 @@ class Zone(models.Model):
                 name='unique_zone_name_per_farm'
             )
         ]
+        indexes = [
+            models.Index(fields=['farm', 'name', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.get_zone_type_display()})"
@@ -138,6 +157,9 @@ class DeviceModel(models.Model):
         verbose_name = _("Модель устройства")
         verbose_name_plural = _("Модели устройств")
         ordering = ['manufacturer', 'name']
+        indexes = [
+            models.Index(fields=['manufacturer', 'name', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.manufacturer} {self.name}"
@@ -157,19 +179,26 @@ class Device(models.Model):
         - added_by (ForeignKey): Пользователь, который добавил устройство.
         - model (ForeignKey): Модель устройства, к которой относится это устройство.
         - serial_number (str): Уникальный серийный номер устройства.
+        - secret_hash (str): SHA-256 секрета, которым устройство подключается к ws/device/ (пусто — секрет не выдан).
         - connection_type (str): Тип подключения устройства (например, Wi-Fi, Ethernet).
         - mac_address (str): MAC-адрес устройства (если применимо).
         - ip_address (str): IP-адрес устройства (если применимо).
         - firmware_version (str): Версия прошивки устройства.
         - is_active (bool): Статус активности устройства.
+        - is_online (bool | None): Онлайн ли устройство по последнему статусу (None — статусов не было).
         - installation_date (date): Дата установки устройства.
         - last_maintenance (date): Дата последнего обслуживания устройства.
         - maintenance_interval (int): Интервал обслуживания в днях.
+        - maintenance_due_date (date): Дата следующего обслуживания, вычисляется СУБД
+          (last_maintenance + maintenance_interval; пусто, если интервал не задан или равен 0).
         - created_at (datetime): Дата и время создания записи.
         - updated_at (datetime): Дата и время последнего обновления записи.
 
     Методы:
         - __str__(): Возвращает строковое представление устройства с его названием и моделью.
+        - Device.objects.maintenance_due(days): Устройства, обслуживание которых наступит в ближайшие days дней.
+        - issue_secret(): Выдаёт новый секрет подключения (старый перестаёт действовать после сохранения).
+        - check_secret(secret): Проверяет секрет, предъявленный устройством.
         - needs_maintenance (property): Проверяет, требуется ли устройству обслуживание в зависимости от интервала обслуживания и даты последнего обслуживания.
     """
 
@@ -208,6 +237,12 @@ class Device(models.Model):
         max_length=50,
         unique=True
     )
+    secret_hash = models.CharField(
+        _("Хэш секрета подключения"),
+        max_length=64,
+        blank=True,
+        editable=False
+    )
     connection_type = models.CharField(
         _("Тип подключения"),
         max_length=20,
@@ -233,6 +268,8 @@ class Device(models.Model):
         blank=True
     )
     is_active = models.BooleanField(_("Активно"), default=True)
+    # Поддерживается dashboard.health при приёме статусов
+    is_online = models.BooleanField(_("В сети"), null=True, editable=False)
     installation_date = models.DateField(
         _("Дата установки"),
         blank=True,
@@ -248,6 +285,12 @@ class Device(models.Model):
         blank=True,
         null=True
     )
+    maintenance_due_date = models.GeneratedField(
+        expression=AddDays('last_maintenance', NullIf('maintenance_interval', 0)),
+        output_field=models.DateField(),
+        db_persist=True,
+        verbose_name=_("Дата следующего обслуживания")
+    )
     created_at = models.DateTimeField(
         _("Дата создания"),
         auto_now_add=True)
@@ -269,11 +312,36 @@ class Device(models.Model):
         indexes = [
             models.Index(fields=['is_active']),
             models.Index(fields=['farm']),
+            models.Index(fields=['farm', 'name', 'id']),
+            # Список устройств, которым подходит срок обслуживания
+            models.Index(fields=['farm', 'maintenance_due_date', 'id']),
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='device_name_trgm'),
+            GinIndex(OpClass(Upper('serial_number'), name='gin_trgm_ops'), name='device_serial_trgm'),
         ]
 
+    objects = DeviceQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.name} ({self.model.name if self.model else 'No model'})"
 
+    def issue_secret(self) -> str:
+        """
+        Выдаёт устройству новый секрет подключения. Хранится только хэш,
+        сам секрет показывается один раз; запись нужно сохранить.
+
+        Возвращает:
+            str: Секрет для заголовка X-Device-Secret.
+        """
+        secret = secrets.token_urlsafe(32)
+        self.secret_hash = hashlib.sha256(secret.encode()).hexdigest()
+        return secret
+
+    def check_secret(self, secret) -> bool:
+        if not self.secret_hash or not secret:
+            return False
+        digest = hashlib.sha256(secret.encode()).hexdigest()
+        return hmac.compare_digest(digest, self.secret_hash)
+
     @property
     def needs_maintenance(self):
         if self.last_maintenance and self.maintenance_interval:
@@ -295,9 +363,11 @@ class DeviceLocation(models.Model):
         - latitude (Decimal): Широта местоположения устройства.
         - longitude (Decimal): Долгота местоположения устройства.
         - installation_notes (str): Примечания по установке устройства.
+        - geohash (str): Geohash координат для пространственных запросов (заполняется при сохранении).
         - last_updated (datetime): Дата и время последнего обновления местоположения устройства.
 
     Методы:
+        - save(): Пересчитывает geohash по координатам.
         - clean(): Проверяет, что зона устройства принадлежит той же ферме, что и само устройство.
         - __str__(): Возвращает строковое представление местоположения устройства.
         - coordinates (property): Возвращает строковое представление координат устройства.
@@ -334,6 +404,13 @@ class DeviceLocation(models.Model):
         _("Примечания по установке"),
         blank=True
     )
+    geohash = models.CharField(
+        _("Geohash"),
+        max_length=GEOHASH_PRECISION,
+        blank=True,
+        editable=False,
+        db_index=True,
+    )
     last_updated = models.DateTimeField(
         _("Последнее обновление"),
         auto_now=True
@@ -343,6 +420,13 @@ class DeviceLocation(models.Model):
         verbose_name = _("Местоположение устройства")
         verbose_name_plural = _("Местоположения устройств")
 
+    def save(self, *args, **kwargs):
+        self.geohash = encode_location(self.latitude, self.longitude)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geohash'}
+        super().save(*args, **kwargs)
+
     def clean(self):
         if self.zone and self.zone.farm != self.device.farm:
             raise ValidationError(
@@ -431,7 +515,8 @@ class SensorData(models.Model):
         ordering = ['-timestamp']
         indexes = [
             models.Index(fields=['-timestamp']),
-            models.Index(fields=['device']),
+            # Последнее показание устройства (DISTINCT ON device_id ... ORDER BY timestamp DESC)
+            models.Index(fields=['device', '-timestamp']),
         ]
 
     def __str__(self):
@@ -580,6 +665,8 @@ class DeviceStatus(models.Model):
         indexes = [
             models.Index(fields=['-timestamp']),
             models.Index(fields=['device', 'online']),
+            # Последний статус устройства (топология шлюзов)
+            models.Index(fields=['device', '-timestamp']),
         ]
 
     def __str__(self):
@@ -712,4 +799,70 @@ class DeviceCommand(models.Model):
         self.executed_at = timezone.now()
         if error:
             self.response = {'error': str(error)}
-        self.save()
\ No newline at end of file
+        self.save()
+
+
+class HealthSummary(models.Model):
+    """
+    Сводка состояния устройств: общий счётчик для ферм и зон.
+
+    Поля:
+        - devices_total (int): Число устройств.
+        - devices_online (int): Устройства, последний статус которых — онлайн.
+        - maintenance_due (int): Устройства, которым требуется обслуживание.
+        - open_alerts (int): Нерешённые события типов «ошибка» и «тревога».
+        - updated_at (datetime): Время последнего изменения счётчиков.
+
+    Счётчики поддерживаются модулем dashboard.health.
+    """
+
+    devices_total = models.PositiveIntegerField(_("Устройств"), default=0)
+    devices_online = models.PositiveIntegerField(_("Онлайн"), default=0)
+    maintenance_due = models.PositiveIntegerField(_("Требуют обслуживания"), default=0)
+    open_alerts = models.PositiveIntegerField(_("Открытых тревог"), default=0)
+    updated_at = models.DateTimeField(_("Дата обновления"), auto_now=True)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def devices_offline(self):
+        return self.devices_total - self.devices_online
+
+
+class FarmHealthSummary(HealthSummary):
+    """Сводка состояния устройств фермы."""
+
+    farm = models.OneToOneField(
+        Farm,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='health',
+        verbose_name=_("Ферма")
+    )
+
+    class Meta:
+        verbose_name = _("Сводка по ферме")
+        verbose_name_plural = _("Сводки по фермам")
+
+    def __str__(self):
+        return f"Health of farm {self.farm_id}"
+
+
+class ZoneHealthSummary(HealthSummary):
+    """Сводка состояния устройств зоны."""
+
+    zone = models.OneToOneField(
+        Zone,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='health',
+        verbose_name=_("Зона")
+    )
+
+    class Meta:
+        verbose_name = _("Сводка по зоне")
+        verbose_name_plural = _("Сводки по зонам")
+
+    def __str__(self):
+        return f"Health of zone {self.zone_id}"
@@ -0,0 +1,92 @@
+"""
+Реестр подписчиков групп устройств.
+
+Consumer при подключении регистрирует свой канал в отсортированном множестве
+``device_presence:{id}`` со сроком действия в качестве score и продлевает его
+heartbeat'ом. Приём данных проверяет наличие живых подписчиков и не публикует
+кадры в channel layer, если устройство никто не смотрит. Ответ кэшируется в
+памяти процесса на DEVICE_PRESENCE_CACHE_TTL секунд.
+"""
+import logging
+import time
+
+from django.conf import settings
+from redis import RedisError
+
+from .redis_client import get_redis, get_async_redis
+
+logger = logging.getLogger(__name__)
+
+_local_cache = {}
+
+
+def presence_key(device_id) -> str:
+    return f"device_presence:{device_id}"
+
+
+async def register_subscriber(device_id, channel_name: str) -> None:
+    """
+    Регистрирует (или продлевает) подписку канала на устройство.
+    """
+    key = presence_key(device_id)
+    now = time.time()
+    pipe = get_async_redis().pipeline(transaction=False)
+    pipe.zremrangebyscore(key, '-inf', now)
+    pipe.zadd(key, {channel_name: now + settings.DEVICE_PRESENCE_TTL})
+    pipe.expire(key, settings.DEVICE_PRESENCE_TTL)
+    await pipe.execute()
+
+
+async def unregister_subscriber(device_id, channel_name: str) -> None:
+    """
+    Удаляет подписку канала на устройство.
+    """
+    await get_async_redis().zrem(presence_key(device_id), channel_name)
+
+
+def _get_cached(device_id):
+    cached = _local_cache.get(device_id)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+    return None
+
+
+def _set_cached(device_id, watched: bool) -> bool:
+    _local_cache[device_id] = (watched, time.monotonic() + settings.DEVICE_PRESENCE_CACHE_TTL)
+    return watched
+
+
+def has_subscribers(device_id) -> bool:
+    """
+    Проверяет, есть ли у устройства живые подписчики.
+
+    При недоступности Redis возвращает True, чтобы не терять кадры.
+    """
+    cached = _get_cached(device_id)
+    if cached is not None:
+        return cached
+
+    try:
+        count = get_redis().zcount(presence_key(device_id), time.time(), '+inf')
+    except RedisError:
+        logger.exception("Не удалось проверить подписчиков устройства %s", device_id)
+        return True
+
+    return _set_cached(device_id, count > 0)
+
+
+async def ahas_subscribers(device_id) -> bool:
+    """
+    Асинхронный вариант has_subscribers.
+    """
+    cached = _get_cached(device_id)
+    if cached is not None:
+        return cached
+
+    try:
+        count = await get_async_redis().zcount(presence_key(device_id), time.time(), '+inf')
+    except RedisError:
+        logger.exception("Не удалось проверить подписчиков устройства %s", device_id)
+        return True
+
+    return _set_cached(device_id, count > 0)
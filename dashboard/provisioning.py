@@ -0,0 +1,277 @@
+"""
+Массовое добавление и изменение устройств.
+
+Строки (из CSV или JSON) проверяются целиком до записи: ссылки на модели,
+зоны и шлюзы разрешаются несколькими запросами на весь пакет, уникальность
+серийных номеров, MAC- и IP-адресов проверяется за один проход по пакету и
+одним запросом к БД. Устройства и их местоположения вставляются через
+bulk_create в одной транзакции; при любой ошибке не записывается ничего.
+
+Изменение набора устройств (перенос между зонами и фермами, активность,
+прошивка, обслуживание) выполняется несколькими UPDATE по всему набору,
+а не сохранением каждого устройства.
+"""
+import csv
+import io
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .geohash import encode_location
+from .models import Device, DeviceLocation, DeviceModel, Zone
+from .signals import devices_changed
+
+DEVICE_FIELDS = (
+    'name', 'serial_number', 'connection_type', 'mac_address', 'ip_address',
+    'firmware_version', 'installation_date', 'last_maintenance', 'maintenance_interval',
+)
+LOCATION_FIELDS = ('latitude', 'longitude', 'installation_notes')
+UNIQUE_FIELDS = ('serial_number', 'mac_address', 'ip_address')
+UPDATE_FIELDS = ('farm', 'is_active', 'firmware_version', 'last_maintenance', 'maintenance_interval')
+
+
+class ProvisioningError(Exception):
+    """
+    Пакет не прошёл проверку.
+
+    Атрибуты:
+        errors (list): Ошибки вида {'row': номер строки, 'field': поле, 'error': текст}.
+    """
+
+    def __init__(self, errors):
+        super().__init__(f"Ошибок в пакете: {len(errors)}")
+        self.errors = errors
+
+
+def parse_csv(content: str) -> list:
+    """
+    Читает CSV с заголовком в список словарей; пустые ячейки становятся None.
+
+    Колонки: name, serial_number, model, zone, gateway_serial и любые поля из
+    DEVICE_FIELDS и LOCATION_FIELDS.
+    """
+    reader = csv.DictReader(io.StringIO(content))
+    return [
+        {key.strip(): (value.strip() or None) if isinstance(value, str) else value
+         for key, value in row.items() if key}
+        for row in reader
+    ]
+
+
+def _resolve_models(rows, errors):
+    references = {str(row['model']) for row in rows if row.get('model')}
+    ids = {ref for ref in references if ref.isdigit()}
+    names = references - ids
+
+    models = DeviceModel.objects.filter(Q(id__in=ids) | Q(name__in=names)).only('id', 'name')
+    by_ref = {}
+    ambiguous = set()
+    for model in models:
+        if str(model.id) in ids:
+            by_ref[str(model.id)] = model
+        if model.name in names:
+            if model.name in by_ref:
+                ambiguous.add(model.name)
+            by_ref[model.name] = model
+
+    for number, row in enumerate(rows, start=1):
+        ref = str(row['model']) if row.get('model') else None
+        if ref in ambiguous:
+            errors.append({'row': number, 'field': 'model', 'error': f"Несколько моделей с названием {ref}, укажите id"})
+        elif ref and ref not in by_ref:
+            errors.append({'row': number, 'field': 'model', 'error': f"Модель {ref} не найдена"})
+    return by_ref
+
+
+def _resolve_zones(farm, rows, errors):
+    names = {row['zone'] for row in rows if row.get('zone')}
+    zones = {zone.name: zone for zone in Zone.objects.filter(farm=farm, name__in=names).only('id', 'name')}
+
+    for number, row in enumerate(rows, start=1):
+        if row.get('zone') and row['zone'] not in zones:
+            errors.append({'row': number, 'field': 'zone', 'error': f"Зона {row['zone']} не найдена на ферме"})
+    return zones
+
+
+def _resolve_gateways(farm, rows, errors):
+    batch_serials = {row.get('serial_number') for row in rows}
+    serials = {row['gateway_serial'] for row in rows if row.get('gateway_serial')}
+    existing = dict(
+        Device.objects
+        .filter(farm=farm, serial_number__in=serials - batch_serials)
+        .values_list('serial_number', 'id')
+    )
+
+    for number, row in enumerate(rows, start=1):
+        serial = row.get('gateway_serial')
+        if not serial:
+            continue
+        if serial == row.get('serial_number'):
+            errors.append({'row': number, 'field': 'gateway_serial', 'error': "Устройство не может быть своим шлюзом"})
+        elif serial not in existing and serial not in batch_serials:
+            errors.append({'row': number, 'field': 'gateway_serial', 'error': f"Шлюз {serial} не найден на ферме"})
+    return existing
+
+
+def _check_unique(devices, errors):
+    seen = {field: {} for field in UNIQUE_FIELDS}
+    for number, device in enumerate(devices, start=1):
+        for field in UNIQUE_FIELDS:
+            value = getattr(device, field)
+            if value is None:
+                continue
+            if value in seen[field]:
+                errors.append({'row': number, 'field': field, 'error': f"Повторяет строку {seen[field][value]}"})
+            else:
+                seen[field][value] = number
+
+    condition = Q()
+    for field in UNIQUE_FIELDS:
+        if seen[field]:
+            condition |= Q(**{f'{field}__in': list(seen[field])})
+    if not condition:
+        return
+
+    for existing in Device.objects.filter(condition).values(*UNIQUE_FIELDS):
+        for field in UNIQUE_FIELDS:
+            number = seen[field].get(existing[field])
+            if existing[field] is not None and number:
+                errors.append({'row': number, 'field': field, 'error': "Уже используется другим устройством"})
+
+
+def provision_devices(farm, rows, added_by=None) -> list:
+    """
+    Проверяет пакет устройств и добавляет его на ферму одной транзакцией.
+
+    Аргументы:
+        farm (Farm): Ферма, на которую добавляются устройства.
+        rows (list): Словари с полями устройства; model — id или название модели,
+            zone — название зоны фермы, gateway_serial — серийный номер шлюза
+            (существующего или из этого же пакета).
+        added_by (CustomUser | None): Пользователь, добавивший устройства.
+
+    Возвращает:
+        list: Созданные устройства; у каждого в атрибуте secret — выданный
+            секрет подключения (в БД хранится только хэш, показать его можно
+            только сейчас).
+
+    Исключения:
+        ProvisioningError: Если хотя бы одна строка не прошла проверку.
+    """
+    errors = []
+    models = _resolve_models(rows, errors)
+    zones = _resolve_zones(farm, rows, errors)
+    gateways = _resolve_gateways(farm, rows, errors)
+
+    devices = []
+    locations = []
+    for number, row in enumerate(rows, start=1):
+        device = Device(
+            farm=farm,
+            added_by=added_by,
+            model=models.get(str(row['model'])) if row.get('model') else None,
+            gateway_device_id=gateways.get(row.get('gateway_serial')),
+            **{field: row[field] for field in DEVICE_FIELDS if row.get(field) not in (None, '')}
+        )
+        device.secret = device.issue_secret()
+        location = DeviceLocation(
+            zone=zones.get(row.get('zone')),
+            **{field: row[field] for field in LOCATION_FIELDS if row.get(field) not in (None, '')}
+        )
+        try:
+            device.clean_fields(exclude=['farm', 'added_by', 'model', 'gateway_device'])
+            location.clean_fields(exclude=['device', 'zone'])
+        except ValidationError as error:
+            for field, messages in error.message_dict.items():
+                errors.extend({'row': number, 'field': field, 'error': message} for message in messages)
+        devices.append(device)
+        locations.append(location)
+
+    _check_unique(devices, errors)
+    if errors:
+        raise ProvisioningError(sorted(errors, key=lambda error: error['row']))
+
+    with transaction.atomic():
+        Device.objects.bulk_create(devices)
+
+        by_serial = {device.serial_number: device for device in devices}
+        linked = []
+        for device, row in zip(devices, rows):
+            serial = row.get('gateway_serial')
+            if serial and device.gateway_device_id is None and serial in by_serial:
+                device.gateway_device = by_serial[serial]
+                linked.append(device)
+        if linked:
+            Device.objects.bulk_update(linked, ['gateway_device'])
+
+        # bulk_create не вызывает DeviceLocation.save(), geohash заполняется здесь
+        for device, location in zip(devices, locations):
+            location.device = device
+            location.geohash = encode_location(location.latitude, location.longitude)
+        DeviceLocation.objects.bulk_create(locations)
+
+        transaction.on_commit(lambda: devices_changed.send(sender=Device, farm_ids=[farm.id]))
+
+    return devices
+
+
+def update_devices(device_ids, changes) -> int:
+    """
+    Изменяет набор устройств set-based запросами в одной транзакции.
+
+    При переносе на другую ферму устройства убираются из зон прежней фермы
+    (если не указана новая зона), а связи со шлюзами, оказавшимися на другой
+    ферме, обнуляются в обе стороны.
+
+    Аргументы:
+        device_ids (list): Идентификаторы устройств.
+        changes (dict): Новые значения полей из UPDATE_FIELDS и, при
+            необходимости, zone (Zone | None). Зона должна принадлежать
+            ферме, на которой окажутся устройства.
+
+    Возвращает:
+        int: Число изменённых устройств.
+    """
+    now = timezone.now()
+    devices = Device.objects.filter(id__in=device_ids)
+    fields = {field: changes[field] for field in UPDATE_FIELDS if field in changes}
+
+    with transaction.atomic():
+        before = list(devices.select_for_update(of=('self',)).values_list('farm_id', 'location__zone_id'))
+        farm_ids = {farm_id for farm_id, _ in before}
+        zone_ids = {zone_id for _, zone_id in before if zone_id}
+
+        count = devices.update(**fields, updated_at=now)
+
+        if 'farm' in fields:
+            farm_ids.add(fields['farm'].id)
+            (
+                Device.objects
+                .filter(Q(id__in=device_ids) | Q(gateway_device_id__in=device_ids), gateway_device__isnull=False)
+                .exclude(gateway_device__farm_id=F('farm_id'))
+                .update(gateway_device=None, updated_at=now)
+            )
+            (
+                DeviceLocation.objects
+                .filter(device_id__in=device_ids, zone__isnull=False)
+                .exclude(zone__farm_id=F('device__farm_id'))
+                .update(zone=None, last_updated=now)
+            )
+
+        if 'zone' in changes:
+            zone = changes['zone']
+            DeviceLocation.objects.filter(device_id__in=device_ids).update(zone=zone, last_updated=now)
+            if zone is not None:
+                zone_ids.add(zone.id)
+                DeviceLocation.objects.bulk_create([
+                    DeviceLocation(device_id=device_id, zone=zone)
+                    for device_id in devices.filter(location__isnull=True).values_list('id', flat=True)
+                ])
+
+        transaction.on_commit(lambda: devices_changed.send(
+            sender=Device, farm_ids=sorted(farm_ids), zone_ids=sorted(zone_ids)
+        ))
+
+    return count
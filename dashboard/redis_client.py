@@ -0,0 +1,43 @@
+import asyncio
+
+import redis
+from redis import asyncio as aioredis
+from django.conf import settings
+
+_sync_client = None
+_async_clients = {}
+
+
+def get_redis() -> redis.Redis:
+    """
+    Возвращает синхронный клиент Redis, общий для процесса.
+
+    Используется в синхронном коде (DRF-представления приёма данных).
+    """
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = redis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            decode_responses=True,
+        )
+    return _sync_client
+
+
+def get_async_redis() -> aioredis.Redis:
+    """
+    Возвращает асинхронный клиент Redis для текущего event loop.
+
+    Соединения redis.asyncio привязаны к циклу, в котором созданы,
+    поэтому клиент кэшируется отдельно для каждого цикла.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = aioredis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            decode_responses=True,
+        )
+        _async_clients[loop] = client
+    return client
@@ -4,4 +4,5 @@ from . import consumers
 
 websocket_urlpatterns = [
     re_path(r'ws/sensor/(?P<device_id>\d+)/$', consumers.SensorDataConsumer.as_asgi()),
+    re_path(r'ws/device/(?P<device_id>\d+)/$', consumers.DeviceConsumer.as_asgi()),
 ]
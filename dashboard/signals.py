@@ -0,0 +1,159 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from users.models import Farm
+from . import health
+from .models import Device, DeviceCommand, DeviceEvent, DeviceLocation, DeviceStatus, Zone
+
+# Отправляется после массовых операций над устройствами (bulk_create/update),
+# которые не вызывают post_save. Аргументы: farm_ids — затронутые фермы,
+# zone_ids — затронутые зоны (если известны).
+devices_changed = Signal()
+
+
+@receiver(post_save, sender=DeviceCommand)
+def push_new_command(sender, instance, created, **kwargs):
+    """
+    Отправляет новую команду устройству, если оно подключено по WebSocket.
+    """
+    if not created or instance.status != DeviceCommand.CommandStatus.PENDING:
+        return
+
+    command = {
+        'id': instance.id,
+        'command': instance.command,
+        'parameters': instance.parameters,
+        'timeout': instance.timeout,
+    }
+
+    def send():
+        async_to_sync(get_channel_layer().group_send)(
+            f'device_commands_{instance.device_id}',
+            {
+                'type': 'push_command',
+                'command': command,
+            }
+        )
+
+    transaction.on_commit(send)
+
+
+@receiver(post_save, sender=DeviceStatus)
+def count_device_status(sender, instance, created, raw=False, **kwargs):
+    """
+    Учитывает новый статус в сводке состояния фермы и зоны. Пакетный приём
+    (DeviceConsumer) сохраняет статусы через bulk_create и вызывает
+    health.record_statuses сам.
+    """
+    if created and not raw:
+        health.record_statuses([instance])
+
+
+def _previous_values(instance, fields, update_fields):
+    """
+    Значения fields сохраняемой записи до изменения или None, если запись
+    новая либо save(update_fields=...) их не затрагивает.
+    """
+    if instance.pk is None:
+        return None
+    names = {*fields, *(field.removesuffix('_id') for field in fields)}
+    if update_fields is not None and not names & set(update_fields):
+        return None
+    return type(instance).objects.filter(pk=instance.pk).values_list(*fields).first()
+
+
+@receiver(pre_save, sender=DeviceEvent)
+def remember_event_state(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Запоминает, было ли событие открытой тревогой."""
+    if raw:
+        return
+    previous = _previous_values(instance, ('resolved', 'event_type'), update_fields)
+    if previous is not None:
+        resolved, event_type = previous
+        instance._was_open_alert = not resolved and event_type in health.ALERT_TYPES
+
+
+@receiver(post_save, sender=DeviceEvent)
+def count_device_event(sender, instance, created, raw=False, **kwargs):
+    """
+    Открытие тревоги (новой или повторно открытой) увеличивает счётчик
+    сводки, решение — уменьшает; прочие изменения события счётчик не меняют.
+    """
+    if raw:
+        return
+    if created:
+        health.record_alert(instance)
+    elif hasattr(instance, '_was_open_alert'):
+        health.record_alert(instance, was_open=instance.__dict__.pop('_was_open_alert'))
+
+
+@receiver(post_delete, sender=DeviceEvent)
+def uncount_device_event(sender, instance, **kwargs):
+    health.record_alert(instance, was_open=health.is_open_alert(instance), deleted=True)
+
+
+@receiver(pre_save, sender=Device)
+def remember_device_fields(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Запоминает прежние ферму и данные обслуживания устройства."""
+    if not raw:
+        instance._previous_health_fields = _previous_values(instance, health.DEVICE_FIELDS, update_fields)
+
+
+@receiver(post_save, sender=Device)
+def reconcile_device_farms(sender, instance, created, raw=False, **kwargs):
+    """
+    Пересчитывает сводки фермы нового устройства или изменённого так, что
+    меняются счётчики (перенос — и прежней фермы, изменение данных
+    обслуживания). Прочие изменения устройства пересчёта не вызывают.
+    """
+    if raw:
+        return
+    previous = instance.__dict__.pop('_previous_health_fields', None)
+    current = tuple(getattr(instance, field) for field in health.DEVICE_FIELDS)
+    if created or (previous is not None and previous != current):
+        health.schedule_reconcile([instance.farm_id, previous[0] if previous else None])
+
+
+@receiver(post_delete, sender=Device)
+def reconcile_deleted_device_farm(sender, instance, **kwargs):
+    health.schedule_reconcile([instance.farm_id])
+
+
+@receiver(pre_save, sender=DeviceLocation)
+def remember_location_zone(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Запоминает прежнюю зону устройства."""
+    if not raw:
+        instance._previous_zone = _previous_values(instance, ('zone_id',), update_fields)
+
+
+@receiver(post_save, sender=DeviceLocation)
+def reconcile_location_farm(sender, instance, created, raw=False, **kwargs):
+    """Пересчитывает сводки фермы, если у устройства появилась зона или она сменилась."""
+    if raw:
+        return
+    previous = instance.__dict__.pop('_previous_zone', None)
+    if created or (previous is not None and previous != (instance.zone_id,)):
+        health.schedule_reconcile(Device.objects.filter(pk=instance.device_id).values_list('farm_id', flat=True))
+
+
+@receiver(post_delete, sender=DeviceLocation)
+def reconcile_deleted_location_farm(sender, instance, **kwargs):
+    health.schedule_reconcile(Device.objects.filter(pk=instance.device_id).values_list('farm_id', flat=True))
+
+
+@receiver(post_save, sender=Zone)
+@receiver(post_save, sender=Farm)
+def create_health_summary(sender, instance, created, raw=False, **kwargs):
+    """Создаёт сводку для новой фермы или зоны."""
+    if created and not raw:
+        health.schedule_reconcile([instance.farm_id if sender is Zone else instance.id])
+
+
+@receiver(devices_changed)
+def reconcile_changed_farms(sender, farm_ids=(), **kwargs):
+    """Пересчитывает сводки ферм после массовых операций над устройствами."""
+    health.schedule_reconcile(farm_ids)
+
@@ -2,9 +2,9 @@
 // Константы и утилиты
 // =====================
 const API = {
-    deviceModels: '/api/v1/devices/device_models/',
-    userFarms: '/api/v1/user_pages/user_farms/?role=owner&role=admin',
-    farmZones: farmSlug => `/api/v1/devices/org_farms_zones/?farm=${farmSlug}`,
+    deviceModels: '/api/v1/devices/device_models/?fields=id,name',
+    userFarms: '/api/v1/user_pages/user_farms/?role=owner&role=admin&fields=farm,farm_slug&expand=farm',
+    farmZones: farmSlug => `/api/v1/devices/org_farms_zones/?farm=${farmSlug}&fields=id,name`,
     addDevice: '/api/v1/devices/add_device/',
     addDeviceLocation: '/api/v1/devices/add_device_location/'
 };
@@ -25,7 +25,7 @@ const getCookie = name => {
 // =====================
 async function fetchDeviceModels() {
     try {
-        const response = await fetch(API.deviceModels);
+        const response = await fetchList(API.deviceModels);
         if (!response.ok) throw new Error('Failed to fetch device models');
         return await response.json();
     } catch (error) {
@@ -36,7 +36,7 @@ async function fetchDeviceModels() {
 
 async function fetchUserFarms() {
     try {
-        const response = await fetch(API.userFarms);
+        const response = await fetchList(API.userFarms);
         if (!response.ok) throw new Error('Failed to fetch user farms');
         return await response.json();
     } catch (error) {
@@ -47,7 +47,7 @@ async function fetchUserFarms() {
 
 async function fetchFarmZones(farmSlug) {
     try {
-        const response = await fetch(API.farmZones(farmSlug));
+        const response = await fetchList(API.farmZones(farmSlug));
         if (!response.ok) throw new Error('Failed to fetch farm zones');
         return await response.json();
     } catch (error) {
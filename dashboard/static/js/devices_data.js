@@ -86,18 +86,21 @@ document.addEventListener('DOMContentLoaded', () => {
     // =====================
     // WebSocket функции
     // =====================
-    const connectToDeviceWebSocket = (deviceId, onDataUpdate, zoneSessionId) => {
+    const connectToDeviceWebSocket = (deviceId, onDataUpdate, zoneSessionId, previous = null) => {
         if (deviceWebSockets.has(deviceId)) {
             const wsObj = deviceWebSockets.get(deviceId);
             wsObj._manuallyClosed = true;
             wsObj.ws.close();
             deviceWebSockets.delete(deviceId);
         }
-        let currentSensorData = {};
-        let currentActuatorData = {};
-        let currentDeviceStatus = {};
+        let currentSensorData = previous ? previous.sensorData : {};
+        let currentActuatorData = previous ? previous.actuatorData : {};
+        let currentDeviceStatus = previous ? previous.deviceStatus : {};
         let currentOnlineStatus = false;
-        const ws = new WebSocket(`ws://${window.location.host}/ws/sensor/${deviceId}/`);
+        // Курсор последнего полученного кадра: при переподключении сервер досылает пропущенные кадры
+        let lastCursor = previous ? previous.cursor : null;
+        const query = lastCursor ? `?since=${encodeURIComponent(lastCursor)}` : '';
+        const ws = new WebSocket(`ws://${window.location.host}/ws/sensor/${deviceId}/${query}`);
         ws._manuallyClosed = false;
         ws.onopen = () => {};
         ws.onclose = () => {
@@ -106,10 +109,25 @@ document.addEventListener('DOMContentLoaded', () => {
             updateDeviceOnlineStatus(deviceId, false);
             currentOnlineStatus = false;
             if (onDataUpdate) onDataUpdate(currentSensorData, currentActuatorData, currentDeviceStatus, currentOnlineStatus);
-            setTimeout(() => connectToDeviceWebSocket(deviceId, onDataUpdate, zoneSessionId), 5000);
+            const state = {
+                cursor: lastCursor,
+                sensorData: currentSensorData,
+                actuatorData: currentActuatorData,
+                deviceStatus: currentDeviceStatus
+            };
+            setTimeout(() => connectToDeviceWebSocket(deviceId, onDataUpdate, zoneSessionId, state), 5000);
         };
         ws.onmessage = (event) => {
             const data = JSON.parse(event.data);
+            if (data.type === 'replay') {
+                data.frames.forEach(handleFrame);
+                if (data.cursor) lastCursor = data.cursor;
+                return;
+            }
+            handleFrame(data);
+        };
+        const handleFrame = (data) => {
+            if (data.cursor) lastCursor = data.cursor;
             switch(data.type) {
                 case 'send_sensor_data':
                     updateDeviceSensorData(deviceId, data.data);
@@ -287,7 +305,7 @@ document.addEventListener('DOMContentLoaded', () => {
         if (devicesContainer) devicesContainer.innerHTML = '';
         await new Promise(r => setTimeout(r, 100));
         try {
-            const response = await fetch(`/api/v1/devices/zones_devices/?zone=${zoneName}`, {
+            const response = await fetchList(`/api/v1/devices/zones_devices/?zone=${zoneName}`, {
                 headers: {
                     'Content-Type': 'application/json',
                     'X-CSRFToken': getCookie('csrftoken')
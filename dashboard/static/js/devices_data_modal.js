@@ -80,7 +80,7 @@ const translateSensorKey = key => SENSOR_LABELS[key] || key;
 
 const fetchDeviceModels = async () => {
     try {
-        const response = await fetch('/api/v1/devices/device_models/');
+        const response = await fetchList('/api/v1/devices/device_models/');
         if (!response.ok) throw new Error('Failed to fetch device models');
         return await response.json();
     } catch {
@@ -90,7 +90,7 @@ const fetchDeviceModels = async () => {
 
 const fetchUserFarms = async () => {
     try {
-        const response = await fetch('/api/v1/user_pages/user_farms/?role=owner&role=admin');
+        const response = await fetchList('/api/v1/user_pages/user_farms/?role=owner&role=admin');
         if (!response.ok) throw new Error('Failed to fetch user farms');
         return await response.json();
     } catch {
@@ -368,7 +368,7 @@ function addEditHandlers(info, device, overlay) {
                             const oldZoneHtml = zoneValueCell.innerHTML;
                             zoneValueCell.innerHTML = '';
                             zoneValueCell.classList.add('editing', 'zone-selection-required');
-                            const zones = await fetch(`/api/v1/devices/org_farms_zones/?farm=${newFarmSlug}`).then(r => r.json());
+                            const zones = await fetchList(`/api/v1/devices/org_farms_zones/?farm=${newFarmSlug}`).then(r => r.json());
                             const zoneSelect = document.createElement('select');
                             zoneSelect.className = 'edit-input';
                             zoneSelect.innerHTML = '<option value="">Выберите зону...</option>';
@@ -450,7 +450,7 @@ function addEditHandlers(info, device, overlay) {
             return;
         } else if (field === 'device_zone') {
             let farmSlug = device.farm_slug;
-            const getZones = (slug) => fetch(`/api/v1/devices/org_farms_zones/?farm=${slug}`).then(resp => resp.json());
+            const getZones = (slug) => fetchList(`/api/v1/devices/org_farms_zones/?farm=${slug}`).then(resp => resp.json());
             const showZoneSelect = (zones) => {
                 const select = document.createElement('select');
                 select.className = 'edit-input';
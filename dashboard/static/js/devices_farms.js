@@ -61,7 +61,7 @@ document.addEventListener('DOMContentLoaded', () => {
         currentFarmId = null; 
         if (farmTabsList) farmTabsList.innerHTML = '';
         try {
-            const response = await fetch(`/api/v1/devices/org_farms/?organization=${orgSlug}`, {
+            const response = await fetchList(`/api/v1/devices/org_farms/?organization=${orgSlug}`, {
                 headers: {
                     'Content-Type': 'application/json',
                     'X-CSRFToken': getCookie('csrftoken')
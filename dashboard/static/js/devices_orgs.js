@@ -83,7 +83,7 @@ document.addEventListener('DOMContentLoaded', () => {
     // === Загрузка организаций ===
     const loadOrganizations = async () => {
         try {
-            const response = await fetch('/api/v1/user_pages/user_organizations/', {
+            const response = await fetchList('/api/v1/user_pages/user_organizations/', {
                 headers: {
                     'Content-Type': 'application/json',
                     'X-CSRFToken': getCookie('csrftoken')
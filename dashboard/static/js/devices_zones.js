@@ -81,7 +81,7 @@ document.addEventListener('DOMContentLoaded', () => {
     // === Загрузка зон фермы ===
     const loadFarmZones = async (farmName) => {
         try {
-            const response = await fetch(`/api/v1/devices/org_farms_zones/?farm=${farmName}`, {
+            const response = await fetchList(`/api/v1/devices/org_farms_zones/?farm=${farmName}`, {
                 headers: {
                     'Content-Type': 'application/json',
                     'X-CSRFToken': getCookie('csrftoken')
@@ -126,7 +126,7 @@ document.addEventListener('DOMContentLoaded', () => {
         if (currentFarmOrdering) url += `&ordering=${currentFarmOrdering}`;
 
         try {
-            const response = await fetch(url, {
+            const response = await fetchList(url, {
                 headers: {
                     'Content-Type': 'application/json',
                     'X-CSRFToken': getCookie('csrftoken')
@@ -110,7 +110,7 @@ document.addEventListener('DOMContentLoaded', () => {
         .then(response => response.json())
         .then(currentUser => {
             // Затем получаем остальных пользователей
-            fetch(url, {
+            fetchList(url, {
                 headers: {
                     'Content-Type': 'application/json',
                     'X-CSRFToken': getCookie('csrftoken')
@@ -149,7 +149,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
     // === Загрузка данных фермы ===
     const loadFarmData = () => {
-        fetch(`/api/v1/farm/main_data/?slug=${FARM_SLUG}`, {
+        loadFarmSection('farm', () => fetch(`/api/v1/farm/main_data/?slug=${FARM_SLUG}`, {
             headers: {
                 'Content-Type': 'application/json',
                 'X-CSRFToken': getCookie('csrftoken')
@@ -159,7 +159,7 @@ document.addEventListener('DOMContentLoaded', () => {
         .then(response => {
             if (!response.ok) throw new Error('Ошибка загрузки данных');
             return response.json();
-        })
+        }))
         .then(data => {
             document.title = `${data.name}`;
             
@@ -21,7 +21,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
     // === Загрузка данных организации ===
     const loadOrganizationData = () => {
-        fetch(`/api/v1/farm/ext_org/?slug=${FARM_SLUG}`, {
+        loadFarmSection('organization', () => fetch(`/api/v1/farm/ext_org/?slug=${FARM_SLUG}`, {
             headers: {
                 'Content-Type': 'application/json',
                 'X-CSRFToken': getCookie('csrftoken')
@@ -31,7 +31,7 @@ document.addEventListener('DOMContentLoaded', () => {
         .then(response => {
             if (!response.ok) throw new Error('Ошибка загрузки данных');
             return response.json();
-        })
+        }))
         .then(data => {
             // Обновляем поля организации
             const orgNameValue = document.getElementById('orgNameValue');
@@ -0,0 +1,22 @@
+// Первичная загрузка страницы фермы одним запросом к /api/v1/farm/overview/
+// вместо отдельных main_data, ext_org, users и zones.
+const farmOverview = fetch(`/api/v1/farm/overview/?slug=${FARM_SLUG}`, {
+    headers: { 'Accept': 'application/json' },
+    credentials: 'include'
+})
+.then(response => {
+    if (!response.ok) throw new Error('Ошибка загрузки обзора фермы');
+    return response.json();
+});
+
+const usedOverviewSections = new Set();
+
+// Первый вызов для раздела отдаёт данные из обзора, последующие (после
+// изменений, фильтрации, сортировки) и ошибки обзора — запрос fetchSection.
+const loadFarmSection = (section, fetchSection) => {
+    if (usedOverviewSections.has(section)) return fetchSection();
+    usedOverviewSections.add(section);
+    return farmOverview
+        .then(data => data[section])
+        .catch(() => fetchSection());
+};
@@ -82,14 +82,14 @@ document.addEventListener('DOMContentLoaded', () => {
         if (nameFilter) url += `&user_name=${nameFilter}`;
         if (currentOrdering) url += `&ordering=${currentOrdering}`;
 
-        fetch(url, {
+        loadFarmSection('memberships', () => fetchList(url, {
             headers: {
                 'Content-Type': 'application/json',
                 'X-CSRFToken': getCookie('csrftoken')
             },
             credentials: 'include'
         })
-        .then(response => response.json())
+        .then(response => response.json()))
         .then(users => {
             if (!usersList) return;
             let html = '';
@@ -318,7 +318,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
     // Функция загрузки доступных пользователей
     const loadAvailableUsers = () => {
-        fetch(`/api/v1/farm/available_users/?slug=${FARM_SLUG}`, {
+        fetchList(`/api/v1/farm/available_users/?slug=${FARM_SLUG}`, {
             headers: {
                 'Content-Type': 'application/json',
                 'X-CSRFToken': getCookie('csrftoken'),
@@ -49,7 +49,7 @@ document.addEventListener('DOMContentLoaded', () => {
         if (typeFilter) url += `&zone_type=${typeFilter}`;
         if (currentOrdering) url += `&ordering=${currentOrdering}`;
 
-        fetch(url, {
+        loadFarmSection('zones', () => fetchList(url, {
             headers: {
                 'Content-Type': 'application/json',
                 'X-CSRFToken': getCookie('csrftoken'),
@@ -64,7 +64,7 @@ document.addEventListener('DOMContentLoaded', () => {
                 });
             }
             return response.json();
-        })
+        }))
         .then(zones => {
             if (!zonesList) return;
             let html = zones.length ? 
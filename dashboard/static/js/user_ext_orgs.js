@@ -101,7 +101,7 @@ document.addEventListener('DOMContentLoaded', () => {
         if (statusFilter.value) params.append('status', statusFilter.value);
         if (organizationTypeFilter.value) params.append('organization_type', organizationTypeFilter.value);
         if (currentOrdering) params.append('ordering', currentOrdering);
-        fetch(`/api/v1/user_pages/user_organizations/?${params.toString()}`, {
+        fetchList(`/api/v1/user_pages/user_organizations/?${params.toString()}`, {
             headers: {
                 'Content-Type': 'application/json',
                 'X-CSRFToken': getCookie('csrftoken')
@@ -97,7 +97,7 @@ document.addEventListener('DOMContentLoaded', () => {
         if (orgFilter.value) params.append('organization_name', orgFilter.value);
         if (orderingSelect?.value) params.append('ordering', orderingSelect.value);
 
-        fetch(`/api/v1/user_pages/user_farms/?${params.toString()}`, {
+        fetchList(`/api/v1/user_pages/user_farms/?${params.toString()}`, {
             headers: {
                 'Content-Type': 'application/json',
                 'X-CSRFToken': getCookie('csrftoken')
@@ -149,7 +149,7 @@ document.addEventListener('DOMContentLoaded', () => {
         if (orgFilter.value) params.append('organization_name', orgFilter.value);
         params.append('ordering', ordering);
 
-        fetch(`/api/v1/user_pages/user_farms/?${params.toString()}`, {
+        fetchList(`/api/v1/user_pages/user_farms/?${params.toString()}`, {
             headers: {
                 'Content-Type': 'application/json',
                 'X-CSRFToken': getCookie('csrftoken')
@@ -0,0 +1,109 @@
+"""
+Кольцевой буфер кадров устройства в Redis Stream.
+
+Каждый кадр, отправленный в группу ``device_{id}``, дублируется в ограниченный
+по длине поток ``device_stream:{id}``. Идентификатор записи потока служит
+курсором: клиент, переподключившись с ``?since=<курсор>``, получает пропущенные
+кадры одним пакетом без обращения к PostgreSQL.
+"""
+import json
+import logging
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from redis import RedisError
+
+from .redis_client import get_redis, get_async_redis
+
+logger = logging.getLogger(__name__)
+
+
+def stream_key(device_id) -> str:
+    return f"device_stream:{device_id}"
+
+
+def parse_cursor(cursor: Optional[str]) -> Optional[Tuple[int, int]]:
+    """
+    Разбирает идентификатор записи Redis Stream вида ``<ms>-<seq>``.
+
+    Возвращает:
+        tuple | None: Кортеж (ms, seq) для сравнения курсоров или None,
+        если курсор отсутствует или имеет неверный формат.
+    """
+    if not cursor:
+        return None
+    ms, _, seq = str(cursor).partition('-')
+    try:
+        return int(ms), int(seq or 0)
+    except ValueError:
+        return None
+
+
+def append_frame(device_id, frame_type: str, data: dict) -> Optional[str]:
+    """
+    Добавляет кадр в поток устройства и обрезает поток до DEVICE_STREAM_MAXLEN.
+
+    Возвращает:
+        str | None: Курсор добавленной записи или None, если Redis недоступен.
+    """
+    key = stream_key(device_id)
+    payload = json.dumps({"type": frame_type, "data": data})
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.xadd(key, {"f": payload}, maxlen=settings.DEVICE_STREAM_MAXLEN, approximate=True)
+        pipe.expire(key, settings.DEVICE_STREAM_TTL)
+        cursor, _ = pipe.execute()
+    except RedisError:
+        logger.exception("Не удалось записать кадр устройства %s в поток", device_id)
+        return None
+    return cursor
+
+
+async def aappend_frame(device_id, frame_type: str, data: dict) -> Optional[str]:
+    """
+    Асинхронный вариант append_frame для приёма данных через WebSocket.
+    """
+    key = stream_key(device_id)
+    payload = json.dumps({"type": frame_type, "data": data})
+    try:
+        pipe = get_async_redis().pipeline(transaction=False)
+        pipe.xadd(key, {"f": payload}, maxlen=settings.DEVICE_STREAM_MAXLEN, approximate=True)
+        pipe.expire(key, settings.DEVICE_STREAM_TTL)
+        cursor, _ = await pipe.execute()
+    except RedisError:
+        logger.exception("Не удалось записать кадр устройства %s в поток", device_id)
+        return None
+    return cursor
+
+
+async def read_frames_since(device_id, since: str) -> Tuple[List[dict], bool]:
+    """
+    Читает кадры устройства, записанные строго после курсора ``since``.
+
+    Возвращает:
+        tuple: (список кадров с ключами type/data/cursor, complete), где
+        complete=False означает, что часть кадров после ``since`` уже вытеснена
+        из буфера и клиенту нужен полный снимок состояния.
+    """
+    since_key = parse_cursor(since)
+    if since_key is None:
+        return [], False
+
+    key = stream_key(device_id)
+    limit = settings.DEVICE_STREAM_MAXLEN
+    pipe = get_async_redis().pipeline(transaction=False)
+    pipe.xrange(key, min='-', max='+', count=1)
+    pipe.xrange(key, min=f"({since}", max='+', count=limit)
+    oldest, entries = await pipe.execute()
+
+    # Курсор старше самой ранней записи буфера — между ними мог быть пропуск.
+    # MAXLEN ~ обрезает поток приблизительно, поэтому записей после курсора
+    # может быть больше limit: тогда прочитаны не самые новые и нужен снимок.
+    complete = bool(oldest) and parse_cursor(oldest[0][0]) <= since_key and len(entries) < limit
+
+    frames = []
+    for cursor, fields in entries:
+        frame = json.loads(fields["f"])
+        frame["cursor"] = cursor
+        frames.append(frame)
+    return frames, complete
@@ -1,3 +1,38 @@
-from django.test import TestCase
+import json
+from datetime import datetime, timezone as dt_timezone
 
-# Create your tests here.
+import msgpack
+from django.test import SimpleTestCase, override_settings
+
+from dashboard.framing import encode_json, encode_msgpack, parse_timestamp
+
+
+@override_settings(TIME_ZONE='Europe/Moscow')
+class FramingTimestampTests(SimpleTestCase):
+    """Один момент времени кодируется одинаково при любом формате метки."""
+
+    MOMENT = datetime(2026, 5, 1, 9, 30, 15, tzinfo=dt_timezone.utc)
+
+    def variants(self):
+        return [
+            self.MOMENT.timestamp(),
+            int(self.MOMENT.timestamp() * 1000),
+            '2026-05-01T09:30:15Z',
+            '2026-05-01T12:30:15+03:00',
+            '2026-05-01T14:30:15+05:00',
+            self.MOMENT,
+        ]
+
+    def test_parse_uses_current_timezone(self):
+        parsed = [parse_timestamp(value) for value in self.variants()]
+        self.assertEqual({dt.utcoffset() for dt in parsed}, {parsed[0].utcoffset()})
+        self.assertEqual({dt.isoformat() for dt in parsed}, {'2026-05-01T12:30:15+03:00'})
+
+    def test_epoch_and_iso_encode_the_same(self):
+        messages = [{'type': 'send_sensor_data', 'data': {'timestamp': value}} for value in self.variants()]
+
+        texts = {json.loads(encode_json(message))['data']['timestamp'] for message in messages}
+        self.assertEqual(texts, {'01.05.2026 12:30:15'})
+
+        stamps = {msgpack.unpackb(encode_msgpack(message))['d']['ts'] for message in messages}
+        self.assertEqual(stamps, {int(self.MOMENT.timestamp() * 1000)})
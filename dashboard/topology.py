@@ -0,0 +1,104 @@
+"""
+Топология шлюзов: дерево устройств по связи Device.gateway_device.
+
+Поддерево устройства и путь от него до корня выбираются одним рекурсивным
+CTE-запросом вместо обхода по одному запросу на уровень. Для каждого узла в
+том же запросе считаются число дочерних устройств и последний статус из
+DeviceStatus. Глубина обхода ограничена MAX_DEPTH, что защищает и от
+циклических ссылок в данных. Если передан список ферм, обход и подсчёт
+дочерних устройств не выходят за устройства этих ферм.
+"""
+from .models import Device, DeviceStatus
+
+MAX_DEPTH = 32
+
+_NODE_COLUMNS = """
+    SELECT t.id, t.name, t.serial_number, t.is_active, t.gateway_device_id, t.depth,
+        (SELECT COUNT(*) FROM {device} c WHERE c.gateway_device_id = t.id{child_farms}) AS child_count,
+        (SELECT s.online FROM {status} s WHERE s.device_id = t.id
+         ORDER BY s.timestamp DESC LIMIT 1) AS online,
+        (SELECT s.timestamp FROM {status} s WHERE s.device_id = t.id
+         ORDER BY s.timestamp DESC LIMIT 1) AS last_seen
+    FROM tree t
+"""
+
+_SUBTREE_SQL = """
+    WITH RECURSIVE tree AS (
+        SELECT id, name, serial_number, is_active, gateway_device_id, 0 AS depth
+        FROM {device} WHERE id = %s
+        UNION ALL
+        SELECT d.id, d.name, d.serial_number, d.is_active, d.gateway_device_id, t.depth + 1
+        FROM {device} d JOIN tree t ON d.gateway_device_id = t.id
+        WHERE t.depth < %s{tree_farms}
+    )
+""" + _NODE_COLUMNS + " ORDER BY t.depth, t.name, t.id"
+
+_PATH_SQL = """
+    WITH RECURSIVE tree AS (
+        SELECT id, name, serial_number, is_active, gateway_device_id, 0 AS depth
+        FROM {device} WHERE id = %s
+        UNION ALL
+        SELECT d.id, d.name, d.serial_number, d.is_active, d.gateway_device_id, t.depth + 1
+        FROM {device} d JOIN tree t ON d.id = t.gateway_device_id
+        WHERE t.depth < %s{tree_farms}
+    )
+""" + _NODE_COLUMNS + " ORDER BY t.depth DESC"
+
+
+def _query(sql, device_id, farm_ids) -> list:
+    params = [device_id, MAX_DEPTH]
+    tree_farms = child_farms = ''
+    if farm_ids is not None:
+        farm_ids = list(farm_ids)
+        tree_farms = ' AND d.farm_id = ANY(%s)'
+        child_farms = ' AND c.farm_id = ANY(%s)'
+        params += [farm_ids, farm_ids]
+
+    sql = sql.format(
+        device=Device._meta.db_table,
+        status=DeviceStatus._meta.db_table,
+        tree_farms=tree_farms,
+        child_farms=child_farms,
+    )
+    return list(Device.objects.raw(sql, params))
+
+
+def get_subtree(device_id, farm_ids=None) -> list:
+    """
+    Возвращает устройство и все устройства, подключённые через него.
+
+    Аргументы:
+        device_id: Идентификатор устройства.
+        farm_ids (list | None): Фермы, устройства которых можно показывать;
+            None — без ограничения.
+
+    Возвращает:
+        list: Экземпляры Device с дополнительными атрибутами depth,
+            child_count, online и last_seen, упорядоченные по уровню.
+    """
+    return _query(_SUBTREE_SQL, device_id, farm_ids)
+
+
+def get_path_to_root(device_id, farm_ids=None) -> list:
+    """
+    Возвращает цепочку шлюзов от корневого устройства до данного.
+
+    Аргументы:
+        device_id: Идентификатор устройства.
+        farm_ids (list | None): Как в get_subtree; путь обрывается на первом
+            шлюзе чужой фермы.
+
+    Возвращает:
+        list: Экземпляры Device (как в get_subtree), первым идёт корень.
+    """
+    nodes = _query(_PATH_SQL, device_id, farm_ids)
+
+    # При циклической ссылке обход повторяет узлы до MAX_DEPTH
+    seen = set()
+    path = []
+    for node in reversed(nodes):
+        if node.id in seen:
+            break
+        seen.add(node.id)
+        path.append(node)
+    return path[::-1]
@@ -0,0 +1,24 @@
+/**
+ * fetch для списков DashboardAPI с курсорной пагинацией.
+ *
+ * Проходит по ссылкам next и возвращает Response с объединённым массивом
+ * results, поэтому вызывающий код читает его так же, как обычный список.
+ * Ответ с ошибкой на любой странице возвращается как есть.
+ */
+async function fetchList(url, options = {}) {
+    const results = [];
+    let next = url;
+    while (next) {
+        const response = await fetch(next, options);
+        if (!response.ok) {
+            return response;
+        }
+        const page = await response.json();
+        results.push(...page.results);
+        next = page.next;
+    }
+    return new Response(JSON.stringify(results), {
+        status: 200,
+        headers: {'Content-Type': 'application/json'},
+    });
+}
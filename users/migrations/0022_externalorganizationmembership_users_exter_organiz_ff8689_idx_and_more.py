@@ -0,0 +1,33 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0021_farm_slug'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='externalorganizationmembership',
+            index=models.Index(fields=['organization', 'role', 'id'], name='users_exter_organiz_ff8689_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='externalorganizationmembership',
+            index=models.Index(fields=['user', 'role', 'id'], name='users_exter_user_id_ec719b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='farm',
+            index=models.Index(fields=['organization', 'name', 'id'], name='users_farm_organiz_3e839f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='farmmembership',
+            index=models.Index(fields=['user', 'role', 'id'], name='users_farmm_user_id_f55cf4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='farmmembership',
+            index=models.Index(fields=['farm', 'role', 'id'], name='users_farmm_farm_id_ead4e9_idx'),
+        ),
+    ]
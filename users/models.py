@@ -2,7 +2,9 @@ from typing import Dict, List
 from slugify import slugify
 
 from django.db import models
+from django.db.models.functions import Upper
 from django.contrib.auth.models import AbstractUser, Group, Permission
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.utils.translation import gettext_lazy as _
 
 from .managers import CustomUserManager
@@ -88,6 +90,14 @@ class CustomUser(AbstractUser):
 
     objects = CustomUserManager()
 
+    class Meta(AbstractUser.Meta):
+        # Триграммные индексы обслуживают icontains (UPPER(...) LIKE) и поиск по сходству
+        indexes = [
+            GinIndex(OpClass(Upper('first_name'), name='gin_trgm_ops'), name='user_first_name_trgm'),
+            GinIndex(OpClass(Upper('last_name'), name='gin_trgm_ops'), name='user_last_name_trgm'),
+            GinIndex(OpClass(Upper('phone_number'), name='gin_trgm_ops'), name='user_phone_trgm'),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.profile_pic:
             self.profile_pic = 'profile_pics/default.png'
@@ -182,6 +192,9 @@ class ExternalOrganization(models.Model):
         verbose_name = _('Внешняя организация')
         verbose_name_plural = _('Внешние организации')
         ordering = ['name']
+        indexes = [
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='ext_org_name_trgm'),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -215,6 +228,10 @@ class ExternalOrganizationMembership(models.Model):
         verbose_name = _('Членство в организации')
         verbose_name_plural = _('Членства в организациях')
         unique_together = ('user', 'organization')
+        indexes = [
+            models.Index(fields=['organization', 'role', 'id']),
+            models.Index(fields=['user', 'role', 'id']),
+        ]
 
 
 
@@ -284,6 +301,10 @@ class Farm(models.Model):
             ('view_device', _('Может просматривать устройства')),
             ('control_device', _('Может управлять устройствами')),
         ]
+        indexes = [
+            models.Index(fields=['organization', 'name', 'id']),
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='farm_name_trgm'),
+        ]
 
     def __str__(self):
         return self.name
@@ -352,6 +373,10 @@ class FarmMembership(models.Model):
         verbose_name = _('Членство в ферме')
         verbose_name_plural = _('Членства в фермах')
         unique_together = ('user', 'farm')
+        indexes = [
+            models.Index(fields=['user', 'role', 'id']),
+            models.Index(fields=['farm', 'role', 'id']),
+        ]
 
     def __str__(self):
         """